@@ -104,6 +104,12 @@ with st.sidebar:
     nb_append = st.number_input("Overlap (bases)", min_value=1, value=2)
     nb_cuts = st.number_input("Additional Cuts", min_value=0, value=0)
 
+    st.header("5. Early Stopping")
+    target_score = st.number_input("Target Score (0 = off)", min_value=0.0, value=0.0, format="%.6f")
+    patience = st.number_input("Stop after N generations without improvement (0 = off)", min_value=0, value=15)
+    rel_tol = st.number_input("Relative improvement tolerance", min_value=0.0, value=1e-3, format="%.4f")
+    max_seconds = st.number_input("Time limit in seconds (0 = off)", min_value=0, value=0)
+
     run_btn = st.button("🚀 Run Optimization", type="primary")
 
 # --- MAIN LOGIC ---
@@ -125,7 +131,7 @@ if run_btn:
         with st.spinner(f"Running Genetic Algorithm on {filename_display}..."):
             # Redirect stdout to our capturer
             with contextlib.redirect_stdout(capture):
-                Best_indiv_list, Best_scores, Worst_scores = AlgoGenetique(
+                run = AlgoGenetique(
                     table_path, 
                     seq, 
                     nb_individus=nb_indiv, 
@@ -133,9 +139,15 @@ if run_btn:
                     taux_selec=taux_selec, 
                     selection_type=selection_method, 
                     nb_cuts=nb_cuts, 
-                    nb_append=nb_append
+                    nb_append=nb_append,
+                    target_score=target_score or None,
+                    patience=patience or None,
+                    rel_tol=rel_tol,
+                    max_seconds=max_seconds or None
                 )
         
+        Best_indiv_list, Best_scores, Worst_scores = run
+
         # Save logs and results to Session State (so they persist)
         st.session_state.logs = capture.buffer.getvalue()
         st.session_state.results = {
@@ -144,9 +156,10 @@ if run_btn:
             "worst_scores": Worst_scores,
             "seq": seq,
             "filename": filename_display,
-            "method": selection_method
+            "method": selection_method,
+            "stop_reason": run.stop_reason
         }
-        st.success("Optimization Complete!")
+        st.success(f"Optimization Complete! Stopped after {len(Best_scores) - 1} generations ({run.stop_reason})")
 
 # 2. DISPLAYING RESULTS (If they exist in memory)
 if st.session_state.results is not None:
@@ -230,7 +243,7 @@ if st.session_state.results is not None:
                                 
         for best in bests : 
             traj = Traj3D()
-            traj.compute(eval_seq, best.Rot_table)
+            traj.compute(eval_seq, best.Rot_table, nbappend=2)
             coords = traj.getTraj()
 
             dist, norm_diff, dot_prod = get_indicators(coords)
@@ -267,6 +280,7 @@ if st.session_state.results is not None:
 
     with tab4:
         st.write(f"**Final Best Score:** {res['best_scores'][-1]}")
+        st.write(f"**Stop Reason:** {res.get('stop_reason')} after {len(res['best_scores']) - 1} generations")
         
         best_candidate = res["best_list"][-1]
         json_str = json.dumps(best_candidate.Rot_table.rot_table, indent=4)
@@ -14,7 +14,14 @@ if src_path not in sys.path:
     sys.path.insert(0, src_path)
 
 # Imports
-from genetic_algo.core.algogenetique import AlgoGenetique, generate_pop
+from genetic_algo.core.algogenetique import generate_pop
+from genetic_algo.core.islands import AlgoIslands
+from genetic_algo.core.optimizer import Optimizer
+from genetic_algo.core.cmaes import CMAES
+from genetic_algo.core.de import DifferentialEvolution, DE_STRATEGIES
+from genetic_algo.core.selection import indices_dic
+from genetic_algo.dna.EncodedSeq import EncodedSeq
+from genetic_algo.utils.gridsearch import grid_configs, run_grid
 from genetic_algo.utils.simulsmanager import simul_and_save_results
 from genetic_algo.utils.resultsmanager import load_simulation_data
 from genetic_algo.dna.Traj3D import Traj3D
@@ -32,7 +39,9 @@ def run_comparison_benchmark(dna_seq, table_path):
     """
     Compare performance of different selection strategies.
     
-    Tests: elitist, tournament, linear roulette, and exponential roulette selection.
+    Tests: every GA selection strategy (selection.indices_dic), then the same
+    population split into islands (one process per core, see AlgoIslands), then
+    CMA-ES and differential evolution given the evaluation budget of the GA runs.
     Returns list of tuples: (strategy_name, best_score, duration, best_individual_list)
     """
     print(f"\n{'='*60}")
@@ -40,7 +49,7 @@ def run_comparison_benchmark(dna_seq, table_path):
     print(f"DNA Sequence Length: {len(dna_seq)} bases")
     print(f"{'='*60}\n")
 
-    strategies = ["elitiste", "tournament", "roulette_lin", "roulette_exp"]
+    strategies = list(indices_dic)
     results = []
 
     params = {
@@ -62,38 +71,168 @@ def run_comparison_benchmark(dna_seq, table_path):
         nb_append = 1
     )
 
-    print(f"{'Strategy':<15} | {'Best Score':<30} | {'Time (s)':<10} | {'Status'}")
-    print("-" * 55)
+    print(f"{'Strategy':<20} | {'Best Score':<25} | {'Evals':<8} | {'Time (s)':<10} | {'Status'}")
+    print("-" * 82)
 
+    budget = 0
     for strat in strategies:
         start_time = time.time()
         
-        best_list, best_scores, worst_scores = AlgoGenetique(
-            filename = table_path,
-            dna_seq = dna_seq,
-            initial_population = master_pop,
+        optimizer = Optimizer(
+            table_path,
+            dna_seq,
             nb_individus = params['nb_individus'],
             taux_selec = params['taux_selec'],
             nb_cuts = params['nb_cuts'],
             nb_append = params['nb_append'],
             selection_type = strat,
-            nb_generations = params['nb_generations']
+            verbose = False
         )
+        best_list, best_scores, worst_scores = optimizer.run(params['nb_generations'], initial_population = master_pop)
         
         duration = time.time() - start_time
         best_score = best_scores[-1]
+        evaluations = optimizer.context.nb_evaluations
+        budget = max(budget, evaluations)
         
-        print(f"{strat:<15} | {best_score:<25.10e} | {duration:<10.2f} | ✅ Done")
+        print(f"{strat:<20} | {best_score:<25.10e} | {evaluations:<8} | {duration:<10.2f} | ✅ Done")
         results.append((strat, best_score, duration, best_list))
 
+    # Same total population split into one island per core, mixing the strategies
+    nb_islands = max(2, os.cpu_count() or 1)
+    start_time = time.time()
+    best_list, best_scores, worst_scores = AlgoIslands(
+        table_path, dna_seq,
+        nb_islands = nb_islands,
+        nb_individus = params['nb_individus'] // nb_islands,
+        nb_generations = params['nb_generations'],
+        taux_selec = params['taux_selec'],
+        selection_type = [strategies[k % len(strategies)] for k in range(nb_islands)],
+        nb_cuts = params['nb_cuts'],
+        nb_append = params['nb_append'],
+    )
+    duration = time.time() - start_time
+    print(f"{'islands':<20} | {best_scores[-1]:<25.10e} | {'-':<8} | {duration:<10.2f} | ✅ Done")
+    results.append(("islands", best_scores[-1], duration, best_list))
+
+    # CMA-ES from the best individual of the master population, with the largest GA budget
+    start_time = time.time()
+    cmaes = CMAES(table_path, dna_seq, nb_cuts = params['nb_cuts'], nb_append = params['nb_append'], verbose = False)
+    nb_generations = max(1, (budget - len(master_pop)) // cmaes.nb_individus)
+    best_list, best_scores, worst_scores = cmaes.run(nb_generations, initial_population = master_pop)
+    duration = time.time() - start_time
+    print(f"{'cma-es':<20} | {best_scores[-1]:<25.10e} | {cmaes.context.nb_evaluations:<8} | {duration:<10.2f} | ✅ Done")
+    results.append(("cma-es", best_scores[-1], duration, best_list))
+
+    # Differential evolution on the master population, same budget
+    for strat in DE_STRATEGIES:
+        start_time = time.time()
+        de = DifferentialEvolution(table_path, dna_seq, params['nb_individus'], strat,
+                                   nb_cuts = params['nb_cuts'], nb_append = params['nb_append'], verbose = False)
+        nb_generations = max(1, (budget - len(master_pop)) // params['nb_individus'])
+        best_list, best_scores, worst_scores = de.run(nb_generations, initial_population = master_pop)
+        duration = time.time() - start_time
+        name = f"de {strat}"
+        print(f"{name:<20} | {best_scores[-1]:<25.10e} | {de.context.nb_evaluations:<8} | {duration:<10.2f} | ✅ Done")
+        results.append((name, best_scores[-1], duration, best_list))
+
     # Summary
-    print("-" * 55)
+    print("-" * 82)
     best_run = min(results, key=lambda x: x[1])
     print(f"\n🏆 WINNER: {best_run[0]} (Score: {best_run[1]:.10e})")
 
     return results
 
-def run_grid_search(dna_seq, table_path, base_save_filename):
+def time_to_target(optimizer, target, max_generations, initial_population = None):
+    """
+    Runs optimizer (Optimizer, CMAES or DifferentialEvolution) generation by
+    generation until its best score reaches target.
+
+    Returns (seconds, evaluations, generations) when the target is reached,
+    None after max_generations without reaching it.
+    """
+    start_time = time.time()
+    optimizer.initialize(initial_population)
+    for i in range(max_generations + 1):
+        if optimizer.best_scores[-1] <= target:
+            return time.time() - start_time, optimizer.context.nb_evaluations, i
+        if i < max_generations:
+            optimizer.step(i, max_generations)
+    return None
+
+def run_target_benchmark(dna_seq, table_path, target = None):
+    """
+    Time-to-target of differential evolution against the elitist GA
+    (selection_elitiste, weighted crossover), from the same population.
+
+    The target defaults to the best score the GA reaches in 20 generations
+    (the timed GA run replays the same seed), so that it is reachable.
+    """
+    print(f"\n{'='*60}")
+    print(f"🎯 RUNNING TIME-TO-TARGET BENCHMARK")
+    print(f"DNA Sequence Length: {len(dna_seq)} bases")
+    print(f"{'='*60}\n")
+
+    nb_individus, taux_selec, max_generations = 200, 0.15, 200
+    master_pop = generate_pop(nb_individus, rot_table_path = table_path, dna_seq = dna_seq, nb_cuts = 0, nb_append = 1)
+
+    def engines():
+        yield "ga elitiste", Optimizer(table_path, dna_seq, nb_individus = nb_individus, taux_selec = taux_selec,
+                                       selection_type = "elitiste", seed = 0, verbose = False)
+        for strat in DE_STRATEGIES:
+            yield f"de {strat}", DifferentialEvolution(table_path, dna_seq, nb_individus, strat, seed = 0, verbose = False)
+
+    if target is None:
+        # Same seed and mutation schedule (step out of max_generations) as the timed GA run
+        _, reference = next(engines())
+        reference.initialize(master_pop)
+        for i in range(20):
+            reference.step(i, max_generations)
+        target = reference.best_scores[-1]
+    print(f"Target score: {target:.10e}\n")
+
+    print(f"{'Engine':<20} | {'Time (s)':<10} | {'Evals':<8} | {'Generations'}")
+    print("-" * 60)
+    results = []
+    for name, optimizer in engines():
+        reached = time_to_target(optimizer, target, max_generations, initial_population = master_pop)
+        if reached is None:
+            print(f"{name:<20} | {'-':<10} | {optimizer.context.nb_evaluations:<8} | not reached")
+        else:
+            duration, evaluations, generations = reached
+            print(f"{name:<20} | {duration:<10.2f} | {evaluations:<8} | {generations}")
+        results.append((name, reached))
+    return results
+
+def grid_key(config):
+    """Key of a grid configuration in the histories: (nb_ind, nb_gen, rate, sel_type, recuit, cuts, appends)."""
+    return (config["nb_individus"], config["nb_generations"], config["taux_selec"], config["selection_type"],
+            config["recuit"], config["nb_cuts"], config["nb_append"])
+
+def grid_indicators(config, res, dna_seq):
+    """
+    Runs in the grid-search workers: reduces an AlgoGenetique result to the
+    closure indicators of its best individual per generation, and the
+    reason the run stopped. dna_seq is the worker's shared EncodedSeq.
+    """
+    bests, best_scores, worst_scores = res
+    eval_seq = EncodedSeq(dna_seq.seq + dna_seq.seq[:2]) # encoded once for all the generations
+    traj_tool = Traj3D()
+    history = {'dist' : [], 'norm' : [], 'ps' : [], 'stop_reason' : res.stop_reason}
+
+    for best in bests : 
+        traj_tool.compute(eval_seq, best.Rot_table, nbappend=2)
+        coords = traj_tool.getTraj()
+
+        dist, norm_diff, dot_prod = get_indicators(coords)
+
+        history['dist'].append(dist)
+        history['norm'].append(norm_diff)
+        history['ps'].append(dot_prod)
+
+    return history
+
+def run_grid_search(dna_seq, table_path, base_save_filename, nb_workers = None):
     """
     Exhaustive hyperparameter grid search.
     
@@ -103,6 +242,12 @@ def run_grid_search(dna_seq, table_path, base_save_filename):
     - Norm difference: ||v_start - v_end|| (continuity)
     - Dot product: v_start · v_end (alignment)
     
+    Configurations run over a process pool (nb_workers processes, default:
+    one per core) sharing the sequence and the master population; a failed
+    configuration is reported and skipped. Runs stop once their best score
+    has improved by less than 0.1 % over 20 generations (AlgoGenetique
+    patience / rel_tol), instead of running their plateaued tails.
+
     Outputs: 'Evolution_metrique_genetique.png' with three metric plots.
     """
     print(f"\n{'='*60}")
@@ -118,7 +263,9 @@ def run_grid_search(dna_seq, table_path, base_save_filename):
         "poisson": [False],
         "nb_cuts": [0, 1, 2],
         "nb_append": [1, 2],
-        "recuit": [False]
+        "recuit": [False],
+        "patience": [20],
+        "rel_tol": [1e-3]
     }
 
     master_pop = generate_pop(max(params_listed["nb_individus"]), 
@@ -128,54 +275,29 @@ def run_grid_search(dna_seq, table_path, base_save_filename):
         nb_append = 1
         )
 
-    total_sims = np.prod([len(v) for v in params_listed.values()])
+    configs = grid_configs(params_listed)
+    total_sims = len(configs)
     print(f"Estimated number of simulations: {total_sims}")
 
     histories = {}
+    failures = {}
 
     count = 0
 
-    traj_tool = Traj3D()
-
-    eval_seq = dna_seq + dna_seq[0] + dna_seq[1]
-
-    for nb_ind in params_listed["nb_individus"]:
-        pop_init = master_pop[:nb_ind]
-        for nb_gen in params_listed["nb_generations"]:
-            for rate in params_listed["taux_selec"]:
-                for sel_type in params_listed["selection_type"]:
-                    for is_recuit in params_listed["recuit"]:
-                        for cut in params_listed["nb_cuts"]:
-                            for append in params_listed["nb_append"]:
-                                config_key = (nb_ind , nb_gen, rate, sel_type, is_recuit, cut, append)
-                                count += 1
-                                print(f"[{count}/{total_sims}] Simulating: {sel_type}, Pop: {nb_ind}, Recuit: {is_recuit}, Number of cuts : {cut}, Number of appends : {append}")
-                                
-                                curr_params = {
-                                    "nb_individus": nb_ind,
-                                    "nb_generations": nb_gen,
-                                    "taux_selec": rate,
-                                    "selection_type": sel_type,
-                                    "poisson": False,
-                                    "nb_cuts": cut,
-                                    "nb_append": append,
-                                    "recuit": is_recuit
-                                }
-
-                                res = AlgoGenetique("src/genetic_algo/dna/table.json", dna_seq,initial_population = pop_init, **curr_params)
-                                bests, best_scores, worst_scores = res
-
-                                histories[config_key] = {'dist' : [], 'norm' : [], 'ps' : []}
-                                
-                                for best in bests : 
-                                    traj_tool.compute(eval_seq, best.Rot_table)
-                                    coords = traj_tool.getTraj()
-
-                                    dist, norm_diff, dot_prod = get_indicators(coords)
-
-                                    histories[config_key]['dist'].append(dist)
-                                    histories[config_key]['norm'].append(norm_diff)
-                                    histories[config_key]['ps'].append(dot_prod)
+    # Configurations run in parallel; each one is reported as soon as it finishes
+    for config, history, error in run_grid(dna_seq, table_path, configs, master_pop,
+                                           nb_workers = nb_workers, postprocess = grid_indicators):
+        config_key = grid_key(config)
+        count += 1
+        if error is not None:
+            failures[config_key] = error
+            print(f"[{count}/{total_sims}] ❌ Failed: {config_key} ({error!r})")
+            continue
+        histories[config_key] = history
+        print(f"[{count}/{total_sims}] Done: {config['selection_type']}, Pop: {config['nb_individus']}, Recuit: {config['recuit']}, Number of cuts : {config['nb_cuts']}, Number of appends : {config['nb_append']}, Final distance : {history['dist'][-1]:.4e}, Generations : {len(history['dist']) - 1} ({history['stop_reason']})")
+
+    if failures:
+        print(f"{len(failures)} configuration(s) failed out of {total_sims}")
 
     sorted_histories = sorted(histories.items(), key = lambda item : item[1]['dist'][-1])
 
@@ -211,24 +333,30 @@ def run_grid_search(dna_seq, table_path, base_save_filename):
 
 def main():
     """
-    Genetic algorithm benchmark tool with three modes:
+    Genetic algorithm benchmark tool with four modes:
     
     compare: Quick strategy comparison (default)
+    target: Time-to-target of differential evolution against the elitist GA
     grid: Exhaustive hyperparameter search
     plot: Visualize existing results
     
     Usage:
         python benchmark.py --mode compare
+        python benchmark.py --mode target --file data/raw/plasmid_2k_1.fasta
         python benchmark.py --mode grid --file data/raw/my_sequence.fasta
     """
 
     parser = argparse.ArgumentParser(description="Genetic Algorithm Benchmark Tool")
-    parser.add_argument('--mode', type=str, choices=['compare', 'grid', 'plot'], default='compare', 
-                        help='Mode: "compare" (speed test), "grid" (exhaustive search), "plot" (visualize existing results)')
+    parser.add_argument('--mode', type=str, choices=['compare', 'target', 'grid', 'plot'], default='compare', 
+                        help='Mode: "compare" (speed test), "target" (time-to-target), "grid" (exhaustive search), "plot" (visualize existing results)')
     parser.add_argument('--file', type=str, default='data/raw/plasmid_8k.fasta', 
                         help='Path to the fasta file')
     parser.add_argument('--table', type=str, default='src/genetic_algo/dna/table.json', 
                         help='Path to the rotation table JSON')
+    parser.add_argument('--workers', type=int, default=None, 
+                        help='Processes used by the grid search (default: one per core)')
+    parser.add_argument('--target', type=float, default=None,
+                        help='Score to reach in target mode (default: the elitist GA score after 20 generations)')
     
     args = parser.parse_args()
 
@@ -245,10 +373,13 @@ def main():
     # 2. Execute Mode
     if args.mode == 'compare':
         run_comparison_benchmark(dna_seq, full_path_table)
+
+    elif args.mode == 'target':
+        run_target_benchmark(dna_seq, full_path_table, args.target)
         
     elif args.mode == 'grid':
         output_base = os.path.join(project_root, 'data', 'processed', 'benchmark_')
-        run_grid_search(dna_seq, full_path_table, output_base)
+        run_grid_search(dna_seq, full_path_table, output_base, nb_workers=args.workers)
         
     elif args.mode == 'plot':
         print("To use plot mode, point to a specific saved simulation folder in the code.")
@@ -37,7 +37,7 @@ for a,b in T :
 
     for best in bests : 
         traj = Traj3D()
-        traj.compute(base_seq+base_seq[0]+base_seq[1], best.Rot_table)
+        traj.compute(base_seq+base_seq[0]+base_seq[1], best.Rot_table, nbappend=2)
         coords = traj.getTraj()
         dist = np.linalg.norm(coords[0]-coords[-2])
         v_end = coords[-1]-coords[-2]
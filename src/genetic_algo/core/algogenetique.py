@@ -1,23 +1,29 @@
 import genetic_algo.dna.RotTable as RotTable
 import genetic_algo.dna.Traj3D as Traj3D
 import numpy as np
-import random
-from genetic_algo.core.fitness import fitness,fitness_basic
+from genetic_algo.core.fitness import fitness,fitness_basic,fitness_batch
 from genetic_algo.core.selection import selection
-import copy
-from json import load as json_load
+import genetic_algo.core.population as population
+from genetic_algo.core.optimizer import RunContext, Optimizer, SteadyStateOptimizer
+from genetic_algo.core.stopping import EarlyStopping
 
 
 # =============================================================================
 # GLOBAL VARIABLES
 # =============================================================================
+# Settings of the last run started by AlgoGenetique / generate_pop, read by
+# the individuals built without a RunContext. Kept for compatibility: runs
+# sharing a process should go through Optimizer instead.
 
 str_data = None
+seq_data = None # str_data encoded once per run (EncodedSeq)
 Rot_data = None
+Rot_bounds = None # (ref_mean, ref_sd) of Rot_data, computed once per run
 nb_cut = None
 nbappend = None
 beta = 1
 big_mut = 2
+nb_workers = None
 
 
 
@@ -26,102 +32,168 @@ class Individu:
     Individual solution candidate in the genetic algorithm.
     Contains rotation parameters for all 16 dinucleotides (AA, AC, ..., TT).
     """
-    def __init__(self, Table_rot): 
-        """Initialize individual with rotation table and compute fitness score."""
+    def __init__(self, Table_rot, score = None, context = None): 
+        """
+        Initialize individual with rotation table.
+        Scoring is lazy: without a known score the individual is dirty and is
+        evaluated on first access to score, or by flush_scores.
+        The individual scores and mutates against context (RunContext), or
+        against the module globals (last run started) when it is None.
+        """
         self.Rot_table = RotTable.RotTable(Table_rot)
-        self.score = self.fit()
-
+        self._score = score
+        self.dirty = score is None
+        self.context = context
+
+    @property
+    def score(self) -> float:
+        """Fitness score, computed on demand if the table changed."""
+        if self.dirty:
+            self.score = self.fit()
+        return self._score
+
+    @score.setter
+    def score(self, value):
+        self._score = value
+        self.dirty = False
+
+    def __getstate__(self):
+        """The run context (sequence, generator) is not saved with the individual."""
+        state = self.__dict__.copy()
+        state["context"] = None
+        return state
+
+    def __setstate__(self, state):
+        """Loads individuals pickled before lazy scoring (plain score attribute)."""
+        if "score" in state:
+            state["_score"] = state.pop("score")
+            state["dirty"] = False
+        state.setdefault("context", None)
+        self.__dict__.update(state)
 
     def __add__(self, other): #fonction permettant d'acoupler deux individus
         """
         Crossover operator: combine two parents to create offspring.
         Uses weighted mixing based on parent fitness scores.
         Better parents (lower score) contribute more to offspring.
+        The offspring is not evaluated (dirty).
         """
-        s_score,o_score = self.score,other.score
-        alpha = 0.5
-        if s_score >0 or o_score >0 :
-            alpha = (o_score)/(s_score+o_score) 
-        Table ={}
-        for XY in self.Rot_table.rot_table:
-            Ls = self.Rot_table.rot_table[XY].copy()
-            Lo = other.Rot_table.rot_table[XY].copy()
-            for i in range(3):
-                if random.random() < alpha :
-                    Ls[i] = (alpha*Ls[i] +(1-alpha)*Lo[i])*beta + (1-beta)* Ls[i] 
-                else :
-                    Ls[i] = (alpha*Ls[i] +(1-alpha)*Lo[i])*beta + (1-beta)* Lo[i] 
-            Table[XY] = Ls
-        return Individu(Table)
+        return Individu(crossover_table(self, other, self.context), context=self.context)
     
     def mutation(self,mutrate,sigma):
         """
         Apply mutations to rotation parameters.
         Two types: frequent small mutations and rare large mutations.
         Parameters are bounded within valid ranges from reference table.
+        The individual is marked dirty instead of being re-evaluated.
         """
 
         if 0<=mutrate <=1:
-            Table =copy.deepcopy(self.Rot_table.rot_table)
-            for XY in Table:
-                L = Table[XY]
-                for i in range(3):
-                    if random.random() < mutrate :  #petites mutations fréquentes
-                        tamp = L[i] + random.normalvariate(0,sigma*L[i+3])
-                        L[i] = max(Rot_data[XY][i]-Rot_data[XY][i+3],min(tamp,Rot_data[XY][i]+Rot_data[XY][i+3]))
-                    if random.random() < mutrate/big_mut : # grosses mutations rares
-                        tamp = L[i] + random.normalvariate(0,sigma*np.sqrt(np.sqrt(big_mut))*L[i+3])
-                        L[i] = max(Rot_data[XY][i]-Rot_data[XY][i+3],min(tamp,Rot_data[XY][i]+Rot_data[XY][i+3]))
-                Table[XY] = L
-            self.Rot_table = RotTable.RotTable(Table)
-            self.score = self.fit()
+            self.Rot_table = RotTable.RotTable(mutate_table(self.Rot_table.rot_table,mutrate,sigma,self.context))
+            self.dirty = True
 
     def fit(self) -> float:
         """Calculate fitness score (lower is better)."""
-        return fitness(self.Rot_table,str_data,nbcuts=nb_cut,nbappend=nbappend)
+        if self.context is not None:
+            return self.context.score_table(self.Rot_table)
+        return fitness(self.Rot_table,seq_data,nbcuts=nb_cut,nbappend=nbappend)
 
     def __lt__(self,other):
         """Enable sorting by fitness score."""
         return self.score<other.score
-    
+
+def crossover_table(parent1, parent2, context = None) -> dict:
+    """
+    Rotation table of the offspring of two individuals (see Individu.__add__),
+    without evaluating it. Settings come from context (RunContext), or from
+    the module globals when it is None.
+    """
+    mixing, rng = (beta, None) if context is None else (context.beta, context.rng)
+    child = population.crossover_params(parent1.Rot_table.getParams()[None], parent2.Rot_table.getParams()[None],
+                                        [parent1.score], [parent2.score], mixing, rng)[0]
+    table = parent1.Rot_table.rot_table
+    return {XY: list(child[k]) + table[XY][3:] for k, XY in enumerate(RotTable.DINUC_KEYS)}
+
+def mutate_table(rot_table, mutrate, sigma, context = None) -> dict:
+    """
+    Mutated copy of a rotation table (see Individu.mutation), without
+    evaluating it. Settings come from context (RunContext), or from the
+    module globals when it is None.
+    """
+    if context is None:
+        (ref_mean, ref_sd), factor, rng = Rot_bounds, big_mut, None
+    else:
+        (ref_mean, ref_sd), factor, rng = context.ref_bounds, context.big_mut, context.rng
+    params = RotTable.RotTable(rot_table).getParams()[None]
+    mutated = population.mutate_params(params, mutrate, sigma, ref_mean, ref_sd, factor, rng)[0]
+    return {XY: list(mutated[k]) + list(rot_table[XY][3:]) for k, XY in enumerate(RotTable.DINUC_KEYS)}
+
+def score_params(params) -> np.ndarray:
+    """Scores a (K, 16, 3) parameter block with a single batched fitness call (module globals)."""
+    return fitness_batch(params, seq_data, nbappend=nbappend, nbcuts=nb_cut, nb_workers=nb_workers)
+
+def evaluate_population(Population):
+    """(Re)scores a list of individuals in place with one batched call per run context."""
+    groups = {}
+    for ind in Population:
+        groups.setdefault(ind.context, []).append(ind)
+    for context, individus in groups.items():
+        scorer = score_params if context is None else context.score_params
+        scores = scorer(np.array([ind.Rot_table.getParams() for ind in individus]).reshape(-1, 16, 3))
+        for ind, score in zip(individus, scores):
+            ind.score = score
+
+def flush_scores(Population):
+    """Scores the dirty individuals of a population with one batched call."""
+    evaluate_population([ind for ind in Population if ind.dirty])
+
 def generate_pop(nb_individus, rot_table_path, dna_seq, nb_cuts = 0, nb_append = 1):
     """
     Generate initial population with randomized rotation parameters.
     Each parameter is randomly perturbed within ±std_dev of reference value.
     """
 
-    rot_table = json_load(open(rot_table_path))
-    global str_data, Rot_data, nb_cut, nbappend
-    str_data = dna_seq
-    Rot_data = rot_table
-    nb_cut = nb_cuts
-    nbappend = nb_append
-
-    def New_individu():
-        Table_rot = copy.deepcopy(rot_table)
-
-        for XY in Table_rot:
-            L = Table_rot[XY]
-            for i in range(3) : 
-                L[i] += random.uniform(-Rot_data[XY][i+3], Rot_data[XY][i+3])
-            Table_rot[XY] = L
-        return Individu(Table_rot)
-    return [New_individu() for _ in range(nb_individus)]
-    
+    context = RunContext(rot_table_path, dna_seq, nb_cuts, nb_append, beta, big_mut, nb_workers,
+                         seed=population._rng)
+    set_globals(context)
+
+    Population = population.Population.random(nb_individus, context.ref_table, context.rng)
+    Population.evaluate(context.score_params)
+    return Population.individus(context)
+
+def set_globals(context):
+    """Points the module globals (legacy individuals without context) at a run context."""
+    global str_data, seq_data, Rot_data, Rot_bounds, nb_cut, nbappend, beta, big_mut, nb_workers
+    str_data = context.str_seq
+    seq_data = context.seq
+    Rot_data = context.ref_table
+    Rot_bounds = context.ref_bounds
+    nb_cut = context.nb_cuts
+    nbappend = context.nb_append
+    beta = context.beta
+    big_mut = context.big_mut
+    nb_workers = context.nb_workers
+
 
 def AlgoGenetique(filename : str,dna_seq: str, 
                 nb_individus,nb_generations,taux_selec,selection_type : str,
                 poisson=False,nb_cuts = 0,nb_append = 1,recuit=False,beta_reproduction = 0.7,
-                mutrate = 0.02, big_mutation = 20, initial_population = None) :
+                mutrate = 0.02, big_mutation = 20, initial_population = None, nb_threads = None, seed = None,
+                compact = False, backend = None, steady_state = False, replacement = "worst",
+                cache = None, refine_every = None, refine_elites = 1, refine_iter = 20,
+                target_score = None, patience = None, rel_tol = 0.0, min_diversity = None,
+                max_evaluations = None, max_seconds = None) :
     """
     Genetic algorithm for optimizing DNA rotation parameters.
+    Thin wrapper around Optimizer, which also points the module globals at
+    the run (compatibility with individuals built without a RunContext).
     
     Evolves population to minimize closure error of circular DNA structures.
     Process: selection → crossover → mutation → replacement.
     
     Args:
         filename: Path to reference rotation table JSON
-        dna_seq: DNA sequence to optimize
+        dna_seq: DNA sequence to optimize (string or pre-encoded EncodedSeq)
         nb_individus: Population size
         nb_generations: Number of evolution iterations
         taux_selec: Selection rate (fraction kept as parents, 0-1)
@@ -133,56 +205,45 @@ def AlgoGenetique(filename : str,dna_seq: str,
         beta_reproduction: Crossover mixing coefficient (default: 0.7)
         mutrate: Initial mutation rate (default: 0.02)
         big_mutation: Large mutation factor (default: 20)
-        initial_population: Pre-generated population (default: None, generates random)
+        initial_population: Pre-generated population, list of Individu or Population (default: None, generates random)
+        nb_threads: Cores used to score each generation (default: None, all available)
+        seed: Seed of the numpy Generator driving the operators (default: None)
+        compact: Evolve the 10-pair canonical genome instead of the 16 dinucleotides;
+                 reverse complements are only rebuilt in the returned tables (default: False)
+        backend: Fitness backend scoring the generations, e.g. a
+                 utils.distributed.Coordinator (default: None, this process)
+        steady_state: Insert offspring as soon as they are scored instead of
+                      by generations, see SteadyStateOptimizer (default: False)
+        replacement: Steady-state insertion policy, "worst" or "tournament" (default: "worst")
+        cache: FitnessCache shared by the generations, and by several runs if
+               reused (default: None, every table is scored)
+        refine_every: Memetic refinement of the elites with bounded L-BFGS on
+                      the analytic gradient every refine_every generations (default: None, never)
+        refine_elites: Number of elites refined (default: 1)
+        refine_iter: L-BFGS iterations per refined elite (default: 20)
+        target_score: Stop once the best score is at or below it (default: None)
+        patience: Stop when the last patience generations improved the best
+                  score by at most rel_tol, relatively (default: None)
+        rel_tol: Relative improvement tolerance of patience (default: 0.0)
+        min_diversity: Stop when the population diversity, in reference SDs,
+                       falls below it (see Population.diversity, default: None)
+        max_evaluations: Stop after that many scored individuals (default: None)
+        max_seconds: Stop after that many wall-clock seconds (default: None)
     
     Returns:
-        tuple: (best_individuals_per_gen, best_scores, worst_scores)
+        RunResults: (best_individuals_per_gen, best_scores, worst_scores), with
+        the reason the run stopped in its stop_reason attribute (see stopping.STOP_REASONS)
     """
-    rot_table = json_load(open(filename))
-    global str_data,Rot_data, nb_cut, nbappend, big_mut, beta
-    str_data = dna_seq
-    Rot_data = rot_table
-    nb_cut = nb_cuts
-    nbappend = nb_append 
-    beta = beta_reproduction
-    big_mut = big_mutation
-
-    if initial_population is not None : 
-        Population = copy.deepcopy(initial_population)
-        for ind in Population:
-            ind.score = ind.fit()
+    settings = dict(poisson=poisson, nb_cuts=nb_cuts, nb_append=nb_append, recuit=recuit,
+                    beta_reproduction=beta_reproduction, mutrate=mutrate, big_mutation=big_mutation,
+                    nb_threads=nb_threads, seed=seed, compact=compact, backend=backend,
+                    cache=cache, refine_every=refine_every, refine_elites=refine_elites, refine_iter=refine_iter,
+                    stopping=EarlyStopping.from_settings(target_score, patience, rel_tol, min_diversity,
+                                                         max_evaluations, max_seconds))
+    if steady_state:
+        optimizer = SteadyStateOptimizer(filename, dna_seq, nb_individus, taux_selec, selection_type,
+                                         replacement=replacement, **settings)
     else:
-        Population = generate_pop(nb_individus, filename, dna_seq, nb_cuts, nb_append)
-
-    Best_indiv_list = [min(Population)]
-    Best_indiv_score_list = [Best_indiv_list[0].score]
-    worst_indiv_score_list = [max(Population).score]
-
-    for i in range(nb_generations):
-        print("itération :", i+1, "/", nb_generations)
-        if poisson: # si l'on s'est mit en mode processur aléatoire de poisson, on aura une nombre de géniteurs suivant une loi de Poisson(taux_selec*nb_indiv) (on prendra le max avec 2, pour avoir assez de géniteurs)
-            if recuit:
-                Geniteurs = selection(Population,max(2,np.random.poisson(taux_selec*nb_individus))/nb_individus,selection_type, n=i)
-            else:
-                Geniteurs = selection(Population,max(2,np.random.poisson(taux_selec*nb_individus))/nb_individus,selection_type)
-        else:
-            if recuit:
-                Geniteurs = selection(Population,taux_selec,selection_type, n=i)
-            else:
-                Geniteurs = selection(Population,taux_selec,selection_type)
-        A =[Geniteurs[k].score for k in range(len(Geniteurs))]
-        print("fit : ", np.sum(A))
-        Population = Geniteurs.copy()
-        while len(Population) < nb_individus:
-            individu = random.choice(Geniteurs)+random.choice(Geniteurs)
-            individu.mutation(mutrate*(1-i/nb_generations),(1-i/nb_generations)*0.5)  
-            Population.append(individu)
-        best_indiv = min(Population)
-        worst_indiv = max(Population)
-        print(f"Meilleur pour iter {i+1} : {best_indiv.score}")
-        print(f"Pire pour iter {i+1} : {worst_indiv.score}")
-        Best_indiv_list.append(best_indiv)
-        Best_indiv_score_list.append(best_indiv.score)
-        worst_indiv_score_list.append(worst_indiv.score)
-
-    return Best_indiv_list,Best_indiv_score_list,worst_indiv_score_list
\ No newline at end of file
+        optimizer = Optimizer(filename, dna_seq, nb_individus, taux_selec, selection_type, **settings)
+    set_globals(optimizer.context)
+    return optimizer.run(nb_generations, initial_population)
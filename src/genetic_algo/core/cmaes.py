@@ -0,0 +1,179 @@
+import numpy as np
+
+import genetic_algo.core.population as population
+from genetic_algo.core.optimizer import RunContext
+from genetic_algo.dna.RotTable import CANONICAL_KEYS
+
+
+class CMAES:
+    """
+    Covariance matrix adaptation evolution strategy (CMA-ES, rank-one and
+    rank-mu updates with cumulative step-size adaptation) on the compact
+    genome: the twist/wedge/direction values of the canonical pairs, the
+    only ones the score reads. Values with a zero reference SD (the
+    directions of table.json) cannot move and are left out of the search.
+
+    The search runs in reference units z = (x - ref_mean) / ref_sd, so the
+    bounds of the mutations (ref_mean ± ref_sd) are the box [-1, 1]^dim:
+    sampled points are clipped to it before being scored, and the clipped
+    points drive the updates. Every generation is scored with one call to
+    the run's RunContext (batched fitness, or its backend / cache).
+
+    Same interface as Optimizer: initialize(), step(), results(), run().
+    """
+
+    def __init__(self, ref_table, dna_seq, nb_individus = None, nb_cuts = 0, nb_append = 1, sigma0 = 0.3,
+                 nb_threads = None, seed = None, verbose = True, backend = None, cache = None):
+        """
+        Args:
+            ref_table: Reference rotation table, or path to its JSON file
+            dna_seq: DNA sequence to optimize (string or EncodedSeq)
+            nb_individus: Offspring per generation, lambda (default: None, 4 + 3 ln(dim))
+            sigma0: Initial step size, in reference SDs (default: 0.3)
+            Others: see Optimizer
+        """
+        self.context = RunContext(ref_table, dna_seq, nb_cuts, nb_append, nb_workers=nb_threads, seed=seed,
+                                  compact=True, backend=backend, cache=cache)
+        self.ref_mean, self.ref_sd = population.reference_bounds(self.context.ref_table, CANONICAL_KEYS)
+        self.free = np.flatnonzero(self.ref_sd.ravel() > 0)
+        self.dim = len(self.free)
+        self.nb_individus = nb_individus or 4 + int(3*np.log(self.dim))
+        self.sigma0 = sigma0
+        self.verbose = verbose
+
+        # Strategy parameters (Hansen, The CMA Evolution Strategy: A Tutorial)
+        n, mu = self.dim, self.nb_individus // 2
+        weights = np.log((self.nb_individus + 1)/2) - np.log(np.arange(1, mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1/np.sum(self.weights**2)
+        self.cc = (4 + self.mueff/n) / (n + 4 + 2*self.mueff/n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2*(self.mueff - 2 + 1/self.mueff) / ((n + 2)**2 + self.mueff))
+        self.damps = 1 + 2*max(0, np.sqrt((self.mueff - 1)/(n + 1)) - 1) + self.cs
+        self.chiN = np.sqrt(n) * (1 - 1/(4*n) + 1/(21*n**2))
+
+        self.population = None
+        self.best_list = []
+        self.best_scores = []
+        self.worst_scores = []
+
+    def _log(self, *args):
+        if self.verbose:
+            print(*args)
+
+    def _to_params(self, z):
+        """(K, dim) reference units -> (K, 10, 3) compact parameters."""
+        params = np.tile(self.ref_mean.ravel(), (len(z), 1))
+        params[:, self.free] += np.asarray(z) * self.ref_sd.ravel()[self.free]
+        return params.reshape(len(z), len(CANONICAL_KEYS), 3)
+
+    def _to_z(self, params):
+        """(K, 10, 3) compact parameters -> (K, dim) reference units."""
+        params = np.asarray(params).reshape(len(params), -1)
+        return (params[:, self.free] - self.ref_mean.ravel()[self.free]) / self.ref_sd.ravel()[self.free]
+
+    def _record(self, pop):
+        """Appends the best individual so far and the best / worst scores of the generation."""
+        i = pop.best()
+        if not self.best_scores or pop.scores[i] < self.best_scores[-1]:
+            best = pop.individu(i, self.context)
+        else:
+            best = self.best_list[-1]
+        self.best_list.append(best)
+        self.best_scores.append(best.score)
+        self.worst_scores.append(pop.scores[pop.worst()])
+
+    def initialize(self, initial_population = None):
+        """
+        Starts from the reference table, or from the best individual of
+        initial_population (Population or list of Individu, rescored).
+        """
+        ctx = self.context
+        if initial_population is not None:
+            start = ctx.population(initial_population)
+            start.evaluate(ctx.score_params)
+            self.mean = np.clip(self._to_z(start.params[start.best()][None])[0], -1, 1)
+        else:
+            start = population.Population(self.ref_mean[None], ctx.ref_table, compact=True)
+            start.evaluate(ctx.score_params)
+            self.mean = np.zeros(self.dim)
+        self.sigma = self.sigma0
+        self.C = np.eye(self.dim)
+        self.B = np.eye(self.dim)
+        self.D = np.ones(self.dim)
+        self.pc = np.zeros(self.dim)
+        self.ps = np.zeros(self.dim)
+        self.nb_updates = 0
+        self.population = start
+        self.best_list, self.best_scores, self.worst_scores = [], [], []
+        self._record(start)
+
+    def step(self, i: int, nb_generations: int):
+        """Generation i: samples nb_individus points, scores them in one call and adapts the distribution."""
+        ctx, n = self.context, self.dim
+        self._log("itération :", i+1, "/", nb_generations)
+        y = ctx.rng.standard_normal((self.nb_individus, n)) @ (self.B * self.D).T
+        z = np.clip(self.mean + self.sigma*y, -1, 1)
+        y = (z - self.mean) / self.sigma
+
+        pop = population.Population(self._to_params(z), ctx.ref_table, compact=True)
+        pop.evaluate(ctx.score_params)
+        order = np.argsort(pop.scores, kind="stable")[:len(self.weights)]
+        y_w = self.weights @ y[order]
+        self.mean = self.mean + self.sigma*y_w
+
+        # Cumulation paths, covariance and step-size updates
+        self.nb_updates += 1
+        C_inv_sqrt = (self.B / self.D) @ self.B.T
+        self.ps = (1 - self.cs)*self.ps + np.sqrt(self.cs*(2 - self.cs)*self.mueff) * (C_inv_sqrt @ y_w)
+        ps_norm = np.linalg.norm(self.ps) / np.sqrt(1 - (1 - self.cs)**(2*self.nb_updates))
+        hsig = ps_norm / self.chiN < 1.4 + 2/(n + 1)
+        self.pc = (1 - self.cc)*self.pc + hsig*np.sqrt(self.cc*(2 - self.cc)*self.mueff) * y_w
+        rank_mu = (y[order].T * self.weights) @ y[order]
+        self.C = ((1 - self.c1 - self.cmu + (1 - hsig)*self.c1*self.cc*(2 - self.cc)) * self.C
+                  + self.c1*np.outer(self.pc, self.pc) + self.cmu*rank_mu)
+        self.sigma *= np.exp((self.cs/self.damps) * (ps_norm/self.chiN - 1))
+
+        self.C = (self.C + self.C.T)/2
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+        self.population = pop
+        self._record(pop)
+        self._log(f"Meilleur pour iter {i+1} : {self.best_scores[-1]}")
+        self._log(f"Pire pour iter {i+1} : {self.worst_scores[-1]}")
+
+    def results(self) -> tuple:
+        """(best_individuals_per_gen, best_scores, worst_scores) so far."""
+        return self.best_list, self.best_scores, self.worst_scores
+
+    def run(self, nb_generations: int, initial_population = None) -> tuple:
+        self.initialize(initial_population)
+        for i in range(nb_generations):
+            self.step(i, nb_generations)
+        return self.results()
+
+
+def AlgoCMAES(filename: str, dna_seq, nb_generations, nb_individus = None, nb_cuts = 0, nb_append = 1,
+              sigma0 = 0.3, initial_population = None, nb_threads = None, seed = None, backend = None, cache = None):
+    """
+    CMA-ES counterpart of AlgoGenetique (see CMAES).
+
+    Args:
+        filename: Path to reference rotation table JSON
+        dna_seq: DNA sequence to optimize (string or EncodedSeq)
+        nb_generations: Number of generations
+        nb_individus: Offspring per generation (default: None, 4 + 3 ln(dim))
+        sigma0: Initial step size, in reference SDs (default: 0.3)
+        initial_population: Start from its best individual (default: None, the reference table)
+        Others: see AlgoGenetique
+
+    Returns:
+        tuple: (best_individuals_per_gen, best_scores, worst_scores), the
+        best being the best individual found so far and the worst the worst
+        of the generation
+    """
+    optimizer = CMAES(filename, dna_seq, nb_individus, nb_cuts, nb_append, sigma0, nb_threads, seed,
+                      backend=backend, cache=cache)
+    return optimizer.run(nb_generations, initial_population)
@@ -0,0 +1,154 @@
+import numpy as np
+
+from genetic_algo.core.optimizer import RunContext
+
+# Mutation strategies of differential_mutation
+DE_STRATEGIES = ("rand/1/bin", "current-to-best/1")
+
+
+def distinct_indices(nb_individus: int, k: int, rng) -> np.ndarray:
+    """
+    (nb_individus, k) random indices, distinct within each row and never
+    equal to the row number, drawn for the whole population at once in
+    O(nb_individus * k): row i gets (i + offsets) % nb_individus with
+    offsets drawn in 1..nb_individus-1, and only the rows whose offsets
+    collide are drawn again.
+    """
+    if nb_individus <= k:
+        raise ValueError(f"Differential evolution needs more than {k} individuals")
+    offsets = rng.integers(1, nb_individus, size=(nb_individus, k))
+    while True:
+        ordered = np.sort(offsets, axis=1)
+        collide = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if len(collide) == 0:
+            break
+        offsets[collide] = rng.integers(1, nb_individus, size=(len(collide), k))
+    return (np.arange(nb_individus)[:, None] + offsets) % nb_individus
+
+def differential_mutation(params, scores, F, strategy, rng) -> np.ndarray:
+    """
+    Mutant vectors of a whole (P, G, 3) population:
+        rand/1/bin:        v_i = x_r1 + F (x_r2 - x_r3)
+        current-to-best/1: v_i = x_i + F (x_best - x_i) + F (x_r1 - x_r2)
+    """
+    r = distinct_indices(len(params), 3, rng)
+    if strategy == "rand/1/bin":
+        return params[r[:, 0]] + F*(params[r[:, 1]] - params[r[:, 2]])
+    if strategy == "current-to-best/1":
+        best = params[np.argmin(scores)]
+        return params + F*(best - params) + F*(params[r[:, 0]] - params[r[:, 1]])
+    raise ValueError(f"Unknown differential evolution strategy '{strategy}'")
+
+def binomial_crossover(params, mutants, CR, rng) -> np.ndarray:
+    """Trial vectors: every value taken from the mutant with probability CR, at least one per individual."""
+    P = len(params)
+    take = rng.random(params.shape) < CR
+    forced = rng.integers(params[0].size, size=P)
+    take.reshape(P, -1)[np.arange(P), forced] = True
+    return np.where(take, mutants, params)
+
+
+class DifferentialEvolution:
+    """
+    Differential evolution on the population array: each generation builds
+    a trial vector for every individual at once (differential_mutation,
+    then binomial_crossover), clips it to ref_mean ± ref_sd like the
+    mutations of the GA, scores all trials with one RunContext call and
+    keeps, individual by individual, the better of the target and its trial.
+
+    Same interface as Optimizer: initialize(), step(), results(), run().
+    """
+
+    def __init__(self, ref_table, dna_seq, nb_individus, strategy = "rand/1/bin", F = 0.5, CR = 0.9,
+                 nb_cuts = 0, nb_append = 1, nb_threads = None, seed = None, compact = False, verbose = True,
+                 backend = None, cache = None):
+        """
+        Args:
+            ref_table: Reference rotation table, or path to its JSON file
+            dna_seq: DNA sequence to optimize (string or EncodedSeq)
+            nb_individus: Population size (at least 4)
+            strategy: "rand/1/bin" or "current-to-best/1" (default: "rand/1/bin")
+            F: Differential weight (default: 0.5)
+            CR: Crossover probability (default: 0.9)
+            Others: see Optimizer
+        """
+        if strategy not in DE_STRATEGIES:
+            raise ValueError(f"Unknown differential evolution strategy '{strategy}'")
+        self.context = RunContext(ref_table, dna_seq, nb_cuts, nb_append, nb_workers=nb_threads, seed=seed,
+                                  compact=compact, backend=backend, cache=cache)
+        self.nb_individus = nb_individus
+        self.strategy = strategy
+        self.F = F
+        self.CR = CR
+        self.verbose = verbose
+        self.population = None
+        self.best_list = []
+        self.best_scores = []
+        self.worst_scores = []
+
+    def _log(self, *args):
+        if self.verbose:
+            print(*args)
+
+    def _record(self):
+        """Appends the best individual and the best / worst scores of the population."""
+        best = self.population.individu(self.population.best(), self.context)
+        self.best_list.append(best)
+        self.best_scores.append(best.score)
+        self.worst_scores.append(self.population.scores[self.population.worst()])
+
+    def initialize(self, initial_population = None):
+        """Builds and scores the starting population (see RunContext.population)."""
+        self.population = self.context.population(initial_population, self.nb_individus)
+        self.population.evaluate(self.context.score_params)
+        self.best_list, self.best_scores, self.worst_scores = [], [], []
+        self._record()
+
+    def step(self, i: int, nb_generations: int):
+        """Generation i: mutation, crossover and one-to-one selection over the whole population."""
+        ctx, pop = self.context, self.population
+        self._log("itération :", i+1, "/", nb_generations)
+        mutants = differential_mutation(pop.params, pop.scores, self.F, self.strategy, ctx.rng)
+        trials = np.clip(binomial_crossover(pop.params, mutants, self.CR, ctx.rng),
+                         pop.ref_mean - pop.ref_sd, pop.ref_mean + pop.ref_sd)
+        trial_scores = ctx.score_params(trials)
+        better = trial_scores <= pop.scores
+        pop.params[better] = trials[better]
+        pop.scores[better] = trial_scores[better]
+        self._record()
+        self._log(f"Meilleur pour iter {i+1} : {self.best_scores[-1]}")
+        self._log(f"Pire pour iter {i+1} : {self.worst_scores[-1]}")
+
+    def results(self) -> tuple:
+        """(best_individuals_per_gen, best_scores, worst_scores) so far."""
+        return self.best_list, self.best_scores, self.worst_scores
+
+    def run(self, nb_generations: int, initial_population = None) -> tuple:
+        self.initialize(initial_population)
+        for i in range(nb_generations):
+            self.step(i, nb_generations)
+        return self.results()
+
+
+def AlgoDE(filename: str, dna_seq, nb_individus, nb_generations, strategy = "rand/1/bin", F = 0.5, CR = 0.9,
+           nb_cuts = 0, nb_append = 1, initial_population = None, nb_threads = None, seed = None, compact = False,
+           backend = None, cache = None):
+    """
+    Differential evolution counterpart of AlgoGenetique (see DifferentialEvolution).
+
+    Args:
+        filename: Path to reference rotation table JSON
+        dna_seq: DNA sequence to optimize (string or EncodedSeq)
+        nb_individus: Population size (at least 4)
+        nb_generations: Number of generations
+        strategy: "rand/1/bin" or "current-to-best/1" (default: "rand/1/bin")
+        F: Differential weight (default: 0.5)
+        CR: Crossover probability (default: 0.9)
+        Others: see AlgoGenetique
+
+    Returns:
+        tuple: (best_individuals_per_gen, best_scores, worst_scores)
+    """
+    optimizer = DifferentialEvolution(filename, dna_seq, nb_individus, strategy, F, CR, nb_cuts, nb_append,
+                                      nb_threads, seed, compact, backend=backend, cache=cache)
+    return optimizer.run(nb_generations, initial_population)
@@ -1,6 +1,16 @@
 import numpy as np
-from genetic_algo.dna.RotTable import RotTable
-from genetic_algo.dna.Traj3D import Traj3D
+from contextlib import contextmanager
+from genetic_algo.dna.RotTable import RotTable, DINUC_KEYS, expand_params
+from genetic_algo.dna.Traj3D import Traj3D, fast_prefix_points, fast_compute_loop, fast_boundary_loop, fast_kmer_table, fast_kmer_prefix_points, fast_chunked_prefix_points
+from genetic_algo.dna.Traj3D import fast_closure_grad, step_matrices, step_matrices_grad, _CANON_IDX, _BANK_IDX
+from genetic_algo.dna.EncodedSeq import EncodedSeq, as_encoded
+
+from numba import jit, prange, config as numba_config, set_num_threads, get_num_threads
+
+# Bytes of k-mer lookup tables allowed in memory at once (one per thread)
+KMER_TABLE_BUDGET = 64 * 2**20
+# Minimum walk length (blocks) of a chunk when one evaluation is split over threads
+CHUNK_MIN_OPS = 4096
 
 
 def dist_df(coords: list, nbappend = 1):
@@ -44,7 +54,7 @@ def dist_euclid(scores: list) -> float:
     return np.linalg.norm(scores)
 
 
-def fitness(rot_table: RotTable, seq: str, fct_poids = dist_df, nbappend = 2, nbcuts = 2, coup_combin = dist_euclid) -> float :
+def fitness(rot_table: RotTable, seq, fct_poids = dist_df, nbappend = 2, nbcuts = 2, coup_combin = dist_euclid, nb_workers = None) -> float :
     """
     Fitness function to evaluate the quality of a DNA sequence.
     
@@ -53,11 +63,12 @@ def fitness(rot_table: RotTable, seq: str, fct_poids = dist_df, nbappend = 2, nb
     
     Args:
         rot_table: Rotation table for calculating the 3D trajectory of the DNA.
-        seq: DNA sequence to be evaluated (character string).
+        seq: DNA sequence to be evaluated (character string or EncodedSeq).
         fct_weight: Function for calculating the weight/score for a trajectory (default: dist_df).
         nbappend: Number of nodes to add at the end to test closure (default: 2)
         nbcuts: Number of cut points to test (default: 2)
         coup_combin: Function to combine the scores of the different cuts (default: dist_euclid)
+        nb_workers: Threads sharing the walk of a long sequence (default: None, all available cores)
     
     Returns:
         Fitness score (the lower the score, the better the closure)
@@ -65,33 +76,301 @@ def fitness(rot_table: RotTable, seq: str, fct_poids = dist_df, nbappend = 2, nb
     Note:
         The method tests several circular rotations of the sequence to evaluate
         the overall stability of the circular DNA structure.
+        With the default dist_df, every cut is scored from a single pass over
+        the sequence (see cut_distances).
     """
+    seq = as_encoded(seq)
     nbases = len(seq)
     assert nbases >= nbappend
     traj = Traj3D()
 
-    def eval_une_coupure(seq: str, nbappend: int, indcut: int):
+    list_coupes = seq.cut_offsets(nbcuts, nbappend)[0]
+    matrices_db = traj.compute_matrices_db(rot_table)
+
+    if fct_poids is dist_df and list_coupes[-1] + nbappend <= nbases:
+        return coup_combin(list(cut_distances(seq, matrices_db, nbcuts, nbappend, nb_workers=nb_workers)))
+
+    def eval_une_coupure(seq: EncodedSeq, nbappend: int, indcut: int):
         """
         Evaluates the closure score for a given cut site.
         Args:
-            seq: DNA sequence
+            seq: Encoded DNA sequence
             nbappend: Number of nodes to add
             indcut: Cut site index
         
         Returns:
             Closure score for this cut
         """
-        traj.compute(seq[indcut:]+seq[:indcut+nbappend], rot_table)
-        coords = traj.getTraj()
+        dinuc_seq = seq.rotated(indcut, nbappend)
+        if fct_poids is dist_df:
+            coords = fast_boundary_loop(dinuc_seq, matrices_db, nbappend)
+        else:
+            coords = fast_compute_loop(dinuc_seq, matrices_db)
         score = fct_poids(coords,nbappend)
         return score
-    
-    list_coupes = [i*int(np.floor(nbases/(nbcuts+1))) for i in range(nbcuts+1)]
 
     score = coup_combin([eval_une_coupure(seq, nbappend, index) for index in list_coupes])
 
     return score
 
+def cut_distances(seq: EncodedSeq, matrices_db, nbcuts = 0, nbappend = 1, kmer = None, nb_workers = 1):
+    """
+    Closure distance (dist_df) of every cut, from one pass over the sequence.
+
+    With G_k the product of the first k step matrices of the circular sequence
+    and t_k its translation, the trajectory cut at c is G_c^-1 G_{c+i}. Its
+    start node i and end node N+i therefore differ by
+    R_c^T (t_{c+i} - t_{c+N+i}), and since G_{N+k} = G_N G_k this has the norm
+    of (R_N - I) t_{c+i} + t_N. Only the prefix points at c+i and the closure
+    transform G_N are needed, whatever the number of cuts.
+
+    Args:
+        seq: Encoded DNA sequence
+        matrices_db: (16, 4, 4) step matrices (see Traj3D.compute_matrices_db)
+        nbcuts: Number of cut points, each cut c satisfying c + nbappend <= len(seq)
+        nbappend: Number of nodes compared between the start and end (default: 1)
+        kmer: Block length of the walk (default: None, see choose_kmer)
+        nb_workers: Threads sharing the walk (default: 1, see nb_chunks_auto)
+
+    Returns:
+        Array of closure distances, one per cut
+    """
+    list_coupes, positions, inverse, _ = seq.cut_offsets(nbcuts, nbappend)
+    kmer = choose_kmer(len(seq)) if kmer is None else kmer
+    nb_chunks = nb_chunks_auto(len(seq)//kmer, nb_workers)
+    if nb_chunks > 1:
+        ops, marks = seq.kmer_walk(kmer, nbcuts, nbappend)
+        with numba_threads(nb_chunks):
+            points, closure = fast_chunked_prefix_points(ops, marks, fast_kmer_table(matrices_db, kmer), nb_chunks)
+    elif kmer > 1:
+        ops, marks = seq.kmer_walk(kmer, nbcuts, nbappend)
+        points, closure = fast_kmer_prefix_points(ops, marks, fast_kmer_table(matrices_db, kmer))
+    else:
+        points, closure = fast_prefix_points(seq.dinuc, matrices_db, positions)
+
+    diff = points @ (closure[:3, :3] - np.eye(3)).T + closure[:3, 3]
+    distsq = np.sum(diff**2, axis=1)[inverse].reshape(len(list_coupes), nbappend)
+    return np.sqrt(distsq.sum(axis=1))
+
+@jit(nopython=True, cache=True)
+def closure_distsq(points, closure, weights):
+    """Weighted sum of the squared dist_df terms |(R_N - I) t + t_N|² (see cut_distances)."""
+    distsq = 0.0
+    for k in range(len(points)):
+        for r in range(3):
+            d = closure[r, 3] - points[k, r]
+            for c in range(3):
+                d += closure[r, c] * points[k, c]
+            distsq += weights[k] * d * d
+    return distsq
+
+@jit(nopython=True, nogil=True, cache=True)
+def fast_batch_scores(dinuc_seq, matrices_batch, positions, weights):
+    """
+    Compiled population loop: one single-pass walk (fast_prefix_points) per
+    individual, reduced to the dist_euclid of the dist_df of every cut.
+    weights holds how many (cut, node) pairs share each prefix position.
+    Releases the GIL, so that evaluations submitted from several threads
+    run concurrently (see SteadyStateOptimizer).
+    """
+    P = matrices_batch.shape[0]
+    scores = np.zeros(P)
+
+    for p in range(P):
+        points, closure = fast_prefix_points(dinuc_seq, matrices_batch[p], positions)
+        scores[p] = np.sqrt(closure_distsq(points, closure, weights))
+
+    return scores
+
+@jit(nopython=True, parallel=True, cache=True)
+def fast_batch_scores_parallel(dinuc_seq, matrices_batch, positions, weights):
+    """Multi-core fast_batch_scores: individuals are spread over threads."""
+    P = matrices_batch.shape[0]
+    scores = np.zeros(P)
+
+    for p in prange(P):
+        points, closure = fast_prefix_points(dinuc_seq, matrices_batch[p], positions)
+        scores[p] = np.sqrt(closure_distsq(points, closure, weights))
+
+    return scores
+
+@jit(nopython=True, nogil=True, cache=True)
+def fast_batch_scores_kmer(ops, marks, matrices_batch, k, weights):
+    """fast_batch_scores walking k steps at a time through a per-individual k-mer table."""
+    P = matrices_batch.shape[0]
+    scores = np.zeros(P)
+
+    for p in range(P):
+        table = fast_kmer_table(matrices_batch[p], k)
+        points, closure = fast_kmer_prefix_points(ops, marks, table)
+        scores[p] = np.sqrt(closure_distsq(points, closure, weights))
+
+    return scores
+
+@jit(nopython=True, parallel=True, cache=True)
+def fast_batch_scores_kmer_parallel(ops, marks, matrices_batch, k, weights):
+    """Multi-core fast_batch_scores_kmer: individuals are spread over threads."""
+    P = matrices_batch.shape[0]
+    scores = np.zeros(P)
+
+    for p in prange(P):
+        table = fast_kmer_table(matrices_batch[p], k)
+        points, closure = fast_kmer_prefix_points(ops, marks, table)
+        scores[p] = np.sqrt(closure_distsq(points, closure, weights))
+
+    return scores
+
+@contextmanager
+def numba_threads(nb_threads: int):
+    """Runs the enclosed parallel kernels on nb_threads threads, then restores the caller's count."""
+    previous = get_num_threads()
+    set_num_threads(nb_threads)
+    try:
+        yield
+    finally:
+        set_num_threads(previous)
+
+def nb_workers_auto(nb_individus: int, nb_workers = None) -> int:
+    """
+    Number of threads used to score nb_individus individuals: every core
+    numba can use (NUMBA_NUM_THREADS), unless nb_workers overrides it.
+    """
+    if nb_workers is None:
+        nb_workers = numba_config.NUMBA_NUM_THREADS
+    return max(1, min(int(nb_workers), numba_config.NUMBA_NUM_THREADS, nb_individus))
+
+def nb_chunks_auto(nb_ops: int, nb_workers = None) -> int:
+    """
+    Number of chunks a single walk of nb_ops blocks is split into: one per
+    thread, as long as each chunk keeps at least CHUNK_MIN_OPS blocks.
+    """
+    return max(1, min(nb_workers_auto(nb_ops, nb_workers), nb_ops // CHUNK_MIN_OPS))
+
+def choose_kmer(nbases: int, nb_individus = 1, nb_workers = None) -> int:
+    """
+    Block length k of the k-mer walk (1 = plain step-by-step walk).
+
+    Each individual pays about (4^(k+2) - 16)/3 matrix products to fill its
+    table and nbases/k to walk the sequence: k minimizes the sum, as long as
+    the tables of the threads scoring the population together fit in
+    KMER_TABLE_BUDGET.
+    """
+    nb_tables = nb_workers_auto(nb_individus, nb_workers)
+    best_k, best_cost = 1, nbases
+    k = 2
+    while nb_tables * (4**(k+2) - 16)//3 * 128 <= KMER_TABLE_BUDGET:
+        cost = nbases/k + (4**(k+2) - 16)//3 - 16
+        if cost >= best_cost:
+            break
+        best_k, best_cost = k, cost
+        k += 1
+    return best_k
+
+def fitness_batch(params: np.ndarray, seq, nbappend = 2, nbcuts = 2, nb_workers = None, kmer = None) -> np.ndarray:
+    """
+    Population version of fitness (with the default dist_df / dist_euclid).
+
+    Args:
+        params: (P, 16, 3) twist/wedge/direction values in DINUC_KEYS order
+                (see RotTable.getParams), or the (P, 10, 3) canonical genome
+        seq: DNA sequence to be evaluated (character string or EncodedSeq).
+        nbappend: Number of nodes to add at the end to test closure (default: 2)
+        nbcuts: Number of cut points to test (default: 2)
+        nb_workers: Number of threads (default: None, all available cores)
+        kmer: Block length of the walk (default: None, see choose_kmer)
+
+    With fewer individuals than threads (small populations on long
+    sequences), the threads split the walk of each individual instead
+    (see nb_chunks_auto and Traj3D.fast_chunked_prefix_points).
+
+    Returns:
+        (P,) array of fitness scores (the lower the score, the better the closure)
+    """
+    seq = as_encoded(seq)
+    nbases = len(seq)
+    assert nbases >= nbappend
+    params = np.asarray(params, dtype=float)
+
+    list_coupes, positions, _, counts = seq.cut_offsets(nbcuts, nbappend)
+
+    if list_coupes[-1] + nbappend > nbases:
+        if params.shape[1] != 16:
+            params = expand_params(params)
+        return np.array([fitness(RotTable({XY: list(p[k]) for k, XY in enumerate(DINUC_KEYS)}), seq, nbappend=nbappend, nbcuts=nbcuts) for p in params])
+
+    matrices_batch = Traj3D.compute_matrices_batch(params)
+
+    nb_threads = nb_workers_auto(nbases, nb_workers)
+    nb_workers = nb_workers_auto(len(params), nb_workers)
+    kmer = choose_kmer(nbases, len(params), nb_workers) if kmer is None else kmer
+
+    # Fewer individuals than threads: the threads share the walk of each one
+    nb_chunks = nb_chunks_auto(nbases//kmer, nb_threads) if len(params) < nb_threads else 1
+    if nb_chunks > 1:
+        ops, marks = seq.kmer_walk(kmer, nbcuts, nbappend)
+        scores = np.zeros(len(params))
+        with numba_threads(nb_chunks):
+            for p, matrices_db in enumerate(matrices_batch):
+                points, closure = fast_chunked_prefix_points(ops, marks, fast_kmer_table(matrices_db, kmer), nb_chunks)
+                scores[p] = np.sqrt(closure_distsq(points, closure, counts))
+        return scores
+
+    if kmer > 1:
+        ops, marks = seq.kmer_walk(kmer, nbcuts, nbappend)
+        if nb_workers == 1:
+            return fast_batch_scores_kmer(ops, marks, matrices_batch, kmer, counts)
+        with numba_threads(nb_workers):
+            return fast_batch_scores_kmer_parallel(ops, marks, matrices_batch, kmer, counts)
+
+    if nb_workers == 1:
+        return fast_batch_scores(seq.dinuc, matrices_batch, positions, counts)
+    with numba_threads(nb_workers):
+        return fast_batch_scores_parallel(seq.dinuc, matrices_batch, positions, counts)
+
+def fitness_grad(params: np.ndarray, seq, nbappend = 2, nbcuts = 2):
+    """
+    Fitness scores and their analytic gradients (see Traj3D.fast_closure_grad),
+    for one extra pass over the sequence per individual.
+
+    Only the canonical pairs set the step matrices (see compute_matrices_batch):
+    the gradient of their reverse complements is zero in the 16-pair layout.
+
+    Args:
+        params: (P, 16, 3) or compact (P, 10, 3) twist/wedge/direction values (degrees)
+        seq, nbappend, nbcuts: See fitness_batch
+
+    Returns:
+        tuple: ((P,) scores, (P, G, 3) gradients per degree, in the layout of params)
+
+    Raises:
+        ValueError: If a cut does not fit in the sequence (c + nbappend > len(seq))
+    """
+    seq = as_encoded(seq)
+    params = np.asarray(params, dtype=float)
+    list_coupes, positions, _, counts = seq.cut_offsets(nbcuts, nbappend)
+    if list_coupes[-1] + nbappend > len(seq):
+        raise ValueError("The gradient needs every cut to fit in the sequence (c + nbappend <= len(seq))")
+
+    canonical = params if params.shape[1] == len(_CANON_IDX) else params[:, _CANON_IDX]
+    bank = step_matrices(canonical)
+    bank_grad = step_matrices_grad(canonical)[..., :3, :]
+
+    scores = np.zeros(len(params))
+    grads = np.zeros(canonical.shape)
+    for p in range(len(params)):
+        distsq, adjoint = fast_closure_grad(seq.dinuc, bank[p][_BANK_IDX], positions, counts)
+        scores[p] = np.sqrt(distsq)
+        if scores[p] > 0:
+            canonical_adjoint = np.zeros((len(_CANON_IDX), 3, 4))
+            np.add.at(canonical_adjoint, _BANK_IDX, adjoint)
+            grads[p] = np.einsum("grc,gjrc->gj", canonical_adjoint, bank_grad[p]) / (2*scores[p])
+
+    if params.shape[1] == len(_CANON_IDX):
+        return scores, grads
+    full = np.zeros(params.shape)
+    full[:, _CANON_IDX] = grads
+    return scores, full
+
 def fitness_basic(rot_table:RotTable, seq: str):
     return fitness(rot_table,seq,nbcuts=0)
 
@@ -0,0 +1,127 @@
+import os
+import pickle
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from genetic_algo.dna.RotTable import compact_params
+from genetic_algo.dna.EncodedSeq import as_encoded
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness scores.
+
+    An entry is keyed on the sequence (EncodedSeq.seq_id), nbcuts, nbappend
+    and a digest of the canonical (10, 3) parameters quantized to
+    resolution: tables closer than resolution share their score. The
+    reverse complements, which the score never reads, are left out of the
+    key, so 16-gene tables differing only there share an entry, as do the
+    two genome layouts.
+
+    The cache is thread-safe (steady-state runs score from several threads)
+    and can be persisted across runs with save() / path: keys hold the
+    sequence, so one file can serve several sequences.
+
+    hits, misses: Number of scores served from the cache / computed (a
+                  block repeated within one call is computed once)
+    """
+
+    def __init__(self, max_size: int = 100_000, resolution: float = 1e-6, path = None):
+        """
+        Args:
+            max_size: Maximum number of entries, least recently used dropped first (default: 100000)
+            resolution: Quantization step of the parameters, in degrees (default: 1e-6)
+            path: File the cache is loaded from if it exists, and saved to by save() (default: None)
+        """
+        self.max_size = max_size
+        self.resolution = resolution
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def keys(self, params, seq, nbcuts: int, nbappend: int) -> list:
+        """Cache keys of a (K, G, 3) parameter block."""
+        params = np.asarray(params, dtype=float)
+        if params.shape[1] == 16:
+            params = compact_params(params)
+        quantized = np.round(params / self.resolution).astype(np.int64)
+        prefix = (as_encoded(seq).seq_id, nbcuts, nbappend)
+        return [prefix + (hashlib.blake2b(block.tobytes(), digest_size=16).digest(),) for block in quantized]
+
+    def score_params(self, params, seq, nbcuts: int, nbappend: int, scorer) -> np.ndarray:
+        """
+        Scores of a (K, G, 3) parameter block: cached ones are served, the
+        others are computed with a single scorer(params) call and stored.
+        """
+        keys = self.keys(params, seq, nbcuts, nbappend)
+        scores = np.full(len(keys), np.nan)
+        with self._lock:
+            for i, key in enumerate(keys):
+                score = self._entries.get(key)
+                if score is not None:
+                    self._entries.move_to_end(key)
+                    scores[i] = score
+        # Duplicates of a block (e.g. identical offspring) are scored once
+        missing = {}
+        for i in np.flatnonzero(np.isnan(scores)):
+            missing.setdefault(keys[i], []).append(i)
+        if missing:
+            first = [indices[0] for indices in missing.values()]
+            for indices, score in zip(missing.values(), scorer(np.asarray(params)[first])):
+                scores[indices] = score
+        with self._lock:
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+            for key, indices in missing.items():
+                self._entries[key] = float(scores[indices[0]])
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return scores
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def save(self, path = None):
+        """Writes the entries (most recently used last) to path, or to the cache's own path."""
+        path = self.path if path is None else path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with self._lock:
+            payload = {"resolution": self.resolution, "genome": "canonical", "entries": list(self._entries.items())}
+        with open(path, "wb") as f:
+            pickle.dump(payload, f)
+
+    def load(self, path):
+        """
+        Adds the entries saved in path. Raises ValueError if they were
+        quantized with another resolution, or keyed on all 16 genes (files
+        saved before the keys dropped the reverse complements).
+        """
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("genome") != "canonical":
+            raise ValueError(f"Cache '{path}' is keyed on the 16 genes: its entries cannot be matched")
+        if payload["resolution"] != self.resolution:
+            raise ValueError(f"Cache '{path}' was saved with resolution {payload['resolution']}, not {self.resolution}")
+        with self._lock:
+            self._entries.update(payload["entries"])
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -0,0 +1,184 @@
+import os
+import multiprocessing
+import numpy as np
+from json import load as json_load
+
+from genetic_algo.dna.EncodedSeq import EncodedSeq, as_encoded
+from genetic_algo.core.optimizer import Optimizer, RunContext
+
+
+# =============================================================================
+# MIGRATION TOPOLOGIES
+# =============================================================================
+
+def migration_targets(topology, nb_islands: int, rng = None) -> list:
+    """
+    Destinations of the emigrants of every island for one migration.
+
+    Args:
+        topology: "ring" (i -> i+1), "full" (i -> every other island),
+                  "random" (i -> one other island drawn at each migration),
+                  or an explicit list of destination lists, one per island
+        nb_islands: Number of islands
+        rng: numpy Generator for the "random" topology
+
+    Returns:
+        list: targets[i] = destinations of island i
+    """
+    if not isinstance(topology, str):
+        targets = [list(dest) for dest in topology]
+        if len(targets) != nb_islands:
+            raise ValueError(f"Topology gives destinations for {len(targets)} islands instead of {nb_islands}")
+        return targets
+    if nb_islands < 2:
+        return [[] for _ in range(nb_islands)]
+    if topology == "ring":
+        return [[(i + 1) % nb_islands] for i in range(nb_islands)]
+    if topology == "full":
+        return [[j for j in range(nb_islands) if j != i] for i in range(nb_islands)]
+    if topology == "random":
+        rng = np.random.default_rng() if rng is None else rng
+        draws = rng.integers(nb_islands - 1, size=nb_islands)
+        return [[int(d + (d >= i))] for i, d in enumerate(draws)]
+    raise ValueError(f"Unknown migration topology '{topology}'")
+
+
+# =============================================================================
+# ISLAND PROCESSES
+# =============================================================================
+
+def _island(conn, ref_table, bases, config, seed, nb_generations):
+    """
+    Island process: one Optimizer driven by the commands received on conn.
+
+    Commands are (start, stop, immigrants): the immigrants (params, scores)
+    replace the worst individuals, then generations start..stop-1 are run.
+    The answer is (elites (params, scores), best individuals, best scores,
+    worst scores) of those generations. None stops the island.
+    """
+    nb_migrants = config.pop("nb_migrants")
+    opt = Optimizer(ref_table, EncodedSeq.from_codes(bases), seed=seed, verbose=False, **config)
+    opt.initialize()
+    conn.send(opt.results())
+    opt.best_list, opt.best_scores, opt.worst_scores = [], [], []
+    while True:
+        command = conn.recv()
+        if command is None:
+            break
+        start, stop, immigrants = command
+        if immigrants is not None:
+            opt.population.replace_worst(*immigrants)
+        for i in range(start, stop):
+            opt.step(i, nb_generations)
+        elites = opt.population.elites(nb_migrants)
+        conn.send(((elites.params, elites.scores),) + opt.results())
+        opt.best_list, opt.best_scores, opt.worst_scores = [], [], []
+    conn.close()
+
+
+def AlgoIslands(filename: str, dna_seq, nb_islands, nb_individus, nb_generations, taux_selec, selection_type,
+                migration_interval = 10, nb_migrants = 2, topology = "ring", poisson = False, nb_cuts = 0,
+                nb_append = 1, recuit = False, beta_reproduction = 0.7, mutrate = 0.02, big_mutation = 20,
+                nb_threads = None, seed = None, compact = False):
+    """
+    Island-model genetic algorithm: nb_islands sub-populations evolving in
+    separate processes, exchanging their elites every migration_interval
+    generations.
+
+    Each island runs an Optimizer (see AlgoGenetique) with its own
+    selection type and random stream; its nb_migrants best individuals
+    replace the worst ones of its destinations (see migration_targets).
+
+    Args:
+        filename: Path to reference rotation table JSON
+        dna_seq: DNA sequence to optimize (string or EncodedSeq)
+        nb_islands: Number of sub-populations (one process each)
+        nb_individus: Population size of every island
+        selection_type: Selection type of every island, or list of one per island
+        migration_interval: Generations between two migrations (default: 10)
+        nb_migrants: Elites sent by every island at each migration (default: 2)
+        topology: Migration topology, see migration_targets (default: "ring")
+        nb_threads: Scoring threads per island (default: None, cores / nb_islands)
+        seed: Seed of the islands' generators and of the random topology (default: None)
+        Others: see AlgoGenetique
+
+    Returns:
+        tuple: (best_individuals_per_gen, best_scores, worst_scores) over
+        all the islands
+    """
+    rot_table = json_load(open(filename))
+    seq = as_encoded(dna_seq)
+    if isinstance(selection_type, str):
+        selection_type = [selection_type] * nb_islands
+    if len(selection_type) != nb_islands:
+        raise ValueError(f"{len(selection_type)} selection types given for {nb_islands} islands")
+    if nb_threads is None:
+        nb_threads = max(1, (os.cpu_count() or 1) // nb_islands)
+    seeds = np.random.SeedSequence(seed).spawn(nb_islands + 1)
+    rng = np.random.default_rng(seeds[-1])
+
+    context = multiprocessing.get_context("spawn")
+    conns, islands = [], []
+    try:
+        for k in range(nb_islands):
+            config = dict(nb_individus=nb_individus, taux_selec=taux_selec, selection_type=selection_type[k],
+                          poisson=poisson, nb_cuts=nb_cuts, nb_append=nb_append, recuit=recuit,
+                          beta_reproduction=beta_reproduction, mutrate=mutrate, big_mutation=big_mutation,
+                          nb_threads=nb_threads, compact=compact, nb_migrants=nb_migrants)
+            parent, child = context.Pipe()
+            island = context.Process(target=_island, args=(child, rot_table, seq.bases, config, seeds[k], nb_generations),
+                                     daemon=True)
+            island.start()
+            child.close()
+            conns.append(parent)
+            islands.append(island)
+
+        histories = [_receive(conn) for conn in conns]
+        immigrants = [None] * nb_islands
+        for start in range(0, nb_generations, migration_interval):
+            stop = min(start + migration_interval, nb_generations)
+            print("générations :", start+1, "-", stop, "/", nb_generations)
+            for conn, arrivals in zip(conns, immigrants):
+                conn.send((start, stop, arrivals))
+            answers = [_receive(conn) for conn in conns]
+            for history, (_, bests, best_scores, worst_scores) in zip(histories, answers):
+                history[0].extend(bests)
+                history[1].extend(best_scores)
+                history[2].extend(worst_scores)
+            print(f"Meilleur pour iter {stop} : {min(history[1][-1] for history in histories)}")
+
+            immigrants = [None] * nb_islands
+            for k, destinations in enumerate(migration_targets(topology, nb_islands, rng)):
+                params, scores = answers[k][0]
+                for dest in destinations:
+                    if immigrants[dest] is None:
+                        immigrants[dest] = (params, scores)
+                    else:
+                        immigrants[dest] = (np.concatenate([immigrants[dest][0], params]),
+                                            np.concatenate([immigrants[dest][1], scores]))
+        for conn in conns:
+            conn.send(None)
+    finally:
+        for island in islands:
+            island.join(timeout=10)
+            if island.is_alive():
+                island.terminate()
+        for conn in conns:
+            conn.close()
+
+    # Individuals lose their context when pickled back: they score against this run
+    run_context = RunContext(rot_table, seq, nb_cuts, nb_append, beta_reproduction, big_mutation, nb_threads, rng, compact)
+    best = [int(np.argmin([history[1][g] for history in histories])) for g in range(nb_generations + 1)]
+    best_list = [histories[k][0][g] for g, k in enumerate(best)]
+    for ind in best_list:
+        ind.context = run_context
+    return (best_list,
+            [histories[k][1][g] for g, k in enumerate(best)],
+            [max(history[2][g] for history in histories) for g in range(nb_generations + 1)])
+
+def _receive(conn):
+    """Next answer of an island; a dead island raises RuntimeError instead of blocking."""
+    try:
+        return conn.recv()
+    except EOFError:
+        raise RuntimeError("An island process died") from None
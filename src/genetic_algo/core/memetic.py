@@ -0,0 +1,46 @@
+import numpy as np
+from scipy.optimize import minimize
+
+from genetic_algo.core.fitness import fitness_grad
+from genetic_algo.dna.Traj3D import _CANON_IDX
+
+
+def refine_params(params, seq, ref_mean, ref_sd, nbappend = 2, nbcuts = 2, maxiter = 20):
+    """
+    Memetic local search: bounded L-BFGS (scipy L-BFGS-B) descent of each
+    individual on the analytic gradient of its score (see fitness_grad),
+    within ref_mean ± ref_sd like the mutations.
+
+    Only the canonical pairs move in the 16-pair layout: their reverse
+    complements never reach the score.
+
+    Args:
+        params: (K, G, 3) parameters of the individuals to refine
+        seq: DNA sequence (string or EncodedSeq)
+        ref_mean, ref_sd: (G, 3) reference values and SDs (see Population)
+        nbappend, nbcuts: Fitness settings
+        maxiter: L-BFGS iterations per individual (default: 20)
+
+    Returns:
+        tuple: ((K, G, 3) refined parameters, (K,) scores, number of
+        score-and-gradient evaluations)
+    """
+    params = np.array(params, dtype=float)
+    rows = slice(None) if params.shape[1] == len(_CANON_IDX) else _CANON_IDX
+    low, high = (ref_mean - ref_sd)[rows], (ref_mean + ref_sd)[rows]
+    bounds = list(zip(low.ravel(), high.ravel()))
+
+    scores = np.zeros(len(params))
+    nb_evaluations = 0
+    for p, individual in enumerate(params):
+        def score_and_grad(x):
+            individual[rows] = x.reshape(low.shape)
+            score, grad = fitness_grad(individual[None], seq, nbappend, nbcuts)
+            return score[0], grad[0][rows].ravel()
+
+        x0 = np.clip(individual[rows], low, high).ravel()
+        res = minimize(score_and_grad, x0, jac=True, method="L-BFGS-B", bounds=bounds, options={"maxiter": maxiter})
+        individual[rows] = res.x.reshape(low.shape)
+        scores[p] = res.fun
+        nb_evaluations += res.nfev
+    return params, scores, nb_evaluations
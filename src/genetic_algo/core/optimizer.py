@@ -0,0 +1,377 @@
+import os
+import threading
+import numpy as np
+from json import load as json_load
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import genetic_algo.dna.RotTable as RotTable
+from genetic_algo.dna.EncodedSeq import as_encoded
+from genetic_algo.core.fitness import fitness, fitness_batch
+from genetic_algo.core.selection import select_indices
+import genetic_algo.core.population as population
+from genetic_algo.core.memetic import refine_params
+
+
+class RunContext:
+    """
+    Everything an optimization run reads: sequence, reference table,
+    fitness and operator settings, random generator.
+
+    Individuals and populations of a run score against their own context,
+    so that several runs can share a process (threads, asyncio tasks, the
+    Streamlit server) without going through module globals.
+
+    seq: EncodedSeq of the sequence (see as_encoded)
+    ref_table: Reference rotation table (JSON layout)
+    ref_bounds: (ref_mean, ref_sd) of ref_table, in DINUC_KEYS order
+    nb_cuts, nb_append: Fitness settings (see fitness_batch)
+    beta, big_mut: Crossover mixing coefficient and large mutation factor
+    nb_workers: Scoring threads (None: all available cores)
+    rng: numpy Generator driving the operators
+    compact: Evolve the 10-pair canonical genome
+    backend: Fitness backend, any object with score_params(params, seq, nbcuts, nbappend)
+             (e.g. utils.distributed.Coordinator); None scores with fitness_batch in this process
+    cache: FitnessCache serving the scores of already evaluated tables (None: no cache)
+    nb_evaluations: Number of individuals scored through score_params so far
+    """
+
+    def __init__(self, ref_table, dna_seq, nb_cuts = 0, nb_append = 1, beta = 0.7, big_mut = 20,
+                 nb_workers = None, seed = None, compact = False, backend = None, cache = None):
+        if isinstance(ref_table, str):
+            ref_table = json_load(open(ref_table))
+        self.seq = as_encoded(dna_seq)
+        self.str_seq = dna_seq if isinstance(dna_seq, str) else self.seq.seq
+        self.ref_table = ref_table
+        self.ref_bounds = population.reference_bounds(ref_table)
+        self.nb_cuts = nb_cuts
+        self.nb_append = nb_append
+        self.beta = beta
+        self.big_mut = big_mut
+        self.nb_workers = nb_workers
+        self.rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        self.compact = compact
+        self.backend = backend
+        self.cache = cache
+        self.nb_evaluations = 0
+        self._count_lock = threading.Lock()
+
+    def score_params(self, params) -> np.ndarray:
+        """Scores a (K, G, 3) parameter block with a single batched fitness call."""
+        with self._count_lock:
+            self.nb_evaluations += len(params)
+        if self.cache is not None:
+            return self.cache.score_params(params, self.seq, self.nb_cuts, self.nb_append, self._score_params)
+        return self._score_params(params)
+
+    def _score_params(self, params) -> np.ndarray:
+        if self.backend is not None:
+            return self.backend.score_params(params, self.seq, self.nb_cuts, self.nb_append)
+        return fitness_batch(params, self.seq, nbappend=self.nb_append, nbcuts=self.nb_cuts, nb_workers=self.nb_workers)
+
+    def score_table(self, rot_table) -> float:
+        """Fitness of one RotTable."""
+        return fitness(rot_table, self.seq, nbcuts=self.nb_cuts, nbappend=self.nb_append)
+
+    def population(self, initial_population = None, nb_individus = None):
+        """
+        Population of this run: a copy of initial_population (Population or
+        list of Individu, rescored against this context), or nb_individus
+        random individuals.
+        """
+        if isinstance(initial_population, population.Population):
+            params = np.array(initial_population.full_params())
+            return population.Population(RotTable.compact_params(params) if self.compact else params,
+                                         self.ref_table, compact=self.compact)
+        if initial_population is not None:
+            pop = population.Population.from_individus(initial_population, self.ref_table, self.compact)
+            pop.scores[:] = np.nan
+            return pop
+        return population.Population.random(nb_individus, self.ref_table, self.rng, self.compact)
+
+
+class RunResults(tuple):
+    """
+    (best_individuals_per_gen, best_scores, worst_scores) of a run, which
+    unpacks like the plain triple, with the reason the run stopped in
+    stop_reason (see stopping.STOP_REASONS, None while it runs).
+    """
+
+    def __new__(cls, best_list, best_scores, worst_scores, stop_reason = None):
+        results = super().__new__(cls, (best_list, best_scores, worst_scores))
+        results.stop_reason = stop_reason
+        return results
+
+    def __reduce__(self):
+        return (RunResults, (*self, self.stop_reason))
+
+
+class Optimizer:
+    """
+    Re-entrant genetic algorithm (see AlgoGenetique, which wraps it).
+
+    All the state of a run lives in the optimizer and its RunContext:
+    independent optimizers can run concurrently in one process.
+
+    Usage:
+        opt = Optimizer(table, dna_seq, nb_individus=50, taux_selec=0.5, selection_type="elitiste")
+        best_list, best_scores, worst_scores = opt.run(100)
+    or generation by generation with initialize() and step().
+    """
+
+    def __init__(self, ref_table, dna_seq, nb_individus, taux_selec, selection_type: str,
+                 poisson = False, nb_cuts = 0, nb_append = 1, recuit = False, beta_reproduction = 0.7,
+                 mutrate = 0.02, big_mutation = 20, nb_threads = None, seed = None, compact = False,
+                 verbose = True, backend = None, cache = None, refine_every = None, refine_elites = 1,
+                 refine_iter = 20, stopping = None):
+        """
+        Args:
+            ref_table: Reference rotation table, or path to its JSON file
+            dna_seq: DNA sequence to optimize (string or pre-encoded EncodedSeq)
+            Others: see AlgoGenetique
+            verbose: Print the progress of every generation (default: True)
+            backend: Fitness backend (see RunContext, default: None, local scoring)
+            cache: FitnessCache (see RunContext, default: None)
+            refine_every: Refine the elites with L-BFGS every refine_every
+                          generations, see refine (default: None, never)
+            refine_elites: Number of elites refined (default: 1)
+            refine_iter: L-BFGS iterations per elite (default: 20)
+            stopping: EarlyStopping criteria checked after every generation
+                      (default: None, run every generation)
+        """
+        self.context = RunContext(ref_table, dna_seq, nb_cuts, nb_append, beta_reproduction, big_mutation,
+                                  nb_threads, seed, compact, backend, cache)
+        self.nb_individus = nb_individus
+        self.taux_selec = taux_selec
+        self.selection_type = selection_type
+        self.poisson = poisson
+        self.recuit = recuit
+        self.mutrate = mutrate
+        self.verbose = verbose
+        self.refine_every = refine_every
+        self.refine_elites = refine_elites
+        self.refine_iter = refine_iter
+        self.nb_refine_evaluations = 0
+        self.stopping = stopping
+        self.stop_reason = None
+        self.population = None
+        self.best_list = []
+        self.best_scores = []
+        self.worst_scores = []
+
+    def _log(self, *args):
+        if self.verbose:
+            print(*args)
+
+    def _record(self):
+        """Appends the best individual and the best / worst scores of the population."""
+        best = self.population.individu(self.population.best(), self.context)
+        self.best_list.append(best)
+        self.best_scores.append(best.score)
+        self.worst_scores.append(self.population.scores[self.population.worst()])
+
+    def initialize(self, initial_population = None):
+        """Builds and scores the starting population (see RunContext.population)."""
+        self.population = self.context.population(initial_population, self.nb_individus)
+        self.population.evaluate(self.context.score_params)
+        self.best_list, self.best_scores, self.worst_scores = [], [], []
+        self.stop_reason = None
+        self._record()
+
+    def check_stop(self):
+        """First stopping criterion met by the run so far, or None (see EarlyStopping.check)."""
+        if self.stopping is None:
+            return None
+        return self.stopping.check(self.best_scores, self.population,
+                                   self.context.nb_evaluations + self.nb_refine_evaluations)
+
+    def refine(self, i: int):
+        """
+        Memetic step after generation i (0-based): every refine_every
+        generations, the refine_elites best individuals are replaced by
+        their L-BFGS refinement (see memetic.refine_params). The score and
+        gradient evaluations are counted in nb_refine_evaluations.
+        """
+        if not self.refine_every or (i + 1) % self.refine_every:
+            return
+        ctx, pop = self.context, self.population
+        elites = np.argsort(pop.scores, kind="stable")[:self.refine_elites]
+        params, scores, nb_evaluations = refine_params(pop.params[elites], ctx.seq, pop.ref_mean, pop.ref_sd,
+                                                       ctx.nb_append, ctx.nb_cuts, self.refine_iter)
+        better = scores < pop.scores[elites]
+        pop.params[elites[better]] = params[better]
+        pop.scores[elites[better]] = scores[better]
+        self.nb_refine_evaluations += nb_evaluations
+
+    def step(self, i: int, nb_generations: int):
+        """
+        Generation i (0-based) out of nb_generations: selection → crossover
+        → mutation → replacement, the mutation decreasing with i/nb_generations.
+        """
+        ctx, rng, nb_individus = self.context, self.context.rng, self.nb_individus
+        self._log("itération :", i+1, "/", nb_generations)
+        if self.poisson: # nombre de géniteurs suivant une loi de Poisson(taux_selec*nb_indiv), au moins 2
+            taux = max(2, rng.poisson(self.taux_selec*nb_individus))/nb_individus
+        else:
+            taux = self.taux_selec
+        n = i if self.recuit else None
+        Geniteurs = self.population.take(select_indices(self.population.scores, taux, self.selection_type, n=n, rng=rng))
+        self._log("fit : ", np.sum(Geniteurs.scores))
+        nb_enfants = max(0, nb_individus - len(Geniteurs))
+        peres = rng.integers(len(Geniteurs), size=nb_enfants)
+        meres = rng.integers(len(Geniteurs), size=nb_enfants)
+        enfants = population.crossover_params(Geniteurs.params[peres], Geniteurs.params[meres],
+                                              Geniteurs.scores[peres], Geniteurs.scores[meres], ctx.beta, rng)
+        enfants = population.mutate_params(enfants, self.mutrate*(1-i/nb_generations), (1-i/nb_generations)*0.5,
+                                           Geniteurs.ref_mean, Geniteurs.ref_sd, ctx.big_mut, rng)
+        self.population = Geniteurs.concat(Geniteurs._new(enfants, np.full(nb_enfants, np.nan)))
+        self.population.evaluate(ctx.score_params)
+        self.refine(i)
+        self._record()
+        self._log(f"Meilleur pour iter {i+1} : {self.best_scores[-1]}")
+        self._log(f"Pire pour iter {i+1} : {self.worst_scores[-1]}")
+
+    def results(self) -> RunResults:
+        """(best_individuals_per_gen, best_scores, worst_scores) so far, with stop_reason."""
+        return RunResults(self.best_list, self.best_scores, self.worst_scores, self.stop_reason)
+
+    def run(self, nb_generations: int, initial_population = None) -> RunResults:
+        """
+        Initializes then evolves nb_generations generations, or fewer when
+        a stopping criterion is met; returns results().
+        """
+        if self.stopping is not None:
+            self.stopping.start()
+        self.initialize(initial_population)
+        for i in range(nb_generations):
+            self.stop_reason = self.check_stop()
+            if self.stop_reason is not None:
+                self._log(f"Arrêt à l'itération {i} : {self.stop_reason}")
+                break
+            self.step(i, nb_generations)
+        else:
+            self.stop_reason = "nb_generations"
+        return self.results()
+
+
+class SteadyStateOptimizer(Optimizer):
+    """
+    Steady-state (asynchronous) genetic algorithm.
+
+    Instead of waiting for a whole generation, offspring are bred and
+    submitted to the fitness backend as soon as an evaluation slot frees
+    up, and every scored child is inserted into the population on its
+    own, with one of the replacement policies:
+        "worst": the child replaces the worst individual if it is better
+        "tournament": the child replaces the worst of tournament_size
+                      random individuals if it is better
+    A slow evaluation then only holds its own slot.
+
+    A "generation" is a checkpoint every evaluations_per_gen evaluations,
+    the number of offspring scored by one generation of Optimizer
+    (nb_individus minus the parents kept), so that the results have the
+    same length and scale as those of AlgoGenetique.
+    """
+
+    def __init__(self, ref_table, dna_seq, nb_individus, taux_selec, selection_type: str,
+                 replacement = "worst", tournament_size = 2, nb_pending = None, batch_size = 1, **kwargs):
+        """
+        Args:
+            replacement: Insertion policy, "worst" or "tournament" (default: "worst")
+            tournament_size: Individuals drawn by the tournament replacement (default: 2)
+            nb_pending: Evaluations in flight (default: None, the backend's
+                        workers, or one per core when scoring locally)
+            batch_size: Offspring per submitted evaluation (default: 1)
+            Others: see Optimizer; scoring locally without nb_threads, each
+            evaluation uses a single thread
+        """
+        if replacement not in ("worst", "tournament"):
+            raise ValueError(f"Unknown replacement policy '{replacement}'")
+        super().__init__(ref_table, dna_seq, nb_individus, taux_selec, selection_type, **kwargs)
+        backend = self.context.backend
+        if backend is None and kwargs.get("nb_threads") is None:
+            self.context.nb_workers = 1
+        if nb_pending is None:
+            nb_pending = getattr(backend, "nb_workers", 0) if backend is not None else 0
+            nb_pending = nb_pending or os.cpu_count() or 1
+        self.replacement = replacement
+        self.tournament_size = tournament_size
+        self.nb_pending = nb_pending
+        self.batch_size = batch_size
+        self.evaluations_per_gen = max(1, nb_individus - int(nb_individus*taux_selec))
+
+    def breed(self, nb_enfants: int, progress: float, n = None):
+        """
+        (nb_enfants, G, 3) offspring of parents selected in the current
+        population, the mutation decreasing with progress (0 to 1).
+        """
+        ctx, rng, pop = self.context, self.context.rng, self.population
+        if self.poisson:
+            taux = max(2, rng.poisson(self.taux_selec*len(pop)))/len(pop)
+        else:
+            taux = self.taux_selec
+        geniteurs = select_indices(pop.scores, taux, self.selection_type, n=n, rng=rng)
+        peres = geniteurs[rng.integers(len(geniteurs), size=nb_enfants)]
+        meres = geniteurs[rng.integers(len(geniteurs), size=nb_enfants)]
+        enfants = population.crossover_params(pop.params[peres], pop.params[meres],
+                                              pop.scores[peres], pop.scores[meres], ctx.beta, rng)
+        return population.mutate_params(enfants, self.mutrate*(1-progress), (1-progress)*0.5,
+                                        pop.ref_mean, pop.ref_sd, ctx.big_mut, rng)
+
+    def insert(self, params, scores):
+        """Inserts scored offspring one by one with the replacement policy."""
+        pop, rng = self.population, self.context.rng
+        for child, score in zip(params, scores):
+            if self.replacement == "worst":
+                target = pop.worst()
+            else:
+                drawn = rng.integers(len(pop), size=self.tournament_size)
+                target = int(drawn[np.argmax(pop.scores[drawn])])
+            if score < pop.scores[target]:
+                pop.params[target] = child
+                pop.scores[target] = score
+
+    def run(self, nb_generations: int, initial_population = None) -> RunResults:
+        """
+        Initializes, then scores nb_generations * evaluations_per_gen
+        offspring, recording results() at every checkpoint. The stopping
+        criteria are checked at the checkpoints; when one is met, the
+        evaluations still in flight are dropped without being waited for.
+        """
+        if self.stopping is not None:
+            self.stopping.start()
+        self.initialize(initial_population)
+        self.stop_reason = self.check_stop()
+        total = nb_generations * self.evaluations_per_gen
+        submitted = evaluated = 0
+        pending = {}
+        executor = ThreadPoolExecutor(self.nb_pending)
+        try:
+            while evaluated < total and self.stop_reason is None:
+                while len(pending) < self.nb_pending and submitted < total:
+                    nb_enfants = min(self.batch_size, total - submitted)
+                    checkpoint = submitted // self.evaluations_per_gen
+                    enfants = self.breed(nb_enfants, submitted/total, checkpoint if self.recuit else None)
+                    pending[executor.submit(self.context.score_params, enfants)] = enfants
+                    submitted += nb_enfants
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    enfants = pending.pop(future)
+                    self.insert(enfants, future.result())
+                    before = evaluated // self.evaluations_per_gen
+                    evaluated += len(enfants)
+                    for checkpoint in range(before, evaluated // self.evaluations_per_gen):
+                        self.refine(checkpoint)
+                        self._record()
+                        self._log(f"Meilleur pour iter {checkpoint+1} : {self.best_scores[-1]}")
+                        if checkpoint + 1 < nb_generations:
+                            self.stop_reason = self.check_stop()
+                        if self.stop_reason is not None:
+                            self._log(f"Arrêt à l'itération {checkpoint+1} : {self.stop_reason}")
+                            break
+                    if self.stop_reason is not None:
+                        break
+        finally:
+            # A complete run has nothing in flight; a stopped one does not wait for its evaluations
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.stop_reason = self.stop_reason or "nb_generations"
+        return self.results()
@@ -0,0 +1,191 @@
+import numpy as np
+from genetic_algo.dna.RotTable import RotTable, DINUC_KEYS, CANONICAL_KEYS, expand_params
+
+# Generator used by the operators when no seeded one is given
+_rng = np.random.default_rng()
+
+
+def reference_bounds(ref_table: dict, keys = DINUC_KEYS):
+    """(G, 3) reference values and (G, 3) SDs of ref_table, in keys order."""
+    ref_mean = np.array([ref_table[XY][:3] for XY in keys], dtype=float)
+    ref_sd = np.array([ref_table[XY][3:6] for XY in keys], dtype=float)
+    return ref_mean, ref_sd
+
+
+class Population:
+    """
+    Array-backed (structure-of-arrays) population.
+
+    params: (P, G, 3) contiguous twist/wedge/direction block, G = 16 genes in
+            DINUC_KEYS order, or G = 10 in CANONICAL_KEYS order (compact genome)
+    scores: (P,) fitness scores, NaN while an individual is not evaluated
+    ref_mean, ref_sd: (G, 3) reference values and SDs, shared by the population
+
+    The compact genome drops the reverse complements, which Traj3D never
+    reads: they are only rebuilt when exporting a table (see table).
+    """
+
+    def __init__(self, params, ref_table: dict, scores = None, compact = False):
+        self.compact = compact
+        self.keys = CANONICAL_KEYS if compact else DINUC_KEYS
+        self.params = np.ascontiguousarray(params, dtype=float).reshape(-1, len(self.keys), 3)
+        self.ref_table = ref_table
+        self.ref_mean, self.ref_sd = reference_bounds(ref_table, self.keys)
+        if scores is None:
+            self.scores = np.full(len(self.params), np.nan)
+        else:
+            self.scores = np.array(scores, dtype=float).reshape(len(self.params))
+
+    @classmethod
+    def random(cls, nb_individus: int, ref_table: dict, rng = None, compact = False):
+        """Reference table with every parameter perturbed uniformly within ±SD."""
+        rng = _rng if rng is None else rng
+        pop = cls(np.zeros((nb_individus, 10 if compact else 16, 3)), ref_table, compact=compact)
+        pop.params[:] = pop.ref_mean + rng.uniform(-1, 1, pop.params.shape) * pop.ref_sd
+        return pop
+
+    @classmethod
+    def from_individus(cls, individus, ref_table: dict, compact = False):
+        """Packs a list of Individu (or any object with Rot_table / score)."""
+        params = np.array([ind.Rot_table.getParams(compact) for ind in individus])
+        scores = [np.nan if getattr(ind, "dirty", False) else ind.score for ind in individus]
+        return cls(params, ref_table, scores, compact)
+
+    def __len__(self) -> int:
+        return len(self.params)
+
+    def _new(self, params, scores):
+        """Population sharing this one's reference table and bounds."""
+        pop = Population.__new__(Population)
+        pop.params = np.ascontiguousarray(params)
+        pop.scores = scores
+        pop.compact = self.compact
+        pop.keys = self.keys
+        pop.ref_table = self.ref_table
+        pop.ref_mean = self.ref_mean
+        pop.ref_sd = self.ref_sd
+        return pop
+
+    def take(self, indices):
+        """Sub-population gathered from an index array (duplicates allowed)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return self._new(self.params[indices], self.scores[indices])
+
+    def concat(self, other):
+        """This population followed by the individuals of other."""
+        return self._new(np.concatenate([self.params, other.params]), np.concatenate([self.scores, other.scores]))
+
+    @property
+    def dirty(self) -> np.ndarray:
+        """Mask of the individuals still to evaluate."""
+        return np.isnan(self.scores)
+
+    def evaluate(self, scorer):
+        """
+        Scores the dirty individuals with one call to scorer, which maps a
+        (K, G, 3) parameter block to a (K,) score array (e.g. fitness_batch).
+        """
+        idx = np.flatnonzero(self.dirty)
+        if len(idx):
+            self.scores[idx] = scorer(self.params[idx])
+
+    def elites(self, k: int):
+        """Sub-population of the k best individuals, best first."""
+        return self.take(np.argsort(self.scores, kind="stable")[:k])
+
+    def replace_worst(self, params, scores):
+        """Overwrites the worst individuals, in place, with the given (K, G, 3) parameters and scores."""
+        params = np.asarray(params, dtype=float).reshape(-1, *self.params.shape[1:])
+        worst = np.argsort(self.scores, kind="stable")[::-1][:len(params)]
+        self.params[worst] = params[:len(worst)]
+        self.scores[worst] = np.asarray(scores, dtype=float)[:len(worst)]
+
+    def diversity(self) -> float:
+        """
+        Mean SD of the parameters across the population, in reference SDs
+        (the parameters with a zero reference SD are left out).
+        """
+        free = self.ref_sd > 0
+        if len(self.params) < 2 or not free.any():
+            return 0.0
+        return float(np.mean(self.params.std(axis=0)[free] / self.ref_sd[free]))
+
+    def best(self) -> int:
+        return int(np.argmin(self.scores))
+
+    def worst(self) -> int:
+        return int(np.argmax(self.scores))
+
+    ###################
+    # VIEWS           #
+    ###################
+    def full_params(self) -> np.ndarray:
+        """(P, 16, 3) parameters, expanding the compact genome if needed."""
+        return expand_params(self.params) if self.compact else self.params
+
+    def table(self, i: int) -> dict:
+        """Rotation table (JSON layout, with the reference SDs) of individual i."""
+        params = expand_params(self.params[i]) if self.compact else self.params[i]
+        return {XY: list(params[k]) + list(self.ref_table[XY][3:]) for k, XY in enumerate(DINUC_KEYS)}
+
+    def rot_table(self, i: int) -> RotTable:
+        return RotTable(self.table(i))
+
+    def individu(self, i: int, context = None):
+        """Individu view of individual i (scoring against context), for the plotting and saving code."""
+        from genetic_algo.core.algogenetique import Individu
+        score = None if np.isnan(self.scores[i]) else float(self.scores[i])
+        return Individu(self.table(i), score, context)
+
+    def individus(self, context = None) -> list:
+        return [self.individu(i, context) for i in range(len(self))]
+
+
+def crossover_params(parents1, parents2, scores1, scores2, beta = 1, rng = None):
+    """
+    Weighted crossover of paired parents (see Individu.__add__), vectorized
+    over the whole generation.
+
+    Every gene takes the mix alpha*p1 + (1-alpha)*p2 (alpha = o_score/(s_score+o_score),
+    so the better parent weighs more), blended with beta against p1 with
+    probability alpha and against p2 otherwise.
+
+    Args:
+        parents1, parents2: (K, G, 3) parameters of the paired parents
+        scores1, scores2: (K,) parent scores
+        beta: Mixing coefficient (beta_reproduction)
+        rng: numpy.random.Generator (default: module generator)
+
+    Returns:
+        (K, G, 3) offspring parameters
+    """
+    rng = _rng if rng is None else rng
+    scores1 = np.asarray(scores1, dtype=float)
+    scores2 = np.asarray(scores2, dtype=float)
+    total = scores1 + scores2
+    positive = (scores1 > 0) | (scores2 > 0)
+    alpha = np.where(positive, scores2/np.where(positive, total, 1), 0.5)[:, None, None]
+
+    mix = alpha*parents1 + (1-alpha)*parents2
+    keep_1 = rng.random(np.shape(parents1)) < alpha
+    return mix*beta + (1-beta)*np.where(keep_1, parents1, parents2)
+
+def mutate_params(params, mutrate, sigma, ref_mean, ref_sd, big_mut = 2, rng = None):
+    """
+    Mutated copy of a (K, G, 3) parameter block (see Individu.mutation):
+    frequent small and rare large gaussian mutations drawn with vectorized
+    masks, clipped to ref_mean ± ref_sd.
+    """
+    rng = _rng if rng is None else rng
+    params = np.array(params, dtype=float)
+    if not 0 <= mutrate <= 1:
+        return params
+    low, high = ref_mean - ref_sd, ref_mean + ref_sd
+
+    petites = rng.random(params.shape) < mutrate  #petites mutations fréquentes
+    tamp = params + rng.normal(0, 1, params.shape) * sigma*ref_sd
+    params = np.where(petites, np.clip(tamp, low, high), params)
+
+    grosses = rng.random(params.shape) < mutrate/big_mut # grosses mutations rares
+    tamp = params + rng.normal(0, 1, params.shape) * sigma*np.sqrt(np.sqrt(big_mut))*ref_sd
+    return np.where(grosses, np.clip(tamp, low, high), params)
@@ -1,203 +1,257 @@
-import random
 import numpy as np
 
+# Generator used by the strategies when no seeded one is given
+_rng = np.random.default_rng()
+
+# =============================================================================
+# INDEX STRATEGIES (score array -> parent indices)
+# =============================================================================
+
+def _roulette(weights, k, rng):
+    """
+    k draws with replacement, proportional to weights (cumulative weights +
+    searchsorted). Like random.choices, raises ValueError when the total
+    weight is not positive and finite, and clips to the last index.
+    """
+    cum_weights = np.cumsum(weights, dtype=float)
+    total = cum_weights[-1] if len(cum_weights) else 0.0
+    if not np.isfinite(total):
+        raise ValueError("Total of weights must be finite")
+    if total <= 0:
+        raise ValueError("Total of weights must be greater than zero")
+    draws = np.searchsorted(cum_weights, rng.random(k) * total, side="right")
+    return np.minimum(draws, len(cum_weights) - 1).astype(np.int64)
+
+def _duels(scores, k, rng):
+    """k random pairs of distinct individuals and their uniform draws q."""
+    n = len(scores)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    first = rng.integers(n, size=k)
+    second = (first + rng.integers(1, n, size=k)) % n
+    q = rng.random(k)
+    return first, second, q
+
+def indices_elitiste(scores, taux_selec, rng = None):
+    """Indices of the int(n*taux_selec) best scores, best first."""
+    scores = np.asarray(scores, dtype=float)
+    k = int(len(scores)*taux_selec)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        best = np.argpartition(scores, k-1)[:k]
+    else:
+        best = np.arange(len(scores))
+    return best[np.argsort(scores[best], kind="stable")].astype(np.int64)
+
+def indices_tournament(scores, taux_selec, p = 0.001, rng = None):
+    """Winners of int(n*taux_selec) duels; the worst of the pair wins with probability p."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    k = int(len(scores)*taux_selec)
+    first, second, q = _duels(scores, k, rng)
+    s0, s1 = scores[first], scores[second]
+    second_wins = ((s0 >= s1) & (q > p)) | ((s0 <= s1) & (q <= p))
+    return np.where(second_wins, second, first).astype(np.int64)
+
+def indices_tournament_elitiste(scores, taux_selec, p = 0.001, rng = None):
+    """indices_tournament, completed by the 10% best not already selected."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    k = int(len(scores)*taux_selec)
+    first, second, q = _duels(scores, k, rng)
+    s0, s1 = scores[first], scores[second]
+    second_wins = ((s0 >= s1) & (q > p)) | ((s0 < s1) & (q <= p))
+    select = np.where(second_wins, second, first).astype(np.int64)
+    elite = indices_elitiste(scores, 0.1)
+    return np.concatenate([select, elite[~np.isin(elite, select)]])
+
+def indices_roulette(scores, taux_selec, rng = None):
+    """Roulette wheel with weights 1 - score/total."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    return _roulette(1 - scores/np.sum(scores), int(len(scores)*taux_selec), rng)
+
+def indices_roulette_exp(scores, taux_selec, temp = 1000, rng = None):
+    """Roulette wheel with weights exp((min² - score²)/temp)."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    min_score = np.min(scores)
+    return _roulette(np.exp((min_score**2-scores**2)/temp), int(taux_selec*len(scores)), rng)
+
+def indices_roulette_exp_normal(scores, taux_selec, rng = None):
+    """Roulette wheel with weights exp((min² - score²)/(2*min))."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    min_score = np.min(scores)
+    return _roulette(np.exp((min_score**2-scores**2)/(2*min_score)), int(taux_selec*len(scores)), rng)
+
+def indices_rang_reel(scores, taux_selec, rng = None):
+    """Linear rank: the i-th worst individual has weight i (the best has weight n)."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    order = np.argsort(-scores, kind="stable")
+    return order[_roulette(np.arange(1, n+1), int(taux_selec*n), rng)]
+
+def indices_rang_geometrique(scores, taux_selec, q = 0.3, rng = None):
+    """Geometric rank: the i-th best individual has weight q(1-q)^i."""
+    rng = _rng if rng is None else rng
+    scores = np.asarray(scores, dtype=float)
+    n = len(scores)
+    order = np.argsort(scores, kind="stable")
+    return order[_roulette(q * (1 - q)**np.arange(n), int(n*taux_selec), rng)]
+
+indices_dic = {"tournament_elitiste" : indices_tournament_elitiste, "elitiste":indices_elitiste,"tournament":indices_tournament,"roulette":indices_roulette,"rang_reel":indices_rang_reel,"rang_geo":indices_rang_geometrique, "roulette_exp" : indices_roulette_exp, "roulette_exp_norm": indices_roulette_exp_normal}
+def select_indices(scores, taux_selec, select_type, n=None, rng=None):
+    """
+    Generic selection on a score array: calls the appropriate strategy.
+
+    Args:
+        scores: (P,) array of fitness scores
+        taux_selec: Selection rate
+        select_type: Selection type (key from the indices_dic / selections_dic dictionaries)
+        n: Generation number (optional, used to adjust the temperature)
+        rng: numpy.random.Generator (default: module generator)
+
+    Returns:
+        Array of the indices of the selected individuals
+    """
+    if n:
+        if select_type == "roulette_exp":
+            return indices_roulette_exp(scores, taux_selec, temp = max(100,700-n*30), rng = rng)
+    if select_type in indices_dic:
+        return indices_dic[select_type](scores, taux_selec, rng = rng)
+    return indices_elitiste(scores, taux_selec)
+
+# =============================================================================
+# LIST STRATEGIES (list of individuals -> selected individuals)
+# =============================================================================
+
+def _scores(list_ind):
+    return np.array([ind.score for ind in list_ind], dtype=float)
+
 def selection_elitiste(list_ind, taux_selec):
     """
     Elitist selection: keeps the best individuals.
-    
+
     Args:
         list_ind: List of individuals to select
         selection_rate: Selection rate (proportion of individuals to keep)
-    
+
     Returns:
         List of the best individuals according to the selection rate
     """
-    list_ind_sort = list(list_ind)
-    list_ind_sort.sort()
-
-    n = len(list_ind)
-
-    selection = list_ind_sort[:int(n*taux_selec)]
-
-    return selection
+    return [list_ind[i] for i in indices_elitiste(_scores(list_ind), taux_selec)]
 
 def selection_tournament_elitiste(list_ind, taux_selec, p = 0.001):
     """
     Elitist Tournament selection: compares two random individuals and selects the best one.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
         p: Probability of selecting the worst individual (diversity)
-    
+
     Returns:
         List of individuals selected by tournament + 10% of the best ones
     """
-    selection = []
-    n_list = list(list_ind)
-    n = len(n_list)
-    k = int(n*taux_selec)
-
-    for _ in range(k):
-        q = random.random()
-        x = random.sample(n_list, k=2)
-        if (x[0].score >= x[1].score and q > p) or (x[0].score < x[1].score and q <= p) :
-            selection.append(x[1])
-        elif  (x[0].score >= x[1].score and q <= p) or (x[0].score < x[1].score and q > p): 
-            selection.append(x[0])
-
-    list_ind_sort = list(list_ind)
-    list_ind_sort.sort()
-
-    for ind in list_ind_sort[:int(n*0.1)]:
-        if ind not in selection:
-            selection.append(ind)
-
-    return selection
+    return [list_ind[i] for i in indices_tournament_elitiste(_scores(list_ind), taux_selec, p)]
 
 def selection_tournament(list_ind, taux_selec, p = 0.001):
     """
     Tournament selection: compares two random individuals and selects the best one.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
         p: Probability of selecting the worst individual (diversity)
-    
+
     Returns:
         List of individuals selected by tournament
     """
-    selection = []
-    n_list = list(list_ind)
-    n = len(n_list)
-    k = int(n*taux_selec)
-
-    for _ in range(k):
-        q = random.random()
-        x = random.sample(n_list, k=2)
-        if (x[0].score >= x[1].score and q > p) or (x[0].score <= x[1].score and q <= p) :
-            selection.append(x[1])
-        elif  (x[0].score >= x[1].score and q <= p) or (x[0].score <= x[1].score and q > p): 
-            selection.append(x[0])
-
-    return selection
+    return [list_ind[i] for i in indices_tournament(_scores(list_ind), taux_selec, p)]
 
 def selection_roulette(list_ind, taux_selec):
     """
     Selection by roulette wheel: probability inversely proportional to score.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
-    
+
     Returns:
         List of individuals selected according to their probabilities
     """
-    total = sum([ind.score for ind in list_ind])
-    proba = [1-ind.score/total for ind in list_ind]
-    
-    select = random.choices(list_ind, proba, k = int(len(list_ind)*taux_selec))
-
-    return select
+    return [list_ind[i] for i in indices_roulette(_scores(list_ind), taux_selec)]
 
 def selection_roulette_exp(list_ind, taux_selec, temp=1000):
     """
     Selection by roulette wheel with exponential function (selection pressure control).
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
         temp: Temperature (controls selection pressure; the higher it is, the less severe the selection)
-    
+
     Returns:
         List of selected individuals with exponential distribution
     """
-    min_score = min([ind.score for ind in list_ind])
-    proba = [np.exp((min_score**2-ind.score**2)/temp) for ind in list_ind]
-    select = random.choices(list_ind, proba, k = int(taux_selec*len(list_ind)))
-    return select
+    return [list_ind[i] for i in indices_roulette_exp(_scores(list_ind), taux_selec, temp)]
 
 def selection_roulette_exp_normal(list_ind, taux_selec):
     """
     Selection by normalized exponential roulette wheel (temperature = min_score).
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
-    
+
     Returns:
         List of selected individuals with normalized exponential distribution
     """
-    min_score = min([ind.score for ind in list_ind])
-    proba = [np.exp((min_score**2-ind.score**2)/(2*min_score)) for ind in list_ind]
-    select = random.choices(list_ind, proba, k = int(taux_selec*len(list_ind)))
-    return select
+    return [list_ind[i] for i in indices_roulette_exp_normal(_scores(list_ind), taux_selec)]
 
 def selection_rang_reel(list_ind, taux_selec):
     """
     Linear rank selection: probability proportional to rank.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
-    
+
     Returns:
         List of individuals selected according to their rank
     """
-    list_ind.sort(reverse = True)
-    
-    proba = [i + 1 for i in range(len(list_ind))]
-    
-    n_parents = len(list_ind)
-    select = random.choices(list_ind, weights=proba, k=int(taux_selec*n_parents))
-    
-    return select
+    return [list_ind[i] for i in indices_rang_reel(_scores(list_ind), taux_selec)]
 
 def selection_rang_geometrique(list_ind, taux_selec, q=0.3):
     """
     Selection by geometric rank: geometrically decreasing probability.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
         q: Selection pressure parameter (0 < q < 1)
            The higher q is, the more selection favors the best individuals.
-    
+
     Returns:
         List of individuals selected according to a geometric distribution
     """
-    list_ind.sort()
-
-    n = len(list_ind)
-
-    proba = [q * (1 - q)**i for i in range(n)]
-    
-    # 3. Select parents
-    k = int(len(list_ind) * taux_selec)
-    select = random.choices(list_ind, weights=proba, k=k)
-    
-    return select
+    return [list_ind[i] for i in indices_rang_geometrique(_scores(list_ind), taux_selec, q)]
 
 selections_dic = {"tournament_elitiste" : selection_tournament_elitiste, "elitiste":selection_elitiste,"tournament":selection_tournament,"roulette":selection_roulette,"rang_reel":selection_rang_reel,"rang_geo":selection_rang_geometrique, "roulette_exp" : selection_roulette_exp, "roulette_exp_norm": selection_roulette_exp_normal}
 def selection(list_ind,taux_selec,select_type, n=None):
     """
     Generic selection function: calls the appropriate method.
-    
+
     Args:
         list_ind: List of individuals
         selection_rate: Selection rate
         select_type: Selection type (key from the selections_dic dictionary)
         n: Generation number (optional, used to adjust the temperature)
-    
+
     Returns:
         List of individuals selected according to the chosen method
     """
-    if n:
-        if select_type == "roulette_exp":
-            return selections_dic[select_type](list_ind,taux_selec, temp = max(100,700-n*30))
-    if select_type in selections_dic:
-        return selections_dic[select_type](list_ind,taux_selec)
-    return selection_elitiste(list_ind,taux_selec)
-
-
-
+    return [list_ind[i] for i in select_indices(_scores(list_ind), taux_selec, select_type, n)]
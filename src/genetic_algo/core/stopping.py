@@ -0,0 +1,69 @@
+import time
+import numpy as np
+
+# Stop reasons reported in the results (see Optimizer.stop_reason)
+STOP_REASONS = ("nb_generations", "target_score", "plateau", "diversity", "max_evaluations", "max_seconds")
+
+
+class EarlyStopping:
+    """
+    Stop criteria of a run, checked after every generation. A criterion
+    left to None is never checked.
+
+        target_score: the best score is at or below it
+        patience / rel_tol: the best score of the last patience generations
+            improves on the best before them by at most rel_tol (relative)
+        min_diversity: the population diversity (see Population.diversity,
+            in reference SDs) fell below it
+        max_evaluations: the run scored at least that many individuals
+        max_seconds: wall-clock seconds since start()
+    """
+
+    def __init__(self, target_score = None, patience = None, rel_tol = 0.0, min_diversity = None,
+                 max_evaluations = None, max_seconds = None):
+        self.target_score = target_score
+        self.patience = patience
+        self.rel_tol = rel_tol
+        self.min_diversity = min_diversity
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.start_time = None
+
+    @classmethod
+    def from_settings(cls, target_score = None, patience = None, rel_tol = 0.0, min_diversity = None,
+                      max_evaluations = None, max_seconds = None):
+        """EarlyStopping with these criteria, or None when none is set."""
+        if all(value is None for value in (target_score, patience, min_diversity, max_evaluations, max_seconds)):
+            return None
+        return cls(target_score, patience, rel_tol, min_diversity, max_evaluations, max_seconds)
+
+    def start(self):
+        """Starts the wall-clock budget."""
+        self.start_time = time.perf_counter()
+
+    def elapsed(self) -> float:
+        return 0.0 if self.start_time is None else time.perf_counter() - self.start_time
+
+    def check(self, best_scores, population = None, nb_evaluations = 0):
+        """
+        First criterion met by a run, or None to go on.
+
+        Args:
+            best_scores: Best score of every generation so far (initial population first)
+            population: Current Population, for min_diversity
+            nb_evaluations: Individuals scored so far
+        """
+        if self.target_score is not None and best_scores and best_scores[-1] <= self.target_score:
+            return "target_score"
+        if self.patience is not None and len(best_scores) > self.patience:
+            before = np.min(best_scores[:-self.patience])
+            recent = np.min(best_scores[-self.patience:])
+            if before - recent <= self.rel_tol * abs(before):
+                return "plateau"
+        if self.min_diversity is not None and population is not None and population.diversity() < self.min_diversity:
+            return "diversity"
+        if self.max_evaluations is not None and nb_evaluations >= self.max_evaluations:
+            return "max_evaluations"
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return "max_seconds"
+        return None
@@ -0,0 +1,135 @@
+import hashlib
+import numpy as np
+
+# ASCII code -> base code (A=0, C=1, G=2, T=3), -1 for anything else
+_NUCL_LUT = np.full(256, -1, dtype=np.int32)
+_NUCL_LUT[[ord(base) for base in "ACGT"]] = np.arange(4)
+
+
+class EncodedSeq:
+    """
+    DNA sequence encoded once for the trajectory kernels.
+
+    bases: int32 array of the bases (A=0, C=1, G=2, T=3)
+    dinuc: int32 array of the dinucleotide indices of the circular sequence,
+           dinuc[k] = 4*bases[k] + bases[(k+1) % N] (the last one closes the plasmid)
+    """
+
+    def __init__(self, dna_seq: str):
+        self._seq = dna_seq
+        codes = _NUCL_LUT[np.frombuffer(dna_seq.encode("latin-1", errors="replace"), dtype=np.uint8)]
+        if np.any(codes < 0):
+            # Unknown bases: same fallback as the original string encoding
+            codes = np.zeros(len(dna_seq), dtype=np.int32)
+        self.bases = codes
+        self.dinuc = (4*codes + np.roll(codes, -1)).astype(np.int32)
+        self.__cuts = {}
+        self.__walks = {}
+
+    @classmethod
+    def from_codes(cls, bases, dinuc = None):
+        """
+        EncodedSeq over already encoded arrays (e.g. views of shared memory),
+        without copying them; the string is only decoded if asked for.
+        """
+        encoded = cls.__new__(cls)
+        encoded._seq = None
+        encoded.bases = bases
+        encoded.dinuc = (4*bases + np.roll(bases, -1)).astype(np.int32) if dinuc is None else dinuc
+        encoded._EncodedSeq__cuts = {}
+        encoded._EncodedSeq__walks = {}
+        return encoded
+
+    @property
+    def seq(self) -> str:
+        if self._seq is None:
+            self._seq = "".join(np.array(list("ACGT"))[self.bases])
+        return self._seq
+
+    @property
+    def seq_id(self) -> str:
+        """Digest of the bases, identifying the sequence (e.g. in FitnessCache keys)."""
+        if getattr(self, "_seq_id", None) is None:
+            self._seq_id = hashlib.sha1(np.ascontiguousarray(self.bases, dtype=np.int32).tobytes()).hexdigest()
+        return self._seq_id
+
+    def __len__(self) -> int:
+        return len(self.bases)
+
+    def __str__(self) -> str:
+        return self.seq
+
+    def linear(self) -> np.ndarray:
+        """Dinucleotide stream of the open sequence (N-1 steps)."""
+        return self.dinuc[:-1]
+
+    def rotated(self, indcut: int, nbappend: int) -> np.ndarray:
+        """
+        Dinucleotide stream of seq[indcut:] + seq[:indcut+nbappend], taken
+        from dinuc with index offsets instead of building the string.
+        """
+        N = len(self)
+        nb_nodes = (N - indcut) + min(indcut + nbappend, N)
+        return self.dinuc[(indcut + np.arange(nb_nodes - 1)) % N]
+
+    def cut_offsets(self, nbcuts: int, nbappend: int):
+        """
+        Cut indices and prefix positions used by the fitness, computed once
+        per (nbcuts, nbappend).
+
+        Returns:
+            tuple: (list_coupes, positions, inverse, counts) where positions
+            are the sorted unique prefix indices c+i (i < nbappend), inverse
+            maps every (cut, i) pair to its position and counts is the number
+            of pairs sharing each position.
+        """
+        key = (nbcuts, nbappend)
+        if key not in self.__cuts:
+            nbases = len(self)
+            list_coupes = [i*int(np.floor(nbases/(nbcuts+1))) for i in range(nbcuts+1)]
+            pos = (np.asarray(list_coupes)[:, None] + np.arange(nbappend)).ravel()
+            positions, inverse, counts = np.unique(pos, return_inverse=True, return_counts=True)
+            self.__cuts[key] = (list_coupes, positions.astype(np.int64), inverse.ravel(), counts.astype(float))
+        return self.__cuts[key]
+
+    def kmer_walk(self, k: int, nbcuts: int, nbappend: int):
+        """
+        Circular walk of the sequence in blocks of k steps for the k-mer
+        lookup tables (see Traj3D.fast_kmer_table), computed once per
+        (k, nbcuts, nbappend).
+
+        Each stretch between two prefix positions of cut_offsets is split
+        into blocks of k steps and a shorter remainder, so that every
+        position falls on a block boundary. A block of L steps starting at
+        base a is identified by the (L+1)-mer seq[a:a+L+1] (circularly).
+
+        Returns:
+            tuple: (ops, marks) where ops are the table indices of the blocks
+            and marks the number of blocks walked to reach each position.
+        """
+        key = (k, nbcuts, nbappend)
+        if key not in self.__walks:
+            N = len(self)
+            positions = self.cut_offsets(nbcuts, nbappend)[1]
+            ops, marks = [], []
+            nb_ops = 0
+            start = 0
+            for stop in list(positions) + [N]:
+                starts = np.arange(start, stop, k)
+                lengths = np.minimum(k, stop - starts)
+                codes = np.zeros(len(starts), dtype=np.int64)
+                for t in range(k + 1):
+                    codes = np.where(t <= lengths, 4*codes + self.bases[(starts + t) % N], codes)
+                ops.append((4**(lengths + 1) - 16)//3 + codes)
+                nb_ops += len(starts)
+                marks.append(nb_ops)
+                start = stop
+            self.__walks[key] = (np.concatenate(ops).astype(np.int64), np.array(marks[:-1], dtype=np.int64))
+        return self.__walks[key]
+
+
+def as_encoded(dna_seq) -> EncodedSeq:
+    """Returns the EncodedSeq of a DNA string, dna_seq itself if already encoded."""
+    if isinstance(dna_seq, str):
+        return EncodedSeq(dna_seq)
+    return dna_seq
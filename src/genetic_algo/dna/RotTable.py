@@ -1,5 +1,37 @@
 from json import load as json_load
 from json import dump as json_dump
+import numpy as np
+
+# Dinucleotide order used by the array representation (index = 4*b1 + b2)
+DINUC_KEYS = [n1+n2 for n1 in "ACGT" for n2 in "ACGT"]
+
+# Canonical (compact) genome: first member of each reverse-complement pair,
+# the only one Traj3D reads. Same order as Traj3D's unique pairs.
+CANONICAL_KEYS = ["AA", "AC", "AG", "CA", "CC", "GA", "AT", "CG", "GC", "TA"]
+_COMPLEMENT = {"A": "T", "C": "G", "G": "C", "T": "A"}
+
+def rev_comp(dinucleotide: str) -> str:
+    return _COMPLEMENT[dinucleotide[1]] + _COMPLEMENT[dinucleotide[0]]
+
+def compact_params(params: np.ndarray) -> np.ndarray:
+    """(..., 16, 3) DINUC_KEYS parameters -> (..., 10, 3) CANONICAL_KEYS genome."""
+    return np.asarray(params)[..., [DINUC_KEYS.index(XY) for XY in CANONICAL_KEYS], :]
+
+def expand_params(params: np.ndarray) -> np.ndarray:
+    """
+    (..., 10, 3) canonical genome -> (..., 16, 3) DINUC_KEYS parameters.
+    Reverse complements get the twist and wedge of their pair and the
+    opposite direction, as in table.json.
+    """
+    params = np.asarray(params, dtype=float)
+    expanded = np.empty(params.shape[:-2] + (16, 3))
+    for k, XY in enumerate(DINUC_KEYS):
+        if XY in CANONICAL_KEYS:
+            expanded[..., k, :] = params[..., CANONICAL_KEYS.index(XY), :]
+        else:
+            expanded[..., k, :] = params[..., CANONICAL_KEYS.index(rev_comp(XY)), :]
+            expanded[..., k, 2] *= -1
+    return expanded
 
 
 class RotTable:
@@ -44,6 +76,14 @@ class RotTable:
     def getTable(self) -> dict:
         return self.rot_table
 
+    def getParams(self, compact = False) -> np.ndarray:
+        """
+        Returns the (16, 3) twist/wedge/direction array in DINUC_KEYS order,
+        or the (10, 3) canonical genome (CANONICAL_KEYS order) if compact.
+        """
+        keys = CANONICAL_KEYS if compact else DINUC_KEYS
+        return np.array([self.rot_table[XY][:3] for XY in keys], dtype=float)
+
     ###################
     def save(self, filename: str):
         """Saves the current rotation table to a file."""
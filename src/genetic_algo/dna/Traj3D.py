@@ -1,60 +1,414 @@
-import math
-
-#For drawing
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
-from genetic_algo.dna.RotTable import RotTable
+from genetic_algo.dna.RotTable import RotTable, DINUC_KEYS, CANONICAL_KEYS, rev_comp
+from genetic_algo.dna.EncodedSeq import as_encoded
+
+from numba import jit, prange
+
+# Steps between two re-orthonormalizations of the running rotation
+RENORM_INTERVAL = 1024
+
+# The kernels compose the steps as 3x4 affine blocks [R | t]: the last row of
+# the homogeneous matrices is always [0, 0, 0, 1] and is never stored nor
+# multiplied (27 multiply-adds per step instead of 64). They accept the
+# (16, 4, 4) step matrices of compute_matrices_db, of which only the first
+# three rows are read, and return 3x4 transforms. The running rotation is
+# re-orthonormalized every RENORM_INTERVAL steps against drift on very long
+# chains: closure scores match the 4x4 products to a relative 1e-10 (about
+# 1e-13 in practice on the 8k and 180k plasmids).
+
+@jit(nopython=True, cache=True)
+def affine_mul(a, b, out):
+    """out = a·b for 3x4 affine blocks (out must not be a nor b)."""
+    for r in range(3):
+        for c in range(4):
+            out[r, c] = a[r, 0] * b[0, c] + a[r, 1] * b[1, c] + a[r, 2] * b[2, c]
+        out[r, 3] += a[r, 3]
 
-from numba import jit
+@jit(nopython=True, cache=True)
+def affine_renormalize(a):
+    """Gram-Schmidt on the rows of the rotation block of a, in place."""
+    for r in range(3):
+        for q in range(r):
+            dot = a[r, 0] * a[q, 0] + a[r, 1] * a[q, 1] + a[r, 2] * a[q, 2]
+            for c in range(3):
+                a[r, c] -= dot * a[q, c]
+        norm = np.sqrt(a[r, 0] ** 2 + a[r, 1] ** 2 + a[r, 2] ** 2)
+        for c in range(3):
+            a[r, c] /= norm
 
-@jit(nopython=True)
-def fast_compute_loop(encoded_seq, matrices_db):
+@jit(nopython=True, cache=True)
+def affine_identity():
+    identity = np.zeros((3, 4))
+    identity[0, 0] = 1.0
+    identity[1, 1] = 1.0
+    identity[2, 2] = 1.0
+    return identity
+
+@jit(nopython=True, cache=True)
+def fast_compute_loop(dinuc_seq, matrices_db):
     """
     Compiled machine code version of the trajectory loop.
+    dinuc_seq holds the dinucleotide index of every step (see EncodedSeq),
+    the trajectory has one more node than there are steps.
     """
-    N = len(encoded_seq)
+    N = len(dinuc_seq) + 1
     traj = np.zeros((N, 4))
-    
-    traj[0, 0] = 0.0
-    traj[0, 1] = 0.0
-    traj[0, 2] = 0.0
-    traj[0, 3] = 1.0
+    traj[:, 3] = 1.0
 
-    total_matrix = np.eye(4)
+    total_matrix = affine_identity()
+    buffer = np.empty((3, 4))
 
     # Loop over the sequence
     for i in range(1, N):
-        # Calculate dinucleotide index: previous_base * 4 + current_base
+        # Dinucleotide index: previous_base * 4 + current_base
         # (A=0, C=1, G=2, T=3) -> 'AC' = 0*4 + 1 = 1
-        idx = encoded_seq[i-1] * 4 + encoded_seq[i]
-        
-        step_matrix = matrices_db[idx]
-        
-        total_matrix = total_matrix @ step_matrix
-        
+        affine_mul(total_matrix, matrices_db[dinuc_seq[i-1]], buffer)
+        total_matrix, buffer = buffer, total_matrix
+        if i % RENORM_INTERVAL == 0:
+            affine_renormalize(total_matrix)
+
         traj[i, 0] = total_matrix[0, 3]
         traj[i, 1] = total_matrix[1, 3]
         traj[i, 2] = total_matrix[2, 3]
-        traj[i, 3] = total_matrix[3, 3]
 
     return traj
 
+@jit(nopython=True, cache=True)
+def fast_prefix_points(dinuc_seq, matrices_db, positions):
+    """
+    Walks the circular sequence once and returns the prefix points at the
+    requested (sorted, unique) positions together with the closure transform.
 
-class Traj3D:
-    """Represents a 3D trajectory"""
+    dinuc_seq is the circular stream (EncodedSeq.dinuc): its last step closes
+    the plasmid (last base -> first base) and the returned 3x4 transform is
+    the product of all N steps.
+    """
+    N = len(dinuc_seq)
+    points = np.zeros((len(positions), 3))
+    total_matrix = affine_identity()
+    buffer = np.empty((3, 4))
+
+    k = 0
+    while k < len(positions) and positions[k] == 0:
+        k += 1
+
+    for i in range(1, N + 1):
+        affine_mul(total_matrix, matrices_db[dinuc_seq[i-1]], buffer)
+        total_matrix, buffer = buffer, total_matrix
+        if i % RENORM_INTERVAL == 0:
+            affine_renormalize(total_matrix)
+
+        while k < len(positions) and positions[k] == i:
+            points[k, 0] = total_matrix[0, 3]
+            points[k, 1] = total_matrix[1, 3]
+            points[k, 2] = total_matrix[2, 3]
+            k += 1
+
+    return points, total_matrix
+
+@jit(nopython=True, cache=True)
+def fast_boundary_loop(dinuc_seq, matrices_db, nbappend):
+    """
+    Same walk as fast_compute_loop, but only the running transform is kept:
+    returns the first nbappend and the last nbappend nodes of the trajectory,
+    stacked in a (2 * nbappend, 4) array.
+    """
+    N = len(dinuc_seq) + 1
+    boundary = np.zeros((2 * nbappend, 4))
+    boundary[:, 3] = 1.0
+
+    total_matrix = affine_identity()
+    buffer = np.empty((3, 4))
+
+    for i in range(1, N):
+        affine_mul(total_matrix, matrices_db[dinuc_seq[i-1]], buffer)
+        total_matrix, buffer = buffer, total_matrix
+        if i % RENORM_INTERVAL == 0:
+            affine_renormalize(total_matrix)
+
+        if i < nbappend:
+            for r in range(3):
+                boundary[i, r] = total_matrix[r, 3]
+        j = i - (N - nbappend)
+        if j >= 0:
+            for r in range(3):
+                boundary[nbappend + j, r] = total_matrix[r, 3]
+
+    return boundary
+
+@jit(nopython=True, cache=True)
+def fast_kmer_table(matrices_db, k):
+    """
+    Products of 1 to k consecutive step matrices for every (j+1)-mer, j <= k,
+    as 3x4 affine blocks. Levels are stacked one after the other: the j-step
+    block of the (j+1)-mer of base-4 code c (first base most significant) is
+    at (4^(j+1) - 16)/3 + c, so that level 1 holds the step matrices.
+    """
+    table = np.empty(((4**(k+2) - 16)//3, 3, 4))
+    table[:16] = matrices_db[:, :3, :]
+
+    previous = 0
+    offset = 16
+    for j in range(2, k + 1):
+        for c in range(4**(j+1)):
+            # first j bases -> block of level j-1, last two bases -> one step
+            affine_mul(table[previous + c//4], table[c % 16], table[offset + c])
+        previous = offset
+        offset += 4**(j+1)
+
+    return table
+
+@jit(nopython=True, cache=True)
+def fast_kmer_prefix_points(ops, marks, table):
+    """
+    fast_prefix_points walking blocks of up to k steps (see
+    EncodedSeq.kmer_walk): ops are the indices of the blocks in the
+    fast_kmer_table, marks the number of blocks walked before each requested
+    position is reached.
+    """
+    points = np.zeros((len(marks), 3))
+    total_matrix = affine_identity()
+    buffer = np.empty((3, 4))
+
+    m = 0
+    while m < len(marks) and marks[m] == 0:
+        m += 1
+
+    for o in range(len(ops)):
+        affine_mul(total_matrix, table[ops[o]], buffer)
+        total_matrix, buffer = buffer, total_matrix
+        if (o + 1) % RENORM_INTERVAL == 0:
+            affine_renormalize(total_matrix)
+
+        while m < len(marks) and marks[m] == o + 1:
+            points[m, 0] = total_matrix[0, 3]
+            points[m, 1] = total_matrix[1, 3]
+            points[m, 2] = total_matrix[2, 3]
+            m += 1
+
+    return points, total_matrix
+
+@jit(nopython=True, parallel=True, cache=True)
+def fast_chunked_prefix_points(ops, marks, table, nb_chunks):
+    """
+    fast_kmer_prefix_points with the walk split into nb_chunks contiguous
+    chunks reduced on separate threads (matrix products are associative).
+    Each chunk keeps its own product and the local points of the positions
+    it contains; the chunk products are then chained to place every local
+    point and to get the closure transform.
+    With a k = 1 walk (ops = dinucleotide indices, table = step matrices),
+    this is a chunked fast_prefix_points.
+    """
+    bounds = np.linspace(0, len(ops), nb_chunks + 1).astype(np.int64)
+    chunk_of = np.searchsorted(bounds, marks, side="left") - 1  # chunk with lo < mark <= hi
+    local_points = np.zeros((len(marks), 3))
+    products = np.zeros((nb_chunks, 3, 4))
+
+    for b in prange(nb_chunks):
+        total_matrix = affine_identity()
+        buffer = np.empty((3, 4))
+        m = np.searchsorted(marks, bounds[b], side="right")
+        for o in range(bounds[b], bounds[b+1]):
+            affine_mul(total_matrix, table[ops[o]], buffer)
+            total_matrix, buffer = buffer, total_matrix
+            if (o + 1 - bounds[b]) % RENORM_INTERVAL == 0:
+                affine_renormalize(total_matrix)
+
+            while m < len(marks) and marks[m] == o + 1:
+                local_points[m, 0] = total_matrix[0, 3]
+                local_points[m, 1] = total_matrix[1, 3]
+                local_points[m, 2] = total_matrix[2, 3]
+                m += 1
+        products[b] = total_matrix
 
-    __NUCL_MAP = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
-    __DINUC_KEYS = [n1+n2 for n1 in "ACGT" for n2 in "ACGT"]
+    prefixes = np.zeros((nb_chunks + 1, 3, 4))
+    prefixes[0] = affine_identity()
+    for b in range(nb_chunks):
+        affine_mul(prefixes[b], products[b], prefixes[b+1])
 
-    # Vertical translation (elevation) between two di-nucleotides
-    __MATRIX_T = np.array(
-        [[1, 0, 0, 0],
-        [0, 1, 0, 0],
-        [0, 0, 1, -3.38/2],
-        [0, 0, 0, 1]],
-        dtype = float
-    )
+    points = np.zeros((len(marks), 3))
+    for m in range(len(marks)):
+        if marks[m] == 0:
+            continue
+        prefix = prefixes[chunk_of[m]]
+        for r in range(3):
+            points[m, r] = prefix[r, 3]
+            for c in range(3):
+                points[m, r] += prefix[r, c] * local_points[m, c]
+
+    return points, prefixes[nb_chunks]
+
+
+@jit(nopython=True, cache=True)
+def fast_closure_grad(dinuc_seq, matrices_db, positions, weights):
+    """
+    Weighted closure distance F = sum_m w_m |(R_N - I) t_m + t_N|² (see
+    fitness.cut_distances) and its derivative with respect to the 16 step
+    matrices, by reverse-mode differentiation of the chain of steps.
+
+    The forward walk is fast_prefix_points, keeping the running transform
+    every RENORM_INTERVAL steps. The backward walk goes from G_N down to
+    G_0, recovering G_(i-1) = G_i·A_i^-1 from the kept transforms, and
+    carries the adjoint K_i of the suffix A_(i+1)...A_N: step i adds
+    R_(i-1)^T K_i to the adjoint of its step matrix, then K_(i-1) = K_i·A_i^T
+    (plus the terms of the prefix points ending at i-1).
+
+    Returns:
+        tuple: (F, (16, 3, 4) dF/d(rows of the step matrices))
+    """
+    N = len(dinuc_seq)
+    P = len(positions)
+    points = np.zeros((P, 3))
+    checkpoints = np.zeros((N // RENORM_INTERVAL + 1, 3, 4))
+    total_matrix = affine_identity()
+    buffer = np.empty((3, 4))
+    checkpoints[0] = total_matrix
+
+    k = 0
+    while k < P and positions[k] == 0:
+        k += 1
+    for i in range(1, N + 1):
+        affine_mul(total_matrix, matrices_db[dinuc_seq[i-1]], buffer)
+        total_matrix, buffer = buffer, total_matrix
+        if i % RENORM_INTERVAL == 0:
+            affine_renormalize(total_matrix)
+            checkpoints[i // RENORM_INTERVAL] = total_matrix
+        while k < P and positions[k] == i:
+            for r in range(3):
+                points[k, r] = total_matrix[r, 3]
+            k += 1
+
+    # d_m = (R_N - I) t_m + t_N, adjoints of the prefix points (g) and of G_N (K)
+    distsq = 0.0
+    g = np.zeros((P, 3))
+    K = np.zeros((3, 4))
+    for m in range(P):
+        d = np.zeros(3)
+        for r in range(3):
+            d[r] = total_matrix[r, 3] - points[m, r]
+            for c in range(3):
+                d[r] += total_matrix[r, c] * points[m, c]
+        distsq += weights[m] * (d[0]**2 + d[1]**2 + d[2]**2)
+        for r in range(3):
+            for c in range(3):
+                g[m, c] += 2 * weights[m] * (total_matrix[r, c] - (r == c)) * d[r]
+                K[r, c] += 2 * weights[m] * d[r] * points[m, c]
+            K[r, 3] += 2 * weights[m] * d[r]
+
+    grad = np.zeros((16, 3, 4))
+    previous = np.empty((3, 4))
+    new_K = np.empty((3, 4))
+    m = P - 1
+    for i in range(N, 0, -1):
+        while m >= 0 and positions[m] == i:
+            for r in range(3):
+                K[r, 3] += g[m, r]
+            m -= 1
+        step = matrices_db[dinuc_seq[i-1]]
+        if (i - 1) % RENORM_INTERVAL == 0:
+            previous[:] = checkpoints[(i - 1) // RENORM_INTERVAL]
+        else:
+            # G_(i-1) = G_i·A_i^-1: rotation R_i·R_A^T, translation t_i - R_(i-1)·t_A
+            for r in range(3):
+                for c in range(3):
+                    previous[r, c] = (total_matrix[r, 0] * step[c, 0] + total_matrix[r, 1] * step[c, 1]
+                                      + total_matrix[r, 2] * step[c, 2])
+            for r in range(3):
+                previous[r, 3] = total_matrix[r, 3] - (previous[r, 0] * step[0, 3] + previous[r, 1] * step[1, 3]
+                                                      + previous[r, 2] * step[2, 3])
+        adjoint = grad[dinuc_seq[i-1]]
+        for r in range(3):
+            for c in range(4):
+                adjoint[r, c] += previous[0, r] * K[0, c] + previous[1, r] * K[1, c] + previous[2, r] * K[2, c]
+        for q in range(3):
+            for c in range(3):
+                new_K[q, c] = (K[q, 0] * step[c, 0] + K[q, 1] * step[c, 1] + K[q, 2] * step[c, 2]
+                               + K[q, 3] * step[c, 3])
+            new_K[q, 3] = K[q, 3]
+        K, new_K = new_K, K
+        total_matrix, previous = previous, total_matrix
+
+    return distsq, grad
+
+
+# Dinucleotide index of each canonical pair, and canonical pair of each dinucleotide
+_CANON_IDX = [DINUC_KEYS.index(XY) for XY in CANONICAL_KEYS]
+_BANK_IDX = [CANONICAL_KEYS.index(XY if XY in CANONICAL_KEYS else rev_comp(XY)) for XY in DINUC_KEYS]
+
+def step_matrices(params) -> np.ndarray:
+    """
+    Closed-form step matrices M = T·Rz(Ω/2)·Q·Rz(Ω/2)·T for a whole
+    (..., G, 3) block of twist/wedge/direction values (degrees), in one
+    vectorized pass.
+
+    With Q = Rz(-β)·Rx(-α)·Rz(β) (α = wedge, β = direction - 90°), the
+    rotation is Rz(a)·Rx(-α)·Rz(b) with a = Ω/2 - β and b = Ω/2 + β, and
+    the two half translations T (dz = -3.38/2) add dz·(R[:, 2] + e_z).
+
+    Returns:
+        (..., G, 4, 4) homogeneous step matrices
+    """
+    params = np.asarray(params, dtype=float)
+    twist, wedge, direction = np.moveaxis(np.radians(params), -1, 0)
+    beta = direction - np.pi/2
+    ca, sa = np.cos(twist/2 - beta), np.sin(twist/2 - beta)
+    cb, sb = np.cos(twist/2 + beta), np.sin(twist/2 + beta)
+    cw, sw = np.cos(wedge), np.sin(wedge)
+    dz = -3.38/2  # vertical translation (elevation) between two di-nucleotides
+
+    M = np.zeros(params.shape[:-1] + (4, 4))
+    M[..., 0, 0] = ca*cb - sa*cw*sb
+    M[..., 0, 1] = ca*sb + sa*cw*cb
+    M[..., 0, 2] = -sa*sw
+    M[..., 1, 0] = -sa*cb - ca*cw*sb
+    M[..., 1, 1] = -sa*sb + ca*cw*cb
+    M[..., 1, 2] = -ca*sw
+    M[..., 2, 0] = -sw*sb
+    M[..., 2, 1] = sw*cb
+    M[..., 2, 2] = cw
+    M[..., 0, 3] = dz*M[..., 0, 2]
+    M[..., 1, 3] = dz*M[..., 1, 2]
+    M[..., 2, 3] = dz*(cw + 1)
+    M[..., 3, 3] = 1.0
+    return M
+
+def step_matrices_grad(params) -> np.ndarray:
+    """
+    Derivatives of step_matrices with respect to the twist, wedge and
+    direction values (per degree), from the same closed form.
+
+    Returns:
+        (..., G, 3, 4, 4) array, [..., g, j] = dM_g / d params[..., g, j]
+    """
+    params = np.asarray(params, dtype=float)
+    twist, wedge, direction = np.moveaxis(np.radians(params), -1, 0)
+    beta = direction - np.pi/2
+    ca, sa = np.cos(twist/2 - beta), np.sin(twist/2 - beta)
+    cb, sb = np.cos(twist/2 + beta), np.sin(twist/2 + beta)
+    cw, sw = np.cos(wedge), np.sin(wedge)
+    dz = -3.38/2
+    M = step_matrices(params)
+
+    # d/da mixes the rows of the rotation, d/db its columns (a = Ω/2 - β, b = Ω/2 + β)
+    dA = np.zeros(M.shape)
+    dA[..., 0, :3] = M[..., 1, :3]
+    dA[..., 1, :3] = -M[..., 0, :3]
+    dB = np.zeros(M.shape)
+    dB[..., :3, 0] = -M[..., :3, 1]
+    dB[..., :3, 1] = M[..., :3, 0]
+    dW = np.zeros(M.shape)
+    dW[..., 0, 0], dW[..., 0, 1], dW[..., 0, 2] = sa*sw*sb, -sa*sw*cb, -sa*cw
+    dW[..., 1, 0], dW[..., 1, 1], dW[..., 1, 2] = ca*sw*sb, -ca*sw*cb, -ca*cw
+    dW[..., 2, 0], dW[..., 2, 1], dW[..., 2, 2] = -cw*sb, cw*cb, -sw
+    for d in (dA, dB, dW):
+        d[..., :3, 3] = dz*d[..., :3, 2]
+
+    grad = np.stack([(dA + dB)/2, dW, dB - dA], axis=-3)
+    return grad * (np.pi/180)
+
+
+class Traj3D:
+    """Represents a 3D trajectory"""
 
     __UNIQUE_PAIRS = [
         ("AA", "TT"), 
@@ -72,89 +426,68 @@ class Traj3D:
 
     def __init__(self,want_to_plot=False):
         self.__Traj3D = []
-        self.fig = plt.figure() if want_to_plot else None
-        self.ax = plt.axes(projection='3d') if want_to_plot else None
+        self.fig = None
+        self.ax = None
+        if want_to_plot:
+            self.__init_plot()
+
+    def __init_plot(self):
+        """Loads matplotlib only when a trajectory is drawn (headless runs never import it)."""
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d import Axes3D  # registers the 3d projection
+        self.fig = plt.figure()
+        self.ax = plt.axes(projection='3d')
 
     def getTraj(self) -> list:
         return self.__Traj3D
 
-    def compute(self, dna_seq: str, rot_table: RotTable):
+    def compute(self, dna_seq, rot_table: RotTable, nbappend = None):
         """
         Computes the trajectory. Uses Numba if available for high performance.
+        dna_seq is a string or an EncodedSeq (encoded once and reused).
+
+        If nbappend is given, the (N, 4) trajectory is never built: only the
+        first nbappend and last nbappend nodes are kept, which is all dist_df
+        and get_indicators read. Use the full mode for draw and save_coords.
+        """
+        dinuc_seq = as_encoded(dna_seq).linear()
+        matrices_db = self.compute_matrices_db(rot_table)
+
+        if nbappend is None:
+            self.__Traj3D = fast_compute_loop(dinuc_seq, matrices_db)
+        else:
+            self.__Traj3D = fast_boundary_loop(dinuc_seq, matrices_db, nbappend)
+
+    def compute_matrices_db(self, rot_table: RotTable) -> np.ndarray:
+        """
+        Builds the (16, 4, 4) bank of step matrices, indexed by
+        previous_base * 4 + current_base.
+        """
+        return self.compute_matrices_batch(rot_table.getParams(compact=True)[None])[0]
+
+    @classmethod
+    def compute_matrices_batch(cls, params: np.ndarray) -> np.ndarray:
+        """
+        Vectorized compute_matrices_db for a whole population.
+
+        Args:
+            params: (P, 16, 3) twist/wedge/direction values, dinucleotides in
+                    DINUC_KEYS order (AA, AC, ..., TT), or the (P, 10, 3)
+                    canonical genome (one entry per unique pair)
+
+        Returns:
+            (P, 16, 4, 4) bank of step matrices. As in compute_matrices_db, the
+            reverse complement of a pair reuses the matrix of its first member.
         """
-        try:
-            encoded_seq = np.array([self.__NUCL_MAP[s] for s in dna_seq], dtype=np.int32)
-        except KeyError:
-            encoded_seq = np.zeros(len(dna_seq), dtype=np.int32) 
-
-        matrices_db = np.zeros((16, 4, 4))
-        
-        for seq, rev_comp in self.__UNIQUE_PAIRS:
-            Rz, Q = self.__compute_matrices(rot_table, seq)
-            M = (self.__MATRIX_T @ Rz @ Q @ Rz @ self.__MATRIX_T)
-            idx_1 = self.__NUCL_MAP[seq[0]] * 4 + self.__NUCL_MAP[seq[1]]
-
-            matrices_db[idx_1] = M
-
-            if seq != rev_comp:
-                idx_2 = self.__NUCL_MAP[rev_comp[0]] * 4 + self.__NUCL_MAP[rev_comp[1]]
-                matrices_db[idx_2] = M
-
-        self.__Traj3D = fast_compute_loop(encoded_seq, matrices_db)
-
-    def __compute_matrices(self, rot_table: RotTable, dinucleotide: str):
-
-
-        Omega = math.radians(rot_table.getTwist(dinucleotide))
-        
-
-        sigma = rot_table.getWedge(dinucleotide)
-        delta = rot_table.getDirection(dinucleotide)
-        alpha = math.radians(sigma)
-        beta = math.radians(delta - 90)
-
-        cos_omega = math.cos(Omega/2)
-        sin_omega = math.sin(Omega/2)
-        cos_beta = math.cos(beta)
-        sin_beta = math.sin(beta)
-        cos_nbeta = math.cos(-beta)
-        sin_nbeta = math.sin(-beta)
-        cos_nalpha = math.cos(-alpha)
-        sin_nalpha = math.sin(-alpha)
-
-        matrices_Rz = np.array([
-            [cos_omega, sin_omega, 0, 0],
-            [-sin_omega, cos_omega, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-
-        Q_rot_z1 = np.array([
-            [cos_nbeta, sin_nbeta, 0, 0],
-            [-sin_nbeta, cos_nbeta, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-
-        Q_rot_x = np.array([
-            [1, 0, 0, 0],
-            [0, cos_nalpha, sin_nalpha, 0],
-            [0, -sin_nalpha, cos_nalpha, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-
-        Q_rot_z2 = np.array([
-            [cos_beta, sin_beta, 0, 0],
-            [-sin_beta, cos_beta, 0, 0],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ], dtype=float)
-
-        matrices_Q = Q_rot_z1 @ Q_rot_x @ Q_rot_z2
-        
-        return matrices_Rz, matrices_Q
+        params = np.asarray(params, dtype=float)
+        if params.shape[1] != len(cls.__UNIQUE_PAIRS):
+            params = params[:, _CANON_IDX]
+        return step_matrices(params)[:, _BANK_IDX]
 
     def draw(self):
+        import matplotlib.pyplot as plt
+        if self.ax is None:
+            self.__init_plot()
         xyz = np.array(self.__Traj3D)
         x, y, z = xyz[:,0], xyz[:,1], xyz[:,2]
         self.ax.plot(x,y,z)
@@ -0,0 +1,271 @@
+import os
+import queue
+import secrets
+import argparse
+import threading
+import numpy as np
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client, deliver_challenge, answer_challenge
+
+from genetic_algo.dna.EncodedSeq import EncodedSeq, as_encoded
+from genetic_algo.core.fitness import fitness_batch
+
+
+# Environment variable holding the shared secret of the coordinator and its
+# workers: connections are authenticated (HMAC challenge) before any pickle
+# is read, and a worker can run code on the coordinator, so there is no
+# built-in default key
+AUTHKEY_ENV = "GENETIC_ALGO_AUTHKEY"
+
+def resolve_authkey(authkey = None):
+    """authkey (str or bytes) as bytes, else the key set in AUTHKEY_ENV, else None."""
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV) or None
+    if isinstance(authkey, str):
+        authkey = authkey.encode()
+    return authkey
+
+
+# =============================================================================
+# COORDINATOR
+# =============================================================================
+
+class _Job:
+    """One score_params call: its score array filled batch by batch."""
+
+    def __init__(self, nb_individus: int, nb_batches: int):
+        self.scores = np.full(nb_individus, np.nan)
+        self.remaining = nb_batches
+        self.error = None
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def complete(self, index, scores = None, error = None):
+        with self.lock:
+            if error is not None:
+                self.error = error
+                self.done.set()
+                return
+            self.scores[index] = scores
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+
+class Coordinator:
+    """
+    Fitness backend shipping parameter batches to remote workers over TCP
+    (see run_worker) and gathering their score arrays.
+
+    The sequence is sent to every worker once, when it registers; tasks
+    only carry a (K, G, 3) parameter batch and the fitness settings.
+    Workers pull one batch at a time, so faster workers get more of them.
+    A worker that disconnects or exceeds task_timeout is dropped and its
+    batch is put back in the queue for the others.
+
+    Every connection is authenticated in its own thread, so a client
+    stalling the handshake does not hold up the other registrations.
+
+    Plugs into RunContext / AlgoGenetique as backend:
+        with Coordinator(dna_seq, ("node0", 6000)) as coordinator:
+            # GENETIC_ALGO_AUTHKEY=<key> python -m genetic_algo.utils.distributed node0:6000 on every node
+            coordinator.wait_workers(4)
+            AlgoGenetique(table, dna_seq, ..., backend=coordinator)
+    """
+
+    def __init__(self, dna_seq, address = ("localhost", 0), authkey = None,
+                 batch_size = None, task_timeout = 600, worker_timeout = 60):
+        """
+        Args:
+            dna_seq: DNA sequence evaluated by the workers (string or EncodedSeq)
+            address: (host, port) to listen on (default: localhost, free port)
+            authkey: Shared secret of the coordinator and the workers (default:
+                     None, the AUTHKEY_ENV variable, or a random key printed
+                     for the workers)
+            batch_size: Individuals per task (default: None, about 4 tasks per worker)
+            task_timeout: Seconds before a worker silent on a task is dropped (default: 600)
+            worker_timeout: Seconds score_params waits without any worker
+                            before raising RuntimeError (default: 60)
+        """
+        self.seq = as_encoded(dna_seq)
+        self.authkey = resolve_authkey(authkey)
+        if self.authkey is None:
+            self.authkey = secrets.token_hex(32).encode()
+            print(f"Clé des workers ({AUTHKEY_ENV} ou --authkey) : {self.authkey.decode()}")
+        self.batch_size = batch_size
+        self.task_timeout = task_timeout
+        self.worker_timeout = worker_timeout
+        self._tasks = queue.Queue()
+        self._workers = {} # worker id -> connection
+        self._workers_lock = threading.Condition()
+        self._next_id = 0
+        self._closed = False
+        self._listener = Listener(address) # authenticated by _register
+        self.address = self._listener.address
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def nb_workers(self) -> int:
+        with self._workers_lock:
+            return len(self._workers)
+
+    def wait_workers(self, nb_workers: int, timeout = None) -> bool:
+        """Blocks until nb_workers are registered; False on timeout."""
+        with self._workers_lock:
+            return self._workers_lock.wait_for(lambda: len(self._workers) >= nb_workers, timeout)
+
+    def _accept(self):
+        """Hands every incoming connection to its own registration thread."""
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue
+            threading.Thread(target=self._register, args=(conn,), daemon=True).start()
+
+    def _register(self, conn):
+        """Authenticates a worker, sends it the sequence, then serves it."""
+        try:
+            deliver_challenge(conn, self.authkey)
+            answer_challenge(conn, self.authkey)
+            if not conn.poll(self.worker_timeout):
+                raise TimeoutError
+            conn.recv() # ("register", nb_threads)
+            conn.send(self.seq.bases)
+        except (OSError, EOFError, TimeoutError, AuthenticationError):
+            conn.close()
+            return
+        with self._workers_lock:
+            if self._closed:
+                conn.close()
+                return
+            worker_id = self._next_id
+            self._next_id += 1
+            self._workers[worker_id] = conn
+            self._workers_lock.notify_all()
+        self._serve(worker_id, conn)
+
+    def _serve(self, worker_id, conn):
+        """Feeds one worker with tasks until it is lost or the coordinator closes."""
+        task = None
+        try:
+            while True:
+                task = self._tasks.get()
+                if task is None: # closing
+                    conn.send(None)
+                    return
+                job, index, params, nbcuts, nbappend = task
+                if job.done.is_set(): # failed or abandoned call
+                    task = None
+                    continue
+                conn.send((params, nbcuts, nbappend))
+                if not conn.poll(self.task_timeout):
+                    raise TimeoutError
+                scores, error = conn.recv()
+                job.complete(index, scores, error)
+                task = None
+        except (OSError, EOFError, TimeoutError):
+            if task is not None:
+                self._tasks.put(task) # resubmitted to the remaining workers
+        finally:
+            conn.close()
+            with self._workers_lock:
+                self._workers.pop(worker_id, None)
+                self._workers_lock.notify_all()
+
+    def score_params(self, params, seq, nbcuts, nbappend) -> np.ndarray:
+        """
+        Scores a (K, G, 3) parameter block on the workers (see fitness_batch).
+
+        Raises:
+            ValueError: If seq is not the sequence sent to the workers
+            RuntimeError: If a worker fails to score a batch, or no worker
+                          is left for worker_timeout seconds
+        """
+        seq = as_encoded(seq)
+        if seq is not self.seq and not np.array_equal(seq.bases, self.seq.bases):
+            raise ValueError("The workers of this coordinator evaluate another sequence")
+        params = np.ascontiguousarray(params, dtype=float)
+        if len(params) == 0:
+            return np.zeros(0)
+        batch_size = self.batch_size or max(1, -(-len(params) // (4 * max(1, self.nb_workers))))
+        starts = range(0, len(params), batch_size)
+        job = _Job(len(params), len(starts))
+        for start in starts:
+            index = slice(start, start + batch_size)
+            self._tasks.put((job, index, params[index], nbcuts, nbappend))
+
+        while not job.done.wait(self.worker_timeout):
+            if self.nb_workers == 0:
+                job.complete(None, error="no worker")
+                raise RuntimeError(f"No evaluation worker for {self.worker_timeout} s")
+        if job.error is not None:
+            raise RuntimeError(f"Evaluation worker failed: {job.error}")
+        return job.scores
+
+    def close(self):
+        """Stops the workers and the listener."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._workers_lock:
+            nb_workers = len(self._workers)
+        for _ in range(nb_workers):
+            self._tasks.put(None)
+        self._listener.close()
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def run_worker(address, authkey = None, nb_threads = None):
+    """
+    Evaluation worker: registers with the coordinator at address, receives
+    the sequence once, then scores the batches it is sent until the
+    coordinator stops it or disconnects.
+
+    Raises:
+        ValueError: If no authkey is given nor set in AUTHKEY_ENV
+    """
+    authkey = resolve_authkey(authkey)
+    if authkey is None:
+        raise ValueError(f"No worker key: pass the one printed by the coordinator or set {AUTHKEY_ENV}")
+    conn = Client(tuple(address), authkey=authkey)
+    try:
+        conn.send(("register", nb_threads))
+        seq = EncodedSeq.from_codes(conn.recv())
+        while True:
+            task = conn.recv()
+            if task is None:
+                return
+            params, nbcuts, nbappend = task
+            try:
+                scores = fitness_batch(params, seq, nbappend=nbappend, nbcuts=nbcuts, nb_workers=nb_threads)
+            except Exception as error:
+                conn.send((None, repr(error)))
+                continue
+            conn.send((scores, None))
+    except (OSError, EOFError):
+        pass
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remote fitness evaluation worker")
+    parser.add_argument("address", help="Coordinator host:port")
+    parser.add_argument("--threads", type=int, default=None, help="Scoring threads (default: all cores)")
+    parser.add_argument("--authkey", default=None, help=f"Coordinator key (default: ${AUTHKEY_ENV})")
+    args = parser.parse_args()
+    host, port = args.address.rsplit(":", 1)
+    run_worker((host, int(port)), args.authkey, nb_threads=args.threads)
@@ -0,0 +1,164 @@
+import io
+import os
+import itertools
+import contextlib
+import multiprocessing
+from json import load as json_load
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import genetic_algo.core.population as population
+from genetic_algo.core.algogenetique import AlgoGenetique
+from genetic_algo.dna.EncodedSeq import EncodedSeq, as_encoded
+
+
+# =============================================================================
+# SHARED MEMORY
+# =============================================================================
+
+def share_array(array: np.ndarray):
+    """
+    Copies array into a new shared memory block.
+
+    Returns:
+        tuple: (shm, spec) where spec = (name, shape, dtype) lets another
+        process attach to it (see attach_array). The caller owns shm and must
+        close and unlink it.
+    """
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def attach_array(spec):
+    """(shm, read-only array view) of a block created by share_array."""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    array.flags.writeable = False
+    return shm, array
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+_worker = {} # per-process state set by _init_worker
+
+def _init_worker(bases_spec, dinuc_spec, pop_spec, table_path, nb_threads):
+    """Attaches the worker to the shared encoded sequence and master population."""
+    bases_shm, bases = attach_array(bases_spec)
+    dinuc_shm, dinuc = attach_array(dinuc_spec)
+    pop_shm, master = attach_array(pop_spec)
+    _worker.update(shms=(bases_shm, dinuc_shm, pop_shm), master=master, table_path=table_path,
+                   dna_seq=EncodedSeq.from_codes(bases, dinuc), nb_threads=nb_threads,
+                   ref_table=json_load(open(table_path)))
+
+def _run_config(config, postprocess):
+    """One AlgoGenetique run, seeded with the first nb_individus of the master population."""
+    initial = population.Population(_worker["master"][:config["nb_individus"]], _worker["ref_table"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        res = AlgoGenetique(_worker["table_path"], _worker["dna_seq"], initial_population=initial,
+                            nb_threads=_worker["nb_threads"], **config)
+    if postprocess is not None:
+        return postprocess(config, res, _worker["dna_seq"])
+    return res
+
+
+# =============================================================================
+# GRID SEARCH
+# =============================================================================
+
+def grid_configs(params_listed: dict) -> list:
+    """Every combination of a {parameter: [values]} search space, as AlgoGenetique kwargs."""
+    keys = list(params_listed)
+    return [dict(zip(keys, values)) for values in itertools.product(*params_listed.values())]
+
+def _outcome(future):
+    """(result, error) of a finished future; error is None on success."""
+    try:
+        return future.result(), None
+    except Exception as error:
+        return None, error
+
+def run_grid(dna_seq, table_path: str, configs: list, master_pop, nb_workers = None,
+             postprocess = None, nb_threads = None, max_attempts = 2):
+    """
+    Runs AlgoGenetique for every configuration over a process pool.
+
+    The encoded sequence (EncodedSeq bases and dinucleotides) and the master
+    population are copied once into shared memory, which every worker
+    attaches to, instead of being pickled with each task. Results are
+    yielded as soon as each configuration finishes, in completion order.
+
+    Workers are spawned: forking a process whose numba thread pool already
+    runs leaves it unable to exit. When a worker dies, every configuration
+    still in the pool fails with it; those are rerun each in its own
+    single-worker pool, so that only a configuration crashing its own
+    worker is charged an attempt.
+
+    Args:
+        dna_seq: DNA sequence to optimize (string or EncodedSeq)
+        table_path: Path to reference rotation table JSON
+        configs: List of AlgoGenetique kwargs (see grid_configs)
+        master_pop: Population or list of Individu; each run starts from its
+                    first nb_individus individuals
+        nb_workers: Number of processes (default: None, one per core)
+        postprocess: Function (config, result, dna_seq) -> value run in the
+                     worker with its EncodedSeq, to send back a summary
+                     instead of the whole result; it must be importable by
+                     the spawned workers (module level)
+        nb_threads: Scoring threads per process (default: None, cores / nb_workers)
+        max_attempts: Isolated runs of a configuration that crashed its
+                      worker before it is reported as failed (default: 2)
+
+    Yields:
+        tuple: (config, result, error), error being None on success and the
+        raised exception otherwise (result is then None). A failed
+        configuration never stops the sweep.
+    """
+    if isinstance(master_pop, (list, tuple)):
+        master_pop = population.Population.from_individus(master_pop, json_load(open(table_path)))
+    seq = as_encoded(dna_seq)
+    nb_workers = max(1, min(nb_workers or os.cpu_count() or 1, len(configs) or 1))
+    if nb_threads is None:
+        nb_threads = max(1, (os.cpu_count() or 1) // nb_workers)
+
+    shms, specs = zip(*[share_array(array) for array in (seq.bases, seq.dinuc, master_pop.full_params())])
+    context = multiprocessing.get_context("spawn")
+    new_pool = lambda size: ProcessPoolExecutor(size, mp_context=context, initializer=_init_worker,
+                                                initargs=specs + (table_path, nb_threads))
+    try:
+        crashed = []
+        with new_pool(nb_workers) as pool:
+            futures = {pool.submit(_run_config, config, postprocess): config for config in configs}
+            for future in as_completed(futures):
+                result, error = _outcome(future)
+                if isinstance(error, BrokenProcessPool):
+                    crashed.append((futures[future], 0))
+                    continue
+                yield futures[future], result, error
+
+        # Reruns in isolation: a crash there can only come from the configuration itself
+        while crashed:
+            batch, crashed = crashed[:nb_workers], crashed[nb_workers:]
+            pools = [new_pool(1) for _ in batch]
+            try:
+                futures = {pool.submit(_run_config, config, postprocess): (config, attempts)
+                           for pool, (config, attempts) in zip(pools, batch)}
+                for future in as_completed(futures):
+                    config, attempts = futures[future]
+                    result, error = _outcome(future)
+                    if isinstance(error, BrokenProcessPool) and attempts + 1 < max_attempts:
+                        crashed.append((config, attempts + 1))
+                        continue
+                    yield config, result, error
+            finally:
+                for pool in pools:
+                    pool.shutdown()
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
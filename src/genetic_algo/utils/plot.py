@@ -10,6 +10,9 @@ from .resultsmanager import load_simulation_data
 def get_indicators(coords):
     """
     Compute three trajectory quality metrics.
+
+    Only the first two and last two nodes are read, so the boundary
+    trajectory from Traj3D.compute(..., nbappend=2) is enough.
     
     Returns:
         tuple: (distance, norm_difference, dot_product)
@@ -314,7 +317,7 @@ def plot_multiple_three_indicators(filenames,dna_seq,labels,title=""):
         dist,norm,ps = [],[],[]
         for indiv in indiv_list:
             traj_res = Traj3D()
-            traj_res.compute(dna_seq,indiv.Rot_table)
+            traj_res.compute(dna_seq,indiv.Rot_table,nbappend=2)
             d,n,p = get_indicators(traj_res.getTraj())
             dist.append(d)
             norm.append(n)
@@ -1,7 +1,8 @@
 import pickle
 import os
 
-def save_simulation_data(filename, best_indiv_list, best_score_list, worst_score_list, params, dna_seq):
+def save_simulation_data(filename, best_indiv_list, best_score_list, worst_score_list, params, dna_seq,
+                         stop_reason = None):
     """
     Save genetic algorithm simulation results to pickle file.
     
@@ -12,6 +13,7 @@ def save_simulation_data(filename, best_indiv_list, best_score_list, worst_score
         worst_score_list: List of worst fitness scores per generation
         params: Dictionary of simulation parameters
         dna_seq: DNA sequence string used in simulation
+        stop_reason: Why the run stopped (RunResults.stop_reason, default: None)
     
     Creates output directory if it doesn't exist.
     """
@@ -24,7 +26,8 @@ def save_simulation_data(filename, best_indiv_list, best_score_list, worst_score
         "data": {
             "best_indiv_list": best_indiv_list,
             "best_score_list": best_score_list,
-            "worst_score_list": worst_score_list
+            "worst_score_list": worst_score_list,
+            "stop_reason": stop_reason
         }
     }
 
@@ -39,16 +42,19 @@ def save_simulation_data(filename, best_indiv_list, best_score_list, worst_score
     except Exception as e:
         print(f"Erreur sauvegarde : {e}")
 
-def load_simulation_data(filename, check_dna_seq):
+def load_simulation_data(filename, check_dna_seq, with_stop_reason = False):
     """
     Load simulation results with DNA sequence validation.
     
     Args:
         filename: Path to pickle file
         check_dna_seq: Expected DNA sequence (for validation)
+        with_stop_reason: Also return the stop reason (default: False)
     
     Returns:
-        tuple: (best_indiv_list, best_score_list, worst_score_list, parameters)
+        tuple: (best_indiv_list, best_score_list, worst_score_list, parameters),
+        followed by stop_reason if with_stop_reason (None for files saved
+        before it was recorded)
     
     Raises:
         FileNotFoundError: If file doesn't exist
@@ -76,4 +82,7 @@ def load_simulation_data(filename, check_dna_seq):
 
     print("Paramètres et ADN validés. Chargement...")
     d = loaded_payload["data"]
-    return d["best_indiv_list"], d["best_score_list"], d["worst_score_list"],loaded_payload["parameters"]
\ No newline at end of file
+    res = d["best_indiv_list"], d["best_score_list"], d["worst_score_list"],loaded_payload["parameters"]
+    if with_stop_reason:
+        return res + (d.get("stop_reason"),)
+    return res
\ No newline at end of file
@@ -13,7 +13,8 @@ def simul_and_save_results(save_filename,dna_seq,params):
         params: Dictionary of genetic algorithm parameters
                 (nb_individus, nb_generations, taux_selec, selection_type, etc.)
     
-    Automatically locates rotation table and saves best/worst scores per generation.
+    Automatically locates rotation table and saves best/worst scores per
+    generation, and why the run stopped (see AlgoGenetique stop criteria).
     """
     current_dir = os.path.dirname(os.path.abspath(__file__))
     project_src = os.path.dirname(os.path.dirname(current_dir)) # goes up to 'src'
@@ -21,7 +22,7 @@ def simul_and_save_results(save_filename,dna_seq,params):
     res = AlgoGenetique(table_path,dna_seq,**params)
     print("Simulation Terminée ... Sauvegarde en cours")
     best,bscore,wscore = res
-    save_simulation_data(save_filename,best,bscore,wscore,params,dna_seq)
+    save_simulation_data(save_filename,best,bscore,wscore,params,dna_seq,stop_reason=res.stop_reason)
 
 def print_final_score_result(filename,dna_seq):
     """
@@ -1,7 +1,7 @@
 # tests/test_algogenetique.py
 
 import unittest
-import src.genetic_algo.core.algogenetique  as alg
+import genetic_algo.core.algogenetique  as alg
 
 
 str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCGTAGCGCTGCGAGCGCTGCTAGCTAGCTAGTCGATGCATGCTAGCTACGATGCAT'
@@ -23,6 +23,15 @@ class TestAlgoGenetique(unittest.TestCase):
             for i in range(3):
                 self.assertAlmostEqual(D[XY][i], Rot_data[XY][i], delta=Rot_data[XY][i+3]+1e-6)
     
+    def test_lazy_scoring(self):
+        child = self.Individu1 + self.Individu2
+        self.assertTrue(child.dirty)
+        child.mutation(0.5,1)
+        self.assertTrue(child.dirty)
+        alg.flush_scores([child])
+        self.assertFalse(child.dirty)
+        self.assertAlmostEqual(child.score, child.fit())
+    
     def test_AlgoGenetique(self):
         Best,_ ,_= alg.AlgoGenetique(Rot_data_place,str_data,8,4,0.5,'')
         self.assertGreaterEqual(self.Individu1.score,Best[-1].score)
@@ -0,0 +1,41 @@
+# tests/test_cmaes.py
+
+import unittest
+import numpy as np
+from json import load as json_load
+from genetic_algo.core.cmaes import CMAES, AlgoCMAES
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitnesscache import FitnessCache
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestCMAES(unittest.TestCase):
+
+    def test_run(self):
+        opt = CMAES(Rot_data_place, str_data, nb_cuts=1, nb_append=2, seed=0, verbose=False)
+        best, best_scores, worst_scores = opt.run(15)
+        self.assertEqual(opt.dim, 20) # the directions of table.json have a zero SD
+        self.assertEqual((len(best), len(best_scores), len(worst_scores)), (16, 16, 16))
+        self.assertTrue(np.all(np.diff(best_scores) <= 0))
+        self.assertLess(best_scores[-1], best_scores[0])
+        self.assertEqual(opt.context.nb_evaluations, 1 + 15*opt.nb_individus)
+        self.assertAlmostEqual(best[-1].fit(), best_scores[-1])
+
+        table = best[-1].Rot_table.rot_table
+        ref = json_load(open(Rot_data_place))
+        for XY in table:
+            for i in range(3):
+                self.assertAlmostEqual(table[XY][i], ref[XY][i], delta=ref[XY][i+3] + 1e-9)
+
+    def test_initial_population(self):
+        master = Population.random(6, json_load(open(Rot_data_place)), np.random.default_rng(0))
+        cache = FitnessCache()
+        best, best_scores, _ = AlgoCMAES(Rot_data_place, str_data, 3, nb_individus=8, nb_cuts=1, nb_append=2,
+                                         initial_population=master, seed=1, cache=cache)
+        self.assertEqual(len(best_scores), 4)
+        self.assertEqual(cache.misses, 6 + 3*8)
+
+if __name__ == "__main__":
+    unittest.main()
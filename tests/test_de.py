@@ -0,0 +1,65 @@
+# tests/test_de.py
+
+import unittest
+import numpy as np
+from json import load as json_load
+from genetic_algo.core.de import DifferentialEvolution, AlgoDE, distinct_indices, binomial_crossover
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitnesscache import FitnessCache
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestOperators(unittest.TestCase):
+
+    def test_distinct_indices(self):
+        r = distinct_indices(5, 3, np.random.default_rng(0))
+        self.assertEqual(r.shape, (5, 3))
+        for i, row in enumerate(r):
+            self.assertEqual(len(set(row)), 3)
+            self.assertNotIn(i, row)
+        with self.assertRaises(ValueError):
+            distinct_indices(3, 3, np.random.default_rng(0))
+
+    def test_binomial_crossover(self):
+        params, mutants = np.zeros((50, 10, 3)), np.ones((50, 10, 3))
+        trials = binomial_crossover(params, mutants, 0.0, np.random.default_rng(0))
+        self.assertTrue(np.all(trials.reshape(50, -1).sum(axis=1) == 1)) # one forced value each
+        trials = binomial_crossover(params, mutants, 1.0, np.random.default_rng(0))
+        self.assertTrue(np.all(trials == 1))
+
+class TestDifferentialEvolution(unittest.TestCase):
+
+    def test_run(self):
+        for strategy in ("rand/1/bin", "current-to-best/1"):
+            opt = DifferentialEvolution(Rot_data_place, str_data, 20, strategy, nb_cuts=1, nb_append=2, seed=0,
+                                        verbose=False)
+            best, best_scores, worst_scores = opt.run(10)
+            self.assertEqual((len(best), len(best_scores), len(worst_scores)), (11, 11, 11))
+            self.assertTrue(np.all(np.diff(best_scores) <= 0)) # greedy replacement
+            self.assertTrue(np.all(np.diff(worst_scores) <= 0))
+            self.assertLess(best_scores[-1], best_scores[0])
+            self.assertEqual(opt.context.nb_evaluations, 11*20)
+            self.assertAlmostEqual(best[-1].fit(), best_scores[-1])
+
+            table = best[-1].Rot_table.rot_table
+            ref = json_load(open(Rot_data_place))
+            for XY in table:
+                for i in range(3):
+                    self.assertAlmostEqual(table[XY][i], ref[XY][i], delta=ref[XY][i+3] + 1e-9)
+
+    def test_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            DifferentialEvolution(Rot_data_place, str_data, 20, "best/2/exp", verbose=False)
+
+    def test_initial_population(self):
+        master = Population.random(8, json_load(open(Rot_data_place)), np.random.default_rng(0))
+        cache = FitnessCache()
+        best, best_scores, _ = AlgoDE(Rot_data_place, str_data, 8, 3, "current-to-best/1", nb_cuts=1, nb_append=2,
+                                      initial_population=master, seed=1, cache=cache)
+        self.assertEqual(len(best_scores), 4)
+        self.assertEqual(cache.misses, 4*8)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_distributed.py
+
+import socket
+import unittest
+import threading
+import numpy as np
+from json import load as json_load
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+import genetic_algo.core.algogenetique as alg
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitness import fitness_batch
+from genetic_algo.utils.distributed import Coordinator, run_worker
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+def start_worker(coordinator):
+    worker = threading.Thread(target=run_worker, args=(coordinator.address, coordinator.authkey),
+                              kwargs={"nb_threads": 1}, daemon=True)
+    worker.start()
+    return worker
+
+def lost_worker(address, authkey):
+    """Registers, takes one batch and disconnects without answering."""
+    conn = Client(address, authkey=authkey)
+    conn.send(("register", 1))
+    conn.recv()
+    conn.recv()
+    conn.close()
+
+class TestDistributed(unittest.TestCase):
+
+    def setUp(self):
+        self.params = Population.random(10, json_load(open(Rot_data_place)), np.random.default_rng(0)).params
+        self.expected = fitness_batch(self.params, str_data, nbappend=2, nbcuts=1, nb_workers=1)
+
+    def test_several_workers(self):
+        with Coordinator(str_data, batch_size=3) as coordinator:
+            workers = [start_worker(coordinator) for _ in range(3)]
+            self.assertTrue(coordinator.wait_workers(3, timeout=30))
+            np.testing.assert_allclose(coordinator.score_params(self.params, str_data, 1, 2), self.expected)
+        for worker in workers:
+            worker.join(timeout=30)
+            self.assertFalse(worker.is_alive())
+
+    def test_worker_loss(self):
+        """The batch of a lost worker is resubmitted to the others."""
+        with Coordinator(str_data, batch_size=4) as coordinator:
+            threading.Thread(target=lost_worker, args=(coordinator.address, coordinator.authkey), daemon=True).start()
+            self.assertTrue(coordinator.wait_workers(1, timeout=30))
+            result = {}
+            call = threading.Thread(target=lambda: result.update(scores=coordinator.score_params(self.params, str_data, 1, 2)))
+            call.start()
+            start_worker(coordinator)
+            call.join(timeout=60)
+            np.testing.assert_allclose(result["scores"], self.expected)
+
+    def test_errors(self):
+        with Coordinator(str_data, worker_timeout=0.5) as coordinator:
+            with self.assertRaises(ValueError):
+                coordinator.score_params(self.params, str_data[:-1], 1, 2)
+            with self.assertRaises(RuntimeError): # no worker
+                coordinator.score_params(self.params, str_data, 1, 2)
+            start_worker(coordinator)
+            with self.assertRaises(RuntimeError): # nb_append longer than the sequence
+                coordinator.score_params(self.params, str_data, 1, 10**6)
+
+    def test_authentication(self):
+        """Workers need the key; a client stalling the handshake does not block the others."""
+        with Coordinator(str_data, authkey=b"secret") as coordinator:
+            stalled = socket.create_connection(coordinator.address)
+            with self.assertRaises(ValueError):
+                run_worker(coordinator.address)
+            with self.assertRaises(AuthenticationError):
+                run_worker(coordinator.address, b"wrong")
+            start_worker(coordinator)
+            self.assertTrue(coordinator.wait_workers(1, timeout=30))
+            self.assertEqual(coordinator.nb_workers, 1)
+            stalled.close()
+
+    def test_algogenetique_backend(self):
+        with Coordinator(str_data) as coordinator:
+            start_worker(coordinator)
+            start_worker(coordinator)
+            _, remote, _ = alg.AlgoGenetique(Rot_data_place, str_data, 8, 3, 0.5, "tournament", nb_cuts=1, nb_append=2,
+                                             seed=0, backend=coordinator)
+        _, local, _ = alg.AlgoGenetique(Rot_data_place, str_data, 8, 3, 0.5, "tournament", nb_cuts=1, nb_append=2, seed=0)
+        np.testing.assert_allclose(remote, local)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,12 @@
 import unittest
 import numpy as np
 import os
+from numba import get_num_threads
 # Importing real classes from your package structure
-import src.genetic_algo.dna.RotTable as RotTable
-import src.genetic_algo.dna.Traj3D as Traj3D
-from src.genetic_algo.core.fitness import dist_df, dist_euclid, fitness, fitness_basic
+import genetic_algo.dna.RotTable as RotTable
+import genetic_algo.dna.Traj3D as Traj3D
+from genetic_algo.dna.EncodedSeq import EncodedSeq
+from genetic_algo.core.fitness import dist_df, dist_euclid, fitness, fitness_basic, fitness_batch, fitness_grad, choose_kmer
 
 class TestFitnessReal(unittest.TestCase):
 
@@ -52,6 +54,132 @@ class TestFitnessReal(unittest.TestCase):
         res2 = fitness(self.rot_table, self.test_seq, nbcuts=0)
         self.assertEqual(res1, res2)
 
+    def test_fitness_single_pass_cuts(self):
+        """The single-pass cut scoring matches the per-cut trajectories."""
+        per_cut = lambda coords, nbappend: dist_df(coords, nbappend)
+        for nbcuts, nbappend in [(0, 1), (2, 3), (6, 2)]:
+            fast = fitness(self.rot_table, self.test_seq, nbappend=nbappend, nbcuts=nbcuts)
+            slow = fitness(self.rot_table, self.test_seq, fct_poids=per_cut, nbappend=nbappend, nbcuts=nbcuts)
+            self.assertAlmostEqual(fast, slow, places=8)
+
+    def test_fitness_batch(self):
+        """Batched scores match the per-individual fitness."""
+        rng = np.random.default_rng(0)
+        base = self.rot_table.getParams()
+        params = base + rng.uniform(-1, 1, (4, 16, 3))
+        scores = fitness_batch(params, self.test_seq, nbappend=2, nbcuts=2)
+        self.assertEqual(scores.shape, (4,))
+        for p, score in zip(params, scores):
+            table = RotTable.RotTable({XY: list(p[k]) + [0, 0, 0] for k, XY in enumerate(RotTable.DINUC_KEYS)})
+            self.assertAlmostEqual(score, fitness(table, self.test_seq, nbappend=2, nbcuts=2), places=8)
+        serial = fitness_batch(params, self.test_seq, nbappend=2, nbcuts=2, nb_workers=1)
+        np.testing.assert_allclose(scores, serial)
+        threads = get_num_threads()
+        fitness_batch(params, self.test_seq, nbappend=2, nbcuts=2, nb_workers=max(1, threads-1))
+        self.assertEqual(get_num_threads(), threads)
+
+    def test_kmer_walk(self):
+        """Walking through the k-mer tables gives the step-by-step scores."""
+        rng = np.random.default_rng(1)
+        params = self.rot_table.getParams() + rng.uniform(-1, 1, (3, 16, 3))
+        for nbcuts, nbappend in [(0, 1), (3, 2), (7, 4)]:
+            plain = fitness_batch(params, self.test_seq, nbappend=nbappend, nbcuts=nbcuts, kmer=1)
+            for kmer in [2, 3, 5]:
+                blocked = fitness_batch(params, self.test_seq, nbappend=nbappend, nbcuts=nbcuts, kmer=kmer)
+                np.testing.assert_allclose(blocked, plain, rtol=1e-10)
+        self.assertEqual(choose_kmer(len(self.test_seq)), 1)
+        self.assertGreater(choose_kmer(180000, 100), choose_kmer(8000, 100))
+
+    def test_chunked_walk(self):
+        """Chunked walks chained back together give the sequential prefix points."""
+        seq = EncodedSeq(self.test_seq * 5)
+        matrices_db = Traj3D.Traj3D().compute_matrices_db(self.rot_table)
+        for kmer, nbcuts, nbappend in [(1, 0, 1), (1, 4, 3), (3, 6, 2)]:
+            ops, marks = seq.kmer_walk(kmer, nbcuts, nbappend)
+            table = Traj3D.fast_kmer_table(matrices_db, kmer)
+            points, closure = Traj3D.fast_kmer_prefix_points(ops, marks, table)
+            for nb_chunks in [1, 2, 7, len(ops) + 3]:
+                chunked_points, chunked_closure = Traj3D.fast_chunked_prefix_points(ops, marks, table, nb_chunks)
+                np.testing.assert_allclose(chunked_points, points, atol=1e-9)
+                np.testing.assert_allclose(chunked_closure, closure, atol=1e-9)
+
+    def test_affine_walk(self):
+        """3x4 affine walks (renormalized) match the 4x4 homogeneous products."""
+        seq = EncodedSeq(self.test_seq * 60)
+        matrices_db = Traj3D.Traj3D().compute_matrices_db(self.rot_table)
+        positions = np.array([0, 5, 1500, len(seq) - 1], dtype=np.int64)
+        points, closure = Traj3D.fast_prefix_points(seq.dinuc, matrices_db, positions)
+        self.assertEqual(closure.shape, (3, 4))
+        total = np.eye(4)
+        expected = {0: total[:3, 3]}
+        for i, dinuc in enumerate(seq.dinuc, start=1):
+            total = total @ matrices_db[dinuc]
+            expected[i] = total[:3, 3]
+        np.testing.assert_allclose(points, [expected[i] for i in positions], rtol=1e-10, atol=1e-9)
+        np.testing.assert_allclose(closure, total[:3], rtol=1e-10, atol=1e-9)
+
+    def test_step_matrices(self):
+        """The closed-form step matrices match the chained rotation products."""
+        def rot(theta, i, j):
+            R = np.eye(4)
+            R[i, i], R[i, j], R[j, i], R[j, j] = np.cos(theta), np.sin(theta), -np.sin(theta), np.cos(theta)
+            return R
+        T = np.eye(4)
+        T[2, 3] = -3.38/2
+        matrices_db = Traj3D.Traj3D().compute_matrices_db(self.rot_table)
+        for k, XY in enumerate(RotTable.DINUC_KEYS):
+            pair = XY if XY in RotTable.CANONICAL_KEYS else RotTable.rev_comp(XY)
+            twist, wedge, direction = np.radians(self.rot_table.rot_table[pair][:3])
+            beta = direction - np.pi/2
+            Q = rot(-beta, 0, 1) @ rot(-wedge, 1, 2) @ rot(beta, 0, 1)
+            np.testing.assert_allclose(matrices_db[k], T @ rot(twist/2, 0, 1) @ Q @ rot(twist/2, 0, 1) @ T, atol=1e-12)
+
+    def test_boundary_trajectory(self):
+        """The boundary mode keeps exactly the nodes dist_df reads."""
+        traj = Traj3D.Traj3D()
+        traj.compute(self.test_seq, self.rot_table)
+        full = traj.getTraj()
+        traj.compute(self.test_seq, self.rot_table, nbappend=3)
+        np.testing.assert_allclose(traj.getTraj(), np.vstack([full[:3], full[-3:]]))
+
+    def test_encoded_seq_rotation(self):
+        """Cut rotations as index offsets match the rotated string."""
+        seq = EncodedSeq(self.test_seq)
+        for indcut, nbappend in [(0, 1), (10, 3), (44, 5)]:
+            rotated = self.test_seq[indcut:] + self.test_seq[:indcut+nbappend]
+            np.testing.assert_array_equal(seq.rotated(indcut, nbappend), EncodedSeq(rotated).linear())
+        self.assertEqual(fitness(self.rot_table, seq), fitness(self.rot_table, self.test_seq))
+
+    def test_step_matrices_grad(self):
+        params = self.rot_table.getParams()
+        grad = Traj3D.step_matrices_grad(params)
+        eps = 1e-6
+        for j in range(3):
+            shift = np.zeros(3)
+            shift[j] = eps
+            numeric = (Traj3D.step_matrices(params + shift) - Traj3D.step_matrices(params - shift)) / (2*eps)
+            np.testing.assert_allclose(grad[:, j], numeric, atol=1e-8)
+
+    def test_fitness_grad(self):
+        """Analytic gradient against central differences, across renormalization checkpoints."""
+        seq = "".join(np.random.default_rng(0).choice(list("ACGT"), 2500))
+        params = self.rot_table.getParams()[None] + np.random.default_rng(1).normal(0, 0.5, (2, 16, 3))
+        scores, grads = fitness_grad(params, seq, nbappend=2, nbcuts=3)
+        np.testing.assert_allclose(scores, fitness_batch(params, seq, nbappend=2, nbcuts=3), rtol=1e-10)
+        self.assertTrue(np.all(grads[:, [1, 2, 3]] != 0) and np.all(grads[:, -1] == 0)) # TT is the reverse of AA
+        eps = 1e-5
+        for g, j in [(0, 0), (4, 1), (9, 2), (14, 1)]:
+            shift = np.zeros((16, 3))
+            shift[g, j] = eps
+            numeric = (fitness_batch(params + shift, seq, 2, 3) - fitness_batch(params - shift, seq, 2, 3)) / (2*eps)
+            np.testing.assert_allclose(grads[:, g, j], numeric, rtol=1e-5, atol=1e-6)
+
+        compact_scores, compact_grads = fitness_grad(RotTable.compact_params(params), seq, nbappend=2, nbcuts=3)
+        np.testing.assert_allclose(compact_scores, scores)
+        np.testing.assert_allclose(compact_grads, RotTable.compact_params(grads))
+        with self.assertRaises(ValueError):
+            fitness_grad(params, "ACGT", nbappend=3, nbcuts=3)
+
     def test_sequence_length_error(self):
         with self.assertRaises(AssertionError):
             fitness(self.rot_table, "A", nbappend=10)
@@ -0,0 +1,94 @@
+# tests/test_fitnesscache.py
+
+import os
+import pickle
+import unittest
+import tempfile
+import numpy as np
+from json import load as json_load
+import genetic_algo.core.algogenetique as alg
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitness import fitness_batch
+from genetic_algo.core.fitnesscache import FitnessCache
+from genetic_algo.dna.RotTable import compact_params, expand_params, DINUC_KEYS, CANONICAL_KEYS
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestFitnessCache(unittest.TestCase):
+
+    def setUp(self):
+        random = Population.random(6, json_load(open(Rot_data_place)), np.random.default_rng(0)).params
+        self.params = expand_params(compact_params(random)) # reverse complements consistent with the compact genome
+        self.calls = []
+
+    def scorer(self, params):
+        self.calls.append(len(params))
+        return fitness_batch(params, str_data, nbappend=2, nbcuts=1)
+
+    def test_hits_and_misses(self):
+        cache = FitnessCache()
+        block = self.params[[0, 1, 1, 2]]
+        scores = cache.score_params(block, str_data, 1, 2, self.scorer)
+        np.testing.assert_allclose(scores, fitness_batch(block, str_data, nbappend=2, nbcuts=1))
+        self.assertEqual(self.calls, [3]) # the duplicate is scored once
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        again = cache.score_params(compact_params(self.params[:3]), str_data, 1, 2, self.scorer)
+        np.testing.assert_array_equal(again, scores[[0, 1, 3]])
+        self.assertEqual(self.calls, [3])
+        self.assertEqual(cache.hits, 4)
+
+        cache.score_params(self.params[:1], str_data, 0, 2, self.scorer) # other settings: miss
+        cache.score_params(self.params[:1], str_data[::-1], 1, 2, self.scorer) # other sequence: miss
+        self.assertEqual(cache.misses, 5)
+
+    def test_reverse_complements_ignored(self):
+        """16-gene tables differing only on the reverse complements, which the score never reads, share an entry."""
+        cache = FitnessCache()
+        scores = cache.score_params(self.params[:2], str_data, 1, 2, self.scorer)
+        moved = self.params[:2].copy()
+        moved[:, [k for k, XY in enumerate(DINUC_KEYS) if XY not in CANONICAL_KEYS]] += 3.0
+        np.testing.assert_array_equal(cache.score_params(moved, str_data, 1, 2, self.scorer), scores)
+        np.testing.assert_allclose(scores, fitness_batch(moved, str_data, nbappend=2, nbcuts=1))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_resolution_and_bound(self):
+        cache = FitnessCache(max_size=2, resolution=1e-3)
+        cache.score_params(self.params[:1], str_data, 1, 2, self.scorer)
+        cache.score_params(self.params[:1] + 1e-5, str_data, 1, 2, self.scorer)
+        self.assertEqual(cache.hits, 1)
+        cache.score_params(self.params[1:4], str_data, 1, 2, self.scorer)
+        self.assertEqual(len(cache), 2)
+        cache.score_params(self.params[:1], str_data, 1, 2, self.scorer) # evicted
+        self.assertEqual(cache.misses, 5)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "cache", "fitness.pkl")
+            cache = FitnessCache(path=path)
+            scores = cache.score_params(self.params, str_data, 1, 2, self.scorer)
+            cache.save()
+            reloaded = FitnessCache(path=path)
+            np.testing.assert_array_equal(reloaded.score_params(self.params, str_data, 1, 2, self.scorer), scores)
+            self.assertEqual((reloaded.hits, reloaded.misses), (6, 0))
+            with self.assertRaises(ValueError):
+                FitnessCache(resolution=1e-3, path=path)
+            legacy = os.path.join(folder, "legacy.pkl") # keyed on the 16 genes
+            with open(legacy, "wb") as f:
+                pickle.dump({"resolution": 1e-6, "entries": []}, f)
+            with self.assertRaises(ValueError):
+                FitnessCache(path=legacy)
+
+    def test_algogenetique_cache(self):
+        cache = FitnessCache()
+        res = alg.AlgoGenetique(Rot_data_place, str_data, 10, 10, 0.5, "elitiste", nb_cuts=1, nb_append=2,
+                                mutrate=0.05, seed=0, cache=cache)
+        ref = alg.AlgoGenetique(Rot_data_place, str_data, 10, 10, 0.5, "elitiste", nb_cuts=1, nb_append=2,
+                                mutrate=0.05, seed=0)
+        np.testing.assert_allclose(res[1], ref[1])
+        self.assertGreater(cache.hits, 0)
+
+if __name__ == "__main__":
+    unittest.main()
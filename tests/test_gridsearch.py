@@ -0,0 +1,66 @@
+# tests/test_gridsearch.py
+
+import os
+import unittest
+import numpy as np
+from json import load as json_load
+from concurrent.futures.process import BrokenProcessPool
+import genetic_algo.core.population as population
+from genetic_algo.utils.gridsearch import grid_configs, run_grid, share_array, attach_array
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCGTAGCGCTGCGAGCGCTGCTAGCTAGCTAGTCGATGCATGCTAGCTACGATGCAT'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+def final_score(config, res, dna_seq):
+    """Postprocess run in the workers: last best score (the worker dies on nb_cuts == 3)."""
+    if config["nb_cuts"] == 3:
+        os._exit(1)
+    assert str(dna_seq) == str_data
+    return res[1][-1]
+
+class TestGridSearch(unittest.TestCase):
+    def test_grid_configs(self):
+        configs = grid_configs({"nb_individus": [4, 6], "nb_cuts": [0, 1, 2]})
+        self.assertEqual(len(configs), 6)
+        self.assertIn({"nb_individus": 6, "nb_cuts": 1}, configs)
+
+    def test_shared_array(self):
+        shm, spec = share_array(np.arange(12.).reshape(3, 4))
+        try:
+            view_shm, view = attach_array(spec)
+            np.testing.assert_array_equal(view, np.arange(12.).reshape(3, 4))
+            self.assertFalse(view.flags.writeable)
+            view_shm.close()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def test_run_grid(self):
+        """Every configuration is reported, a failing one included."""
+        master = population.Population.random(6, json_load(open(Rot_data_place)), np.random.default_rng(0))
+        base = {"nb_generations": 2, "taux_selec": 0.5, "selection_type": "elitiste", "nb_cuts": 1}
+        configs = [dict(base, nb_individus=4, nb_append=1), dict(base, nb_individus=6, nb_append=2),
+                   dict(base, nb_individus=4, nb_append=len(str_data) + 1)]
+        results = list(run_grid(str_data, Rot_data_place, configs, master, nb_workers=2, postprocess=final_score))
+        self.assertEqual(len(results), 3)
+        failed = [config for config, _, error in results if error is not None]
+        self.assertEqual(failed, [configs[2]])
+        for config, score, error in results:
+            if error is None:
+                self.assertGreaterEqual(score, 0)
+
+    def test_run_grid_worker_crash(self):
+        """Only the configuration killing its worker is reported failed."""
+        master = population.Population.random(6, json_load(open(Rot_data_place)), np.random.default_rng(0))
+        base = {"nb_individus": 4, "nb_generations": 1, "taux_selec": 0.5, "selection_type": "elitiste", "nb_append": 1}
+        configs = [dict(base, nb_cuts=0), dict(base, nb_cuts=3), dict(base, nb_cuts=1)]
+        results = list(run_grid(str_data, Rot_data_place, configs, master, nb_workers=3, postprocess=final_score))
+        self.assertEqual(len(results), 3)
+        errors = {config["nb_cuts"]: error for config, _, error in results}
+        self.assertIsNone(errors[0])
+        self.assertIsNone(errors[1])
+        self.assertIsInstance(errors[3], BrokenProcessPool)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+# tests/test_islands.py
+
+import unittest
+import numpy as np
+from genetic_algo.core.islands import AlgoIslands, migration_targets
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCGTAGCGCTGCGAGCGC'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestIslands(unittest.TestCase):
+
+    def test_topologies(self):
+        self.assertEqual(migration_targets("ring", 3), [[1], [2], [0]])
+        self.assertEqual(migration_targets("full", 3), [[1, 2], [0, 2], [0, 1]])
+        for i, dest in enumerate(migration_targets("random", 4, np.random.default_rng(0))):
+            self.assertEqual(len(dest), 1)
+            self.assertNotEqual(dest[0], i)
+        self.assertEqual(migration_targets([[1], []], 2), [[1], []])
+        with self.assertRaises(ValueError):
+            migration_targets("star", 3)
+
+    def test_islands(self):
+        best, best_scores, worst_scores = AlgoIslands(Rot_data_place, str_data, 2, 6, 4, 0.5, ["elitiste", "tournament"],
+                                                      migration_interval=2, nb_migrants=1, nb_cuts=1, seed=0)
+        self.assertEqual(len(best), 5)
+        self.assertEqual(len(worst_scores), 5)
+        self.assertTrue(np.all(np.diff(best_scores) <= 1e-12)) # the elitist island never loses its best
+        self.assertTrue(np.all(np.array(best_scores) <= np.array(worst_scores)))
+        self.assertAlmostEqual(best[-1].fit(), best_scores[-1])
+
+if __name__ == "__main__":
+    unittest.main()
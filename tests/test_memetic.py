@@ -0,0 +1,37 @@
+# tests/test_memetic.py
+
+import unittest
+import numpy as np
+from json import load as json_load
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitness import fitness_batch
+from genetic_algo.core.memetic import refine_params
+from genetic_algo.core.optimizer import Optimizer
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestMemetic(unittest.TestCase):
+
+    def test_refine_params(self):
+        pop = Population.random(3, json_load(open(Rot_data_place)), np.random.default_rng(0))
+        before = fitness_batch(pop.params, str_data, 2, 1)
+        params, scores, nb_evaluations = refine_params(pop.params, str_data, pop.ref_mean, pop.ref_sd, 2, 1, maxiter=10)
+        self.assertTrue(np.all(scores < before))
+        np.testing.assert_allclose(scores, fitness_batch(params, str_data, 2, 1))
+        self.assertTrue(np.all(np.abs(params - pop.ref_mean) <= pop.ref_sd + 1e-9))
+        np.testing.assert_array_equal(params[:, -1], pop.params[:, -1]) # TT only mirrors AA
+        self.assertGreater(nb_evaluations, 3)
+
+    def test_optimizer_refinement(self):
+        runs = [Optimizer(Rot_data_place, str_data, 10, 0.5, "elitiste", nb_cuts=1, nb_append=2, seed=0, verbose=False,
+                          refine_every=every) for every in (None, 2)]
+        plain, refined = [opt.run(4)[1] for opt in runs]
+        self.assertEqual(runs[0].nb_refine_evaluations, 0)
+        self.assertGreater(runs[1].nb_refine_evaluations, 0)
+        self.assertLess(refined[-1], plain[-1])
+        self.assertAlmostEqual(runs[1].best_list[-1].fit(), refined[-1])
+
+if __name__ == "__main__":
+    unittest.main()
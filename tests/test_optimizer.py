@@ -0,0 +1,94 @@
+# tests/test_optimizer.py
+
+import time
+import unittest
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+import genetic_algo.core.algogenetique as alg
+from genetic_algo.core.optimizer import Optimizer, RunContext, SteadyStateOptimizer
+from genetic_algo.core.fitness import fitness_batch
+
+
+seq_1 = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCG'
+seq_2 = 'GGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCGATATCCGATCGTAGCGCTGCGAGCGCTGCTAGCTAG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+def run(seq, seed):
+    opt = Optimizer(Rot_data_place, seq, 8, 0.5, "tournament", nb_cuts=1, nb_append=2, seed=seed, verbose=False)
+    return opt.run(5)
+
+class TestOptimizer(unittest.TestCase):
+
+    def test_concurrent_runs(self):
+        """Runs in threads give the same results as the same runs one after the other."""
+        jobs = [(seq_1, 0), (seq_2, 1), (seq_1, 2), (seq_2, 3)]
+        expected = [run(seq, seed)[1] for seq, seed in jobs]
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda job: run(*job)[1], jobs))
+        for scores, ref in zip(results, expected):
+            np.testing.assert_allclose(scores, ref)
+
+    def test_individus_keep_their_context(self):
+        """Individuals score against their own run, not the last one started."""
+        best, scores, _ = run(seq_1, 0)
+        alg.AlgoGenetique(Rot_data_place, seq_2, 4, 1, 0.5, "elitiste")
+        child = best[-1] + best[-2]
+        child.mutation(0.5, 1)
+        alg.flush_scores([child])
+        self.assertAlmostEqual(child.score, RunContext(Rot_data_place, seq_1, 1, 2).score_table(child.Rot_table))
+        self.assertAlmostEqual(best[-1].fit(), scores[-1])
+
+    def test_algogenetique_wrapper(self):
+        """AlgoGenetique is the optimizer run plus the legacy globals."""
+        res = alg.AlgoGenetique(Rot_data_place, seq_1, 8, 5, 0.5, "tournament", nb_cuts=1, nb_append=2, seed=0)
+        np.testing.assert_allclose(res[1], run(seq_1, 0)[1])
+        self.assertEqual(alg.str_data, seq_1)
+        self.assertEqual((alg.nb_cut, alg.nbappend), (1, 2))
+
+class SlowBackend:
+    """Local scoring, slowed down, recording how many evaluations overlap."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = self.max_running = self.calls = 0
+
+    def score_params(self, params, seq, nbcuts, nbappend):
+        with self.lock:
+            self.running += 1
+            self.calls += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        scores = fitness_batch(params, seq, nbappend=nbappend, nbcuts=nbcuts, nb_workers=1)
+        with self.lock:
+            self.running -= 1
+        return scores
+
+class TestSteadyState(unittest.TestCase):
+
+    def test_checkpoints(self):
+        for replacement in ("worst", "tournament"):
+            opt = SteadyStateOptimizer(Rot_data_place, seq_1, 8, 0.5, "tournament", replacement=replacement,
+                                       nb_cuts=1, nb_append=2, seed=0, verbose=False)
+            best, scores, worst = opt.run(5)
+            self.assertEqual(opt.evaluations_per_gen, 4)
+            self.assertEqual((len(best), len(scores), len(worst)), (6, 6, 6))
+            self.assertTrue(np.all(np.diff(scores) <= 0))
+            self.assertAlmostEqual(best[-1].fit(), scores[-1])
+
+    def test_asynchronous_evaluations(self):
+        backend = SlowBackend()
+        opt = SteadyStateOptimizer(Rot_data_place, seq_1, 8, 0.5, "elitiste", nb_pending=4, seed=0,
+                                   verbose=False, backend=backend)
+        opt.run(4)
+        self.assertEqual(backend.calls, 1 + 4*4) # initial population, then one child per evaluation
+        self.assertGreater(backend.max_running, 1)
+
+    def test_algogenetique_steady_state(self):
+        _, scores, _ = alg.AlgoGenetique(Rot_data_place, seq_1, 8, 3, 0.5, "elitiste", seed=0,
+                                         steady_state=True, replacement="tournament")
+        self.assertEqual(len(scores), 4)
+        with self.assertRaises(ValueError):
+            alg.AlgoGenetique(Rot_data_place, seq_1, 8, 3, 0.5, "elitiste", steady_state=True, replacement="oldest")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+from json import load as json_load
+from genetic_algo.core.population import Population, crossover_params, mutate_params
+from genetic_algo.core.fitness import fitness_batch
+
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestPopulation(unittest.TestCase):
+
+    def setUp(self):
+        self.ref_table = json_load(open(Rot_data_place))
+        self.pop = Population.random(6, self.ref_table)
+        self.seq = "AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGC"
+
+    def test_random_bounds(self):
+        self.assertEqual(self.pop.params.shape, (6, 16, 3))
+        self.assertTrue(np.all(self.pop.dirty))
+        self.assertTrue(np.all(np.abs(self.pop.params - self.pop.ref_mean) <= self.pop.ref_sd + 1e-9))
+
+    def test_take_concat_evaluate(self):
+        sub = self.pop.take([0, 0, 3])
+        np.testing.assert_array_equal(sub.params[1], self.pop.params[0])
+        both = self.pop.concat(sub)
+        self.assertEqual(len(both), 9)
+        both.evaluate(lambda params: params[:, 0, 0])
+        self.assertFalse(np.any(both.dirty))
+        self.assertEqual(both.best(), int(np.argmin(both.params[:, 0, 0])))
+
+    def test_views(self):
+        table = self.pop.table(2)
+        self.assertEqual(list(table), list(self.ref_table))
+        self.assertEqual(table["AC"][3:], self.ref_table["AC"][3:])
+        np.testing.assert_array_equal(self.pop.rot_table(2).getParams(), self.pop.params[2])
+
+    def test_operators_bounds(self):
+        children = crossover_params(self.pop.params[:3], self.pop.params[3:], np.ones(3), np.ones(3), beta=0.7)
+        mutated = mutate_params(children, 1, 10, self.pop.ref_mean, self.pop.ref_sd)
+        self.assertEqual(mutated.shape, (3, 16, 3))
+        self.assertTrue(np.all(np.abs(mutated - self.pop.ref_mean) <= self.pop.ref_sd + 1e-9))
+
+    def test_operators_seeded(self):
+        def offspring(seed):
+            rng = np.random.default_rng(seed)
+            children = crossover_params(self.pop.params[:3], self.pop.params[3:], np.ones(3), 3*np.ones(3), beta=0.7, rng=rng)
+            return mutate_params(children, 0.5, 1, self.pop.ref_mean, self.pop.ref_sd, big_mut=2, rng=rng)
+        np.testing.assert_array_equal(offspring(1), offspring(1))
+
+    def test_crossover_weighted_mix(self):
+        # beta = 1: every gene is the score-weighted mix, the better parent weighs 3/4
+        children = crossover_params(self.pop.params[:3], self.pop.params[3:], np.ones(3), 3*np.ones(3), beta=1)
+        np.testing.assert_allclose(children, 0.75*self.pop.params[:3] + 0.25*self.pop.params[3:])
+
+    def test_compact_genome(self):
+        compact = Population.random(4, self.ref_table, compact=True)
+        self.assertEqual(compact.params.shape, (4, 10, 3))
+        table = compact.table(0)
+        self.assertEqual(table["TT"][:2], table["AA"][:2])
+        self.assertEqual(table["TT"][2], -table["AA"][2])
+        full = Population.from_individus([compact.individu(i) for i in range(4)], self.ref_table)
+        scorer = lambda params: fitness_batch(params, self.seq, nbappend=2, nbcuts=1)
+        compact.evaluate(scorer)
+        full.scores[:] = np.nan
+        full.evaluate(scorer)
+        np.testing.assert_allclose(compact.scores, full.scores)
+
+    def test_elites_replace_worst(self):
+        self.pop.evaluate(lambda params: params[:, 0, 0])
+        elites = self.pop.elites(2)
+        np.testing.assert_array_equal(elites.scores, np.sort(self.pop.scores)[:2])
+        worst = self.pop.worst()
+        self.pop.replace_worst(elites.params[:1], elites.scores[:1])
+        np.testing.assert_array_equal(self.pop.params[worst], elites.params[0])
+        self.assertEqual(self.pop.scores[worst], elites.scores[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import random
 import numpy as np
-from src.genetic_algo.core.selection import * 
+from genetic_algo.core.selection import * 
 from unittest.mock import MagicMock
 
 # --- The Test Class ---
@@ -56,5 +56,32 @@ class TestSelectionMethods(unittest.TestCase):
         result_default = selection(self.individuals, self.taux_selec, "non_existent")
         self.assertEqual(len(result_default), self.expected_count)
 
+    def test_select_indices_all_strategies(self):
+        scores = np.arange(10, dtype=float) + 1
+        for select_type in indices_dic:
+            idx = select_indices(scores, self.taux_selec, select_type, rng=np.random.default_rng(0))
+            self.assertEqual(idx.dtype, np.int64)
+            self.assertTrue(np.all((idx >= 0) & (idx < len(scores))))
+            self.assertGreaterEqual(len(idx), self.expected_count)
+            self.assertLessEqual(len(idx), self.expected_count_tournament)
+            again = select_indices(scores, self.taux_selec, select_type, rng=np.random.default_rng(0))
+            np.testing.assert_array_equal(idx, again)
+
+    def test_indices_elitiste(self):
+        scores = np.array([5., 1., 4., 0., 3., 2.])
+        np.testing.assert_array_equal(indices_elitiste(scores, 0.5), [3, 1, 5])
+
+    def test_roulette_bounds(self):
+        """Roulette indices stay in range, degenerate weights raise like random.choices."""
+        top = MagicMock()
+        top.random = lambda k: np.ones(k) # draw landing exactly on the total weight
+        np.testing.assert_array_equal(indices_roulette(np.array([1., 2., 3.]), 1.0, rng=top), [2, 2, 2])
+        with self.assertRaises(ValueError):
+            indices_roulette(np.array([3.0]), 1.0)
+        with self.assertRaises(ValueError):
+            indices_roulette(np.array([0., 0.]), 1.0)
+        with self.assertRaises(ValueError):
+            indices_rang_geometrique(np.array([1., np.nan]), 1.0, q=np.inf)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+# tests/test_startup.py
+
+import os
+import sys
+import unittest
+import tempfile
+import subprocess
+import numpy as np
+from genetic_algo.dna.EncodedSeq import EncodedSeq
+import genetic_algo.dna.Traj3D as Traj3D
+
+
+src_path = os.path.abspath("src")
+Rot_data_place = os.path.abspath("src/genetic_algo/dna/table.json")
+
+headless_run = f"""
+import sys
+import numpy as np
+from json import load as json_load
+import genetic_algo.core.algogenetique
+from genetic_algo.core.fitness import fitness_batch
+from genetic_algo.dna.Traj3D import Traj3D, fast_chunked_prefix_points, fast_kmer_table
+from genetic_algo.dna.EncodedSeq import EncodedSeq
+from genetic_algo.dna.RotTable import RotTable
+table = json_load(open({Rot_data_place!r}))
+params = RotTable(table).getParams()[None] + np.zeros((3, 1, 1))
+print(fitness_batch(params, "ACGTTGCA" * 10, nb_workers=1)[0])
+Traj3D().compute("ACGTTGCA" * 10, RotTable(table))
+ops, marks = EncodedSeq("ACGTTGCA" * 10).kmer_walk(2, 2, 2)
+fast_chunked_prefix_points(ops, marks, fast_kmer_table(Traj3D().compute_matrices_db(RotTable(table)), 2), 2)
+print("matplotlib" in sys.modules)
+"""
+
+class TestStartup(unittest.TestCase):
+    def run_headless(self):
+        """Runs headless_run in a fresh interpreter outside the repository."""
+        env = dict(os.environ, PYTHONPATH=src_path)
+        with tempfile.TemporaryDirectory() as cwd:
+            return subprocess.run([sys.executable, "-c", headless_run], cwd=cwd, env=env,
+                                  capture_output=True, text=True, timeout=300)
+
+    def test_cached_kernels_reload(self):
+        """Kernels cached by this process load in a fresh interpreter (single module name)."""
+        ops, marks = EncodedSeq("ACGTTGCA" * 10).kmer_walk(2, 2, 2)
+        table = Traj3D.fast_kmer_table(np.tile(np.eye(4), (16, 1, 1)), 2)
+        Traj3D.fast_chunked_prefix_points(ops, marks, table, 2)
+        for _ in range(2): # the second run only loads from the on-disk cache
+            res = self.run_headless()
+            self.assertEqual(res.returncode, 0, res.stderr)
+        self.assertGreaterEqual(float(res.stdout.split()[0]), 0)
+
+    def test_headless_import(self):
+        """An optimization run without plotting never imports matplotlib."""
+        res = self.run_headless()
+        self.assertEqual(res.returncode, 0, res.stderr)
+        self.assertEqual(res.stdout.split()[-1], "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+# tests/test_stopping.py
+
+import os
+import pickle
+import time
+import tempfile
+import unittest
+import threading
+import numpy as np
+from json import load as json_load
+import genetic_algo.core.algogenetique as alg
+from genetic_algo.core.optimizer import Optimizer, SteadyStateOptimizer, RunResults
+from genetic_algo.core.population import Population
+from genetic_algo.core.fitness import fitness_batch
+from genetic_algo.core.stopping import EarlyStopping
+from genetic_algo.utils.resultsmanager import save_simulation_data, load_simulation_data
+
+
+str_data = 'AACTGTCAGCTACCGATCATCTAGCTCTATATCGCGCATTAGCAGCCAGCATCGACATCGTAGCTCACGCG'
+Rot_data_place = "src/genetic_algo/dna/table.json"
+
+class TestEarlyStopping(unittest.TestCase):
+
+    def test_criteria(self):
+        self.assertEqual(EarlyStopping(target_score=1.0).check([3.0, 1.0]), "target_score")
+        self.assertIsNone(EarlyStopping(target_score=1.0).check([3.0, 2.0]))
+
+        plateau = EarlyStopping(patience=2, rel_tol=0.01)
+        self.assertIsNone(plateau.check([10.0, 9.0]))
+        self.assertIsNone(plateau.check([10.0, 9.0, 5.0]))
+        self.assertEqual(plateau.check([10.0, 5.0, 4.99, 4.98]), "plateau")
+
+        ref_table = json_load(open(Rot_data_place))
+        same = Population(np.repeat(Population.random(1, ref_table).params, 5, axis=0), ref_table)
+        self.assertAlmostEqual(same.diversity(), 0.0)
+        self.assertEqual(EarlyStopping(min_diversity=0.01).check([1.0], same), "diversity")
+        self.assertIsNone(EarlyStopping(min_diversity=0.01).check([1.0], Population.random(20, ref_table)))
+
+        self.assertEqual(EarlyStopping(max_evaluations=10).check([1.0], nb_evaluations=10), "max_evaluations")
+        stopping = EarlyStopping(max_seconds=0)
+        stopping.start()
+        self.assertEqual(stopping.check([1.0]), "max_seconds")
+
+    def test_from_settings(self):
+        self.assertIsNone(EarlyStopping.from_settings(rel_tol=0.1))
+        self.assertEqual(EarlyStopping.from_settings(patience=3).patience, 3)
+
+class TestStoppedRuns(unittest.TestCase):
+
+    def test_full_run(self):
+        opt = Optimizer(Rot_data_place, str_data, 8, 0.5, "elitiste", seed=0, verbose=False)
+        res = opt.run(3)
+        self.assertIsInstance(res, RunResults)
+        self.assertEqual(res.stop_reason, "nb_generations")
+        self.assertEqual(len(res[1]), 4)
+
+    def test_target_score(self):
+        full = Optimizer(Rot_data_place, str_data, 8, 0.5, "elitiste", seed=0, verbose=False).run(10)
+        target = full[1][4]
+        opt = Optimizer(Rot_data_place, str_data, 8, 0.5, "elitiste", seed=0, verbose=False,
+                        stopping=EarlyStopping(target_score=target))
+        best, scores, worst = opt.run(10)
+        self.assertEqual(opt.stop_reason, "target_score")
+        self.assertLessEqual(scores[-1], target)
+        self.assertLess(len(scores), 11)
+
+    def test_max_evaluations(self):
+        opt = Optimizer(Rot_data_place, str_data, 8, 0.5, "elitiste", seed=0, verbose=False,
+                        stopping=EarlyStopping(max_evaluations=20))
+        _, scores, _ = opt.run(10)
+        self.assertEqual(opt.stop_reason, "max_evaluations")
+        self.assertEqual(len(scores), 4) # 8 + 4 + 4 + 4 evaluations
+
+    def test_steady_state(self):
+        opt = SteadyStateOptimizer(Rot_data_place, str_data, 8, 0.5, "elitiste", seed=0, verbose=False,
+                                   nb_pending=1, stopping=EarlyStopping(max_evaluations=16))
+        _, scores, _ = opt.run(10)
+        self.assertEqual(opt.stop_reason, "max_evaluations")
+        self.assertEqual(len(scores), 3)
+
+    def test_steady_state_does_not_wait(self):
+        """Evaluations in flight when a criterion fires are not waited for."""
+        release = threading.Event()
+        class StuckBackend:
+            def __init__(self):
+                self.calls = 0
+            def score_params(self, params, seq, nbcuts, nbappend):
+                self.calls += 1
+                if self.calls > 3: # initial population, then two children
+                    release.wait(30)
+                return fitness_batch(params, seq, nbappend=nbappend, nbcuts=nbcuts, nb_workers=1)
+        opt = SteadyStateOptimizer(Rot_data_place, str_data, 4, 0.5, "elitiste", seed=0, verbose=False,
+                                   nb_pending=2, backend=StuckBackend(), stopping=EarlyStopping(max_evaluations=6))
+        start = time.perf_counter()
+        _, scores, _ = opt.run(10)
+        release.set()
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(opt.stop_reason, "max_evaluations")
+        self.assertEqual(len(scores), 2)
+
+    def test_algogenetique_and_payload(self):
+        res = alg.AlgoGenetique(Rot_data_place, str_data, 8, 50, 0.5, "elitiste", seed=0, patience=3, rel_tol=0.5)
+        self.assertEqual(res.stop_reason, "plateau")
+        self.assertLess(len(res[1]), 51)
+        self.assertEqual(pickle.loads(pickle.dumps(res)).stop_reason, "plateau")
+
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, "run.pkl")
+            save_simulation_data(filename, *res, {"patience": 3}, str_data, stop_reason=res.stop_reason)
+            self.assertEqual(len(load_simulation_data(filename, str_data)), 4)
+            *_, stop_reason = load_simulation_data(filename, str_data, with_stop_reason=True)
+        self.assertEqual(stop_reason, "plateau")
+
+if __name__ == "__main__":
+    unittest.main()